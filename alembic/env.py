@@ -12,9 +12,17 @@ load_dotenv()
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
+from app.models.alert import StockAlertEvent
+from app.models.archive import AttributeArchive, ProductArchive
 from app.models.base import Base
+from app.models.job import Job
+from app.models.movement import StockDaily, StockMovement
+from app.models.reservation import Reservation
+from app.models.stock import TransferOrder, TransferOrderLine, WarehouseStock
 from app.models.user import User
-from app.models.warehouse import Attribute, Category, Product, Warehouse
+from app.models.warehouse import (
+    Attribute, Category, Product, ProductTombstone, Warehouse
+)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,44 @@
+"""Product changes feed
+
+Revision ID: 3d1f7a2c9b10
+Revises: 8c346ec289e1
+Create Date: 2025-03-02 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d1f7a2c9b10'
+down_revision: Union[str, None] = '8c346ec289e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_products_updated_at_id', 'products', ['updated_at', 'id'],
+        unique=False
+    )
+    op.create_table('product_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_product_tombstones_deleted_at_product_id', 'product_tombstones',
+        ['deleted_at', 'product_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_product_tombstones_deleted_at_product_id',
+        table_name='product_tombstones'
+    )
+    op.drop_table('product_tombstones')
+    op.drop_index('ix_products_updated_at_id', table_name='products')
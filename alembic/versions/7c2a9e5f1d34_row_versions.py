@@ -0,0 +1,30 @@
+"""Row versions for optimistic concurrency
+
+Revision ID: 7c2a9e5f1d34
+Revises: 5b8e0c4d2f61
+Create Date: 2025-03-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2a9e5f1d34'
+down_revision: Union[str, None] = '5b8e0c4d2f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column(
+        'version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('warehouses', sa.Column(
+        'version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('warehouses', 'version')
+    op.drop_column('products', 'version')
@@ -0,0 +1,62 @@
+"""Stock reservations
+
+Revision ID: 9e4b2d7a6c18
+Revises: 7c2a9e5f1d34
+Create Date: 2025-03-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2d7a6c18'
+down_revision: Union[str, None] = '7c2a9e5f1d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column(
+        'reserved_quantity', sa.Integer(), server_default='0',
+        nullable=False))
+    op.create_check_constraint(
+        'ck_products_reserved_quantity_non_negative', 'products',
+        'reserved_quantity >= 0')
+    op.create_table('reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(
+        ['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_reservations_id'), 'reservations', ['id'], unique=False)
+    op.create_index(
+        op.f('ix_reservations_product_id'), 'reservations', ['product_id'],
+        unique=False)
+    op.create_index(
+        'ix_reservations_active_expires_at', 'reservations', ['expires_at'],
+        unique=False, postgresql_where=sa.text("status = 'active'"))
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_reservations_active_expires_at', table_name='reservations')
+    op.drop_index(
+        op.f('ix_reservations_product_id'), table_name='reservations')
+    op.drop_index(op.f('ix_reservations_id'), table_name='reservations')
+    op.drop_table('reservations')
+    op.drop_constraint(
+        'ck_products_reserved_quantity_non_negative', 'products',
+        type_='check')
+    op.drop_column('products', 'reserved_quantity')
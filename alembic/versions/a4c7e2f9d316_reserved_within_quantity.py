@@ -0,0 +1,28 @@
+"""Reserved quantity cannot exceed product quantity
+
+Revision ID: a4c7e2f9d316
+Revises: f2b6d8e4a193
+Create Date: 2025-03-31 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2f9d316'
+down_revision: Union[str, None] = 'f2b6d8e4a193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_check_constraint(
+        'ck_products_reserved_within_quantity', 'products',
+        'reserved_quantity <= quantity')
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'ck_products_reserved_within_quantity', 'products', type_='check')
@@ -0,0 +1,83 @@
+"""Per-warehouse stock and transfer orders
+
+Revision ID: b1f6c3e8a207
+Revises: 9e4b2d7a6c18
+Create Date: 2025-03-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1f6c3e8a207'
+down_revision: Union[str, None] = '9e4b2d7a6c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('warehouse_stock',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.CheckConstraint(
+        'quantity >= 0', name='ck_warehouse_stock_quantity_non_negative'),
+    sa.ForeignKeyConstraint(
+        ['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(
+        ['warehouse_id'], ['warehouses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'warehouse_id')
+    )
+    op.create_index(
+        op.f('ix_warehouse_stock_warehouse_id'), 'warehouse_stock',
+        ['warehouse_id'], unique=False)
+    op.execute(
+        "INSERT INTO warehouse_stock (product_id, warehouse_id, quantity) "
+        "SELECT id, warehouse_id, greatest(quantity, 0) FROM products "
+        "WHERE warehouse_id IS NOT NULL"
+    )
+
+    op.create_table('transfer_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('destination_warehouse_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['source_warehouse_id'], ['warehouses.id'], ),
+    sa.ForeignKeyConstraint(['destination_warehouse_id'], ['warehouses.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_transfer_orders_id'), 'transfer_orders', ['id'],
+        unique=False)
+    op.create_table('transfer_order_lines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('transfer_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(
+        ['transfer_id'], ['transfer_orders.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(
+        ['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_transfer_order_lines_transfer_id'), 'transfer_order_lines',
+        ['transfer_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_transfer_order_lines_transfer_id'),
+        table_name='transfer_order_lines')
+    op.drop_table('transfer_order_lines')
+    op.drop_index(op.f('ix_transfer_orders_id'), table_name='transfer_orders')
+    op.drop_table('transfer_orders')
+    op.drop_index(
+        op.f('ix_warehouse_stock_warehouse_id'), table_name='warehouse_stock')
+    op.drop_table('warehouse_stock')
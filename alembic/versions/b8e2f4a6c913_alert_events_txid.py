@@ -0,0 +1,33 @@
+"""Transaction ids for the low stock alert feed cursor
+
+Revision ID: b8e2f4a6c913
+Revises: a4c7e2f9d316
+Create Date: 2025-04-01 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6c913'
+down_revision: Union[str, None] = 'a4c7e2f9d316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stock_alert_events', sa.Column(
+        'txid', sa.BigInteger(), server_default=sa.text('txid_current()'),
+        nullable=False))
+    op.create_index(
+        'ix_stock_alert_events_txid_id', 'stock_alert_events',
+        ['txid', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_stock_alert_events_txid_id', table_name='stock_alert_events')
+    op.drop_column('stock_alert_events', 'txid')
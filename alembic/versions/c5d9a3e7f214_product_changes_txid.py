@@ -0,0 +1,55 @@
+"""Transaction ids for the product changes feed cursor
+
+Revision ID: c5d9a3e7f214
+Revises: b8e2f4a6c913
+Create Date: 2025-04-02 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d9a3e7f214'
+down_revision: Union[str, None] = 'b8e2f4a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column(
+        'change_txid', sa.BigInteger(),
+        server_default=sa.text('txid_current()'), nullable=False))
+    op.create_index(
+        'ix_products_change_txid_id', 'products', ['change_txid', 'id'],
+        unique=False)
+    op.execute(
+        "CREATE FUNCTION products_set_change_txid() RETURNS trigger AS $$ "
+        "BEGIN NEW.change_txid := txid_current(); RETURN NEW; END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER products_set_change_txid "
+        "BEFORE INSERT OR UPDATE ON products "
+        "FOR EACH ROW EXECUTE FUNCTION products_set_change_txid()"
+    )
+
+    op.add_column('product_tombstones', sa.Column(
+        'txid', sa.BigInteger(),
+        server_default=sa.text('txid_current()'), nullable=False))
+    op.create_index(
+        'ix_product_tombstones_txid_product_id', 'product_tombstones',
+        ['txid', 'product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_product_tombstones_txid_product_id',
+        table_name='product_tombstones')
+    op.drop_column('product_tombstones', 'txid')
+    op.execute('DROP TRIGGER products_set_change_txid ON products')
+    op.execute('DROP FUNCTION products_set_change_txid()')
+    op.drop_index('ix_products_change_txid_id', table_name='products')
+    op.drop_column('products', 'change_txid')
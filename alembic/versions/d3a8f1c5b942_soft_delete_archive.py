@@ -0,0 +1,103 @@
+"""Soft delete and archive tables for products
+
+Revision ID: d3a8f1c5b942
+Revises: b1f6c3e8a207
+Create Date: 2025-03-23 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f1c5b942'
+down_revision: Union[str, None] = 'b1f6c3e8a207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column(
+        'products', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.drop_constraint('products_name_key', 'products', type_='unique')
+    op.create_index(
+        'uq_products_name_live', 'products', ['name'], unique=True,
+        postgresql_where=LIVE)
+    op.create_index(
+        'ix_products_live_category_id', 'products', ['category_id'],
+        unique=False, postgresql_where=LIVE)
+    op.create_index(
+        'ix_products_live_warehouse_id', 'products', ['warehouse_id'],
+        unique=False, postgresql_where=LIVE)
+    op.drop_constraint(
+        'transfer_order_lines_product_id_fkey', 'transfer_order_lines',
+        type_='foreignkey')
+
+    op.create_table('products_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('warehouse_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('reserved_quantity', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_products_archive_archived_at', 'products_archive',
+        ['archived_at'], unique=False)
+    op.create_table('attributes_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_attributes_archive_product_id'), 'attributes_archive',
+        ['product_id'], unique=False)
+
+
+KEPT_ROWS_SQL = sa.text(
+    'SELECT (SELECT count(*) FROM products WHERE deleted_at IS NOT NULL) '
+    '+ (SELECT count(*) FROM products_archive) '
+    '+ (SELECT count(*) FROM transfer_order_lines l WHERE NOT EXISTS '
+    '(SELECT 1 FROM products p WHERE p.id = l.product_id))'
+)
+
+
+def downgrade() -> None:
+    kept = op.get_bind().execute(KEPT_ROWS_SQL).scalar()
+    if kept:
+        raise RuntimeError(
+            f'{kept} soft-deleted products, archived products or transfer '
+            f'lines of removed products would be lost: restore or purge '
+            f'them before downgrading')
+    op.drop_index(
+        op.f('ix_attributes_archive_product_id'),
+        table_name='attributes_archive')
+    op.drop_table('attributes_archive')
+    op.drop_index(
+        'ix_products_archive_archived_at', table_name='products_archive')
+    op.drop_table('products_archive')
+
+    op.create_foreign_key(
+        'transfer_order_lines_product_id_fkey', 'transfer_order_lines',
+        'products', ['product_id'], ['id'], ondelete='CASCADE')
+    op.drop_index('ix_products_live_warehouse_id', table_name='products')
+    op.drop_index('ix_products_live_category_id', table_name='products')
+    op.drop_index('uq_products_name_live', table_name='products')
+    op.create_unique_constraint('products_name_key', 'products', ['name'])
+    op.drop_column('products', 'deleted_at')
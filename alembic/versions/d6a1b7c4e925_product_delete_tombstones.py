@@ -0,0 +1,40 @@
+"""Tombstones for products deleted without soft delete
+
+Revision ID: d6a1b7c4e925
+Revises: c5d9a3e7f214
+Create Date: 2025-04-03 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a1b7c4e925'
+down_revision: Union[str, None] = 'c5d9a3e7f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE FUNCTION products_write_tombstone() RETURNS trigger AS $$ "
+        "BEGIN "
+        "INSERT INTO product_tombstones (product_id, deleted_at) "
+        "VALUES (OLD.id, timezone('utc', now())); "
+        "RETURN OLD; "
+        "END; "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER products_write_tombstone "
+        "AFTER DELETE ON products FOR EACH ROW "
+        "WHEN (OLD.deleted_at IS NULL) "
+        "EXECUTE FUNCTION products_write_tombstone()"
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER products_write_tombstone ON products')
+    op.execute('DROP FUNCTION products_write_tombstone()')
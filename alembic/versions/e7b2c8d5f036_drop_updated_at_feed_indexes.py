@@ -0,0 +1,36 @@
+"""Drop feed indexes superseded by change txid
+
+Revision ID: e7b2c8d5f036
+Revises: d6a1b7c4e925
+Create Date: 2025-04-04 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c8d5f036'
+down_revision: Union[str, None] = 'd6a1b7c4e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index(
+        'ix_product_tombstones_deleted_at_product_id',
+        table_name='product_tombstones'
+    )
+    op.drop_index('ix_products_updated_at_id', table_name='products')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_products_updated_at_id', 'products', ['updated_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_product_tombstones_deleted_at_product_id', 'product_tombstones',
+        ['deleted_at', 'product_id'], unique=False
+    )
@@ -0,0 +1,81 @@
+"""Partitioned stock movements and daily rollups
+
+Revision ID: e7c4a9b2d815
+Revises: d3a8f1c5b942
+Create Date: 2025-03-26 12:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c4a9b2d815'
+down_revision: Union[str, None] = 'd3a8f1c5b942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    month = value.month - 1 + offset
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table('stock_movements',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('warehouse_id', sa.Integer(), nullable=True),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('reference_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index(
+        'ix_stock_movements_product_id_created_at', 'stock_movements',
+        ['product_id', 'created_at'], unique=False)
+    op.execute(
+        'CREATE TABLE stock_movements_default '
+        'PARTITION OF stock_movements DEFAULT')
+    today = datetime.utcnow().date()
+    for offset in range(-1, 4):
+        start = month_start(today, offset)
+        op.execute(
+            f"CREATE TABLE stock_movements_y{start.year}m{start.month:02d} "
+            f"PARTITION OF stock_movements FOR VALUES "
+            f"FROM ('{start}') TO ('{month_start(start, 1)}')"
+        )
+
+    op.create_table('stock_daily',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('net_change', sa.Integer(), nullable=False),
+    sa.Column('movements', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('product_id', 'day')
+    )
+    op.execute(
+        "INSERT INTO stock_movements "
+        "(product_id, warehouse_id, delta, reason, created_at) "
+        "SELECT product_id, warehouse_id, quantity, 'opening', "
+        "timezone('utc', now()) FROM warehouse_stock WHERE quantity <> 0"
+    )
+    op.execute(
+        "INSERT INTO stock_daily (product_id, day, net_change, movements) "
+        "SELECT product_id, CAST(created_at AS date), sum(delta), count(*) "
+        "FROM stock_movements GROUP BY product_id, CAST(created_at AS date)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stock_daily')
+    op.drop_index(
+        'ix_stock_movements_product_id_created_at',
+        table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,58 @@
+"""Reorder thresholds and low stock alert events
+
+Revision ID: f2b6d8e4a193
+Revises: e7c4a9b2d815
+Create Date: 2025-03-28 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d8e4a193'
+down_revision: Union[str, None] = 'e7c4a9b2d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column(
+        'reorder_threshold', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column(
+        'reorder_threshold', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column(
+        'low_stock', sa.Boolean(), server_default='false', nullable=False))
+    op.create_index(
+        'ix_products_low_stock', 'products', ['id'], unique=False,
+        postgresql_where=sa.text('low_stock AND deleted_at IS NULL'))
+    op.create_table('stock_alert_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.String(), nullable=False),
+    sa.Column('available_quantity', sa.Integer(), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_stock_alert_events_id'), 'stock_alert_events', ['id'],
+        unique=False)
+    op.create_index(
+        op.f('ix_stock_alert_events_product_id'), 'stock_alert_events',
+        ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_stock_alert_events_product_id'),
+        table_name='stock_alert_events')
+    op.drop_index(
+        op.f('ix_stock_alert_events_id'), table_name='stock_alert_events')
+    op.drop_table('stock_alert_events')
+    op.drop_index('ix_products_low_stock', table_name='products')
+    op.drop_column('products', 'low_stock')
+    op.drop_column('products', 'reorder_threshold')
+    op.drop_column('categories', 'reorder_threshold')
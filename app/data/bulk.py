@@ -0,0 +1,40 @@
+import csv
+import io
+from typing import Callable, Iterable, Optional, Sequence
+
+
+def copy_rows(
+    cursor, table: str, columns: Sequence[str], rows: Iterable,
+    chunk_size: int = 50_000, on_chunk: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Загружает строки через `COPY ... FROM STDIN` порциями по `chunk_size`.
+
+    Строки читаются из итератора потоково, в памяти одновременно находится
+    не больше одной порции. `on_chunk(total)` вызывается после каждой порции
+    (например, для фиксации транзакции или вывода прогресса).
+    """
+    statement = (
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    total = pending = 0
+
+    def flush():
+        nonlocal total, pending
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+        total += pending
+        pending = 0
+        if on_chunk is not None:
+            on_chunk(total)
+
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending == chunk_size:
+            flush()
+    if pending:
+        flush()
+    return total
@@ -1,9 +1,22 @@
 import os
+from dataclasses import dataclass
+from threading import Lock
 
-import psycopg2
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.data.query_stats import (
+    add_query_listener, register_query_timing, untracked
+)
+from app.data.replicas import ReplicaPool, current_routing, mark_write
+from app.data.shards import DEFAULT_SHARD, Shard, ShardRouter, parse_pairs
+from app.data.single_flight import SINGLE_FLIGHT_INFO_KEY, bump_generation
+from app.data.slow_queries import slow_query_log
 
 load_dotenv()
 
@@ -24,9 +37,21 @@ SUPERUSER_CONN_STRING = (
 DATABASE_URL = (
     f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
+DB_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+REQUEST_STATEMENT_TIMEOUT_MS = int(
+    os.getenv("REQUEST_STATEMENT_TIMEOUT_MS", "5000"))
+DB_SHARD_URLS = parse_pairs(os.getenv("DB_SHARD_URLS", ""))
+DB_TENANT_SHARDS = parse_pairs(os.getenv("DB_TENANT_SHARDS", ""))
 
 
 def init_db():
+    import psycopg2
+
     try:
         conn = psycopg2.connect(SUPERUSER_CONN_STRING)
         conn.autocommit = True
@@ -62,13 +87,166 @@ if __name__ == "__main__":
     init_db()
 
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def create_db_engine(url: str):
+    """Движок с пулом `DB_POOL_SIZE` + `DB_MAX_OVERFLOW` соединений на
+    процесс; при запуске через gunicorn размеры выводятся из общего
+    бюджета соединений"""
+    db_engine = create_engine(
+        url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    register_query_timing(db_engine)
+    return db_engine
+
+
+add_query_listener(slow_query_log.record)
+event.listen(Session, "after_commit", bump_generation)
+
+
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """`SET LOCAL statement_timeout` для сессий с лимитом в `info`"""
+    timeout = session.info.get("statement_timeout")
+    if timeout and connection.dialect.name == "postgresql":
+        with untracked():
+            connection.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def create_shard(name: str, url: str) -> Shard:
+    shard_engine = create_db_engine(url)
+    return Shard(
+        name, shard_engine,
+        sessionmaker(autocommit=False, autoflush=False, bind=shard_engine),
+    )
+
+
+@dataclass
+class Databases:
+    """Движки и фабрики сессий процесса"""
+
+    engine: Engine
+    session_factory: sessionmaker
+    replica_pool: Optional[ReplicaPool]
+    shard_router: ShardRouter
+
+
+_databases: Optional[Databases] = None
+_databases_lock = Lock()
+
+
+def get_databases() -> Databases:
+    """Движки создаются при первом обращении, а не при импорте модуля:
+    импорт приложения не загружает драйвер БД и не читает настройки
+    подключений"""
+    global _databases
+    with _databases_lock:
+        if _databases is None:
+            engine = create_db_engine(DATABASE_URL)
+            session_factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=engine)
+            event.listen(session_factory, "after_commit", mark_write)
+            _databases = Databases(
+                engine=engine,
+                session_factory=session_factory,
+                replica_pool=ReplicaPool(
+                    [create_db_engine(url) for url in DB_REPLICA_URLS]
+                ) if DB_REPLICA_URLS else None,
+                shard_router=ShardRouter(
+                    Shard(DEFAULT_SHARD, engine, session_factory),
+                    [create_shard(name, url)
+                     for name, url in DB_SHARD_URLS.items()],
+                    DB_TENANT_SHARDS,
+                ),
+            )
+        return _databases
+
+
+LAZY_ATTRIBUTES = {
+    "engine": "engine",
+    "SessionLocal": "session_factory",
+    "replica_pool": "replica_pool",
+    "shard_router": "shard_router",
+}
+
+
+def __getattr__(name: str):
+    """`engine`, `SessionLocal`, `replica_pool` и `shard_router` модуля
+    создаются при первом обращении через `get_databases`"""
+    if name in LAZY_ATTRIBUTES:
+        return getattr(get_databases(), LAZY_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def request_shard(tenant: Optional[str]) -> Shard:
+    try:
+        return get_databases().shard_router.shard_for(tenant)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Неизвестный тенант")
+
+
+def get_db(x_tenant: Optional[str] = Header(None)):
+    """Сессия основной БД шарда тенанта из заголовка `X-Tenant`"""
+    db = request_shard(x_tenant).session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_user_db():
+    """Сессия основной БД шарда по умолчанию: пользователи общие для всех
+    тенантов и хранятся только там, поэтому `X-Tenant` не учитывается"""
+    db = get_databases().shard_router.default.session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
-def get_db():
-    db = SessionLocal()
+def read_session(shard: Shard) -> Session:
+    """Сессия для чтения: реплика, уже получившая записи этого клиента,
+    иначе основная БД шарда"""
+    databases = get_databases()
+    replica = None
+    if (databases.replica_pool is not None
+            and shard is databases.shard_router.default):
+        routing = current_routing()
+        replica = databases.replica_pool.choose(
+            routing.read_after_lsn if routing is not None else None)
+    db = (replica or shard).session_factory()
+    db.info["statement_timeout"] = REQUEST_STATEMENT_TIMEOUT_MS
+    db.info[SINGLE_FLIGHT_INFO_KEY] = shard.name
+    return db
+
+
+def get_read_db(x_tenant: Optional[str] = Header(None)):
+    """`read_session` шарда тенанта из заголовка `X-Tenant`"""
+    db = read_session(request_shard(x_tenant))
     try:
         yield db
     finally:
         db.close()
+
+
+def get_user_read_db():
+    """`read_session` шарда по умолчанию, где хранятся пользователи:
+    проверка токена в каждом запросе не нагружает основную БД"""
+    db = read_session(get_databases().shard_router.default)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def session_factories():
+    """Фабрики сессий всех баз процесса: шарды и реплики"""
+    databases = get_databases()
+    factories = [
+        shard.session_factory
+        for shard in databases.shard_router.shards.values()
+    ]
+    if databases.replica_pool is not None:
+        factories.extend(
+            replica.session_factory
+            for replica in databases.replica_pool.replicas
+        )
+    return factories
@@ -0,0 +1,113 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestQueryStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса"""
+
+    scope: dict = field(default_factory=dict)
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    shard_repeats: int = 0
+    range_limit: Optional[int] = None
+
+    @property
+    def route(self) -> str:
+        """Шаблон маршрута (`/products/{product_id}`), а не фактический путь"""
+        route = self.scope.get("route")
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+
+QueryListener = Callable[
+    [str, object, float, Optional[RequestQueryStats]], None]
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+_query_listeners: List[QueryListener] = []
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Статистика текущего HTTP-запроса или None вне запроса"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_request(scope: dict):
+    """Начинает учет запросов для ASGI `scope`; вложенные вызовы переиспользуют
+    уже открытую статистику"""
+    stats = _current_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestQueryStats(scope=scope)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def untracked():
+    """Служебные запросы блока не учитываются в статистике HTTP-запроса"""
+    token = _current_stats.set(None)
+    try:
+        yield
+    finally:
+        _current_stats.reset(token)
+
+
+def add_query_listener(listener: QueryListener):
+    """Подписка на каждый выполненный SQL-запрос:
+    `listener(statement, parameters, elapsed, stats)`"""
+    _query_listeners.append(listener)
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    elapsed = perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        stats.statements[statement] += 1
+    for listener in _query_listeners:
+        listener(statement, parameters, elapsed, stats)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def register_query_timing(engine: Engine):
+    """Вешает на движок хуки замера времени каждого SQL-запроса"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,166 @@
+import itertools
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Event, Thread
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from app.data import query_stats
+
+logger = logging.getLogger(__name__)
+
+REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+REPLICA_HEALTH_INTERVAL = float(
+    os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5"))
+REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "60"))
+STRATEGIES = ("round_robin", "least_connections")
+
+READ_AFTER_LSN_COOKIE = "read_after_lsn"
+READ_AFTER_LSN_HEADER = "x-read-after-lsn"
+
+REPLAY_LSN_SQL = "SELECT pg_last_wal_replay_lsn()"
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn()"
+
+
+def parse_lsn(value) -> Optional[int]:
+    """LSN PostgreSQL вида `16/B374D848` как число; None, если не разобран"""
+    try:
+        high, low = value.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_lsn(value: int) -> str:
+    return f"{value >> 32:X}/{value & 0xFFFFFFFF:X}"
+
+
+@dataclass
+class RequestRouting:
+    """Маршрутизация чтения в рамках одного HTTP-запроса"""
+
+    read_after_lsn: Optional[int] = None
+    wrote: bool = False
+
+
+_current_routing: ContextVar[Optional[RequestRouting]] = ContextVar(
+    "request_routing", default=None
+)
+
+
+def current_routing() -> Optional[RequestRouting]:
+    return _current_routing.get()
+
+
+@contextmanager
+def track_routing(read_after_lsn: Optional[int] = None):
+    """Открывает состояние маршрутизации для HTTP-запроса"""
+    routing = RequestRouting(read_after_lsn=read_after_lsn)
+    token = _current_routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _current_routing.reset(token)
+
+
+def mark_write(session):
+    """Хук `after_commit` основной БД: запрос клиента что-то записал"""
+    routing = _current_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def primary_lsn(engine: Engine) -> str:
+    """Текущая позиция WAL основной БД; не входит в бюджет запросов"""
+    with query_stats.untracked(), engine.connect() as conn:
+        return conn.execute(text(PRIMARY_LSN_SQL)).scalar()
+
+
+@dataclass
+class Replica:
+    """Реплика для чтения и ее последнее известное состояние"""
+
+    engine: Engine
+    session_factory: sessionmaker
+    healthy: bool = False
+    replay_lsn: Optional[int] = None
+
+    @property
+    def connections(self) -> int:
+        checkedout = getattr(self.engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+
+class ReplicaPool:
+    """Набор реплик для чтения: выбор по кругу или по числу соединений,
+    проверка доступности и отставания в фоновом потоке"""
+
+    def __init__(self, engines: List[Engine],
+                 strategy: str = REPLICA_STRATEGY):
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Неизвестная стратегия выбора реплик: {strategy}")
+        self.strategy = strategy
+        self.replicas = [
+            Replica(
+                engine=engine,
+                session_factory=sessionmaker(
+                    autocommit=False, autoflush=False, bind=engine),
+            )
+            for engine in engines
+        ]
+        self._counter = itertools.count()
+        self._stopped = Event()
+
+    def check_health(self):
+        """Опрашивает реплики; недоступная исключается до следующей проверки"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    lsn = conn.execute(text(REPLAY_LSN_SQL)).scalar()
+            except SQLAlchemyError as e:
+                if replica.healthy:
+                    logger.warning(
+                        "Реплика %s недоступна: %s", replica.engine.url, e)
+                replica.healthy = False
+                continue
+            replica.replay_lsn = parse_lsn(lsn)
+            replica.healthy = True
+
+    def start_health_checks(self, interval: float = REPLICA_HEALTH_INTERVAL):
+        """Первая проверка сразу, затем раз в `interval` секунд"""
+        self.check_health()
+
+        def run():
+            while not self._stopped.wait(interval):
+                self.check_health()
+
+        Thread(target=run, name="replica-health", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def choose(self, read_after_lsn: Optional[int] = None):
+        """Доступная реплика, уже применившая WAL до `read_after_lsn`;
+        None — читать с основной БД"""
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and (
+                read_after_lsn is None or (
+                    replica.replay_lsn is not None
+                    and replica.replay_lsn >= read_after_lsn
+                )
+            )
+        ]
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda replica: replica.connections)
+        return candidates[next(self._counter) % len(candidates)]
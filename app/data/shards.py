@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.data import query_stats
+
+DEFAULT_SHARD = "default"
+
+
+def parse_pairs(value: str) -> Dict[str, str]:
+    """Разбирает строку вида `a=1,b=2`; значение может содержать `=`"""
+    pairs = {}
+    for item in value.split(","):
+        name, separator, target = item.partition("=")
+        if separator and name.strip() and target.strip():
+            pairs[name.strip()] = target.strip()
+    return pairs
+
+
+@dataclass
+class Shard:
+    """Отдельная база данных с группой складов и их товарами"""
+
+    name: str
+    engine: Engine
+    session_factory: sessionmaker
+
+
+class ShardRouter:
+    """Сопоставляет тенанта (группу складов) с базой данных шарда.
+
+    Тенант без явного сопоставления в `tenants` ищется среди имен шардов;
+    запрос без тенанта идет в основной шард.
+    """
+
+    def __init__(self, default: Shard, shards: List[Shard] = (),
+                 tenants: Optional[Dict[str, str]] = None):
+        self.default = default
+        self.shards = {default.name: default}
+        self.shards.update((shard.name, shard) for shard in shards)
+        self.tenants = dict(tenants or {})
+        unknown = set(self.tenants.values()) - set(self.shards)
+        if unknown:
+            raise ValueError(
+                f"Тенанты ссылаются на неизвестные шарды: {sorted(unknown)}")
+
+    def shard_for(self, tenant: Optional[str]) -> Shard:
+        """Шард тенанта; KeyError для неизвестного тенанта"""
+        if not tenant:
+            return self.default
+        return self.shards[self.tenants.get(tenant, tenant)]
+
+    def fan_out(self, fn: Callable[[Session], object]) -> List[Tuple]:
+        """Выполняет `fn(session)` на всех шардах параллельно.
+
+        Возвращает пары `(имя шарда, результат)` в порядке шардов. Запросы
+        шардов учитываются в статистике HTTP-запроса, а в бюджет маршрута
+        входит только одна копия: повторы на остальных шардах вычитаются.
+        """
+        def run(shard: Shard):
+            db = shard.session_factory()
+            try:
+                return shard.name, fn(db)
+            finally:
+                db.close()
+
+        shards = list(self.shards.values())
+        stats = query_stats.current_stats()
+        before = stats.count if stats is not None else 0
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [
+                executor.submit(copy_context().run, run, shard)
+                for shard in shards
+            ]
+            results = [future.result() for future in futures]
+        if stats is not None:
+            stats.shard_repeats += (
+                (stats.count - before) * (len(shards) - 1) // len(shards))
+        return results
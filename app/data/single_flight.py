@@ -0,0 +1,138 @@
+import copy
+import functools
+import itertools
+import os
+from threading import Event, Lock
+from typing import Callable, Dict, Hashable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ClauseElement
+
+from app.data.replicas import current_routing
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+SINGLE_FLIGHT_INFO_KEY = "single_flight"
+
+_generations = itertools.count(1)
+_generation = 0
+
+
+def data_generation() -> int:
+    """Номер поколения данных процесса: растет после каждой фиксации"""
+    return _generation
+
+
+def bump_generation(session=None):
+    """Хук `after_commit`: чтения после записи не присоединяются
+    к запросам, начатым до нее"""
+    global _generation
+    _generation = next(_generations)
+
+
+class Call:
+    """Выполняемый запрос и результат для ожидающих его потоков"""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Одновременные вызовы с одинаковым ключом выполняются один раз:
+    первый поток выполняет функцию, остальные получают ее результат или
+    исключение"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, Call] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], object]):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise copy_error(call.error)
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+def copy_error(error: BaseException) -> BaseException:
+    """Копия исключения ведущего потока для ожидающего: у каждого потока
+    свои `__traceback__` и `__context__`"""
+    clone = type(error).__new__(type(error), *error.args)
+    clone.__dict__.update(copy.copy(error.__dict__))
+    clone.args = error.args
+    return clone
+
+
+flights = SingleFlight()
+
+
+def freeze(value) -> Hashable:
+    """Аргумент вызова в виде, пригодном для ключа"""
+    if isinstance(value, BaseModel):
+        return type(value).__name__, value.model_dump_json()
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, ClauseElement):
+        return type(value).__name__, getattr(value, "key", None), str(value)
+    return value
+
+
+def find_session(args, kwargs) -> Optional[Session]:
+    for value in itertools.chain(args, kwargs.values()):
+        if isinstance(value, Session):
+            return value
+    return None
+
+
+def coalesced(fn):
+    """Объединяет одинаковые одновременные чтения в один запрос к БД.
+
+    Работает только для сессий чтения, помеченных в `info` именем шарда
+    (`get_read_db`); в транзакциях записи функция вызывается как есть.
+    Ключ — функция, аргументы кроме сессии, шард, требуемый клиентом
+    LSN и поколение данных процесса. Результат общий для всех ожидающих,
+    поэтому функция должна возвращать строки выборки столбцов или схемы
+    ответа, но не объекты ORM, привязанные к сессии ведущего запроса.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        db = find_session(args, kwargs)
+        shard = db.info.get(SINGLE_FLIGHT_INFO_KEY) if db is not None else None
+        if not SINGLE_FLIGHT_ENABLED or shard is None:
+            return fn(*args, **kwargs)
+        routing = current_routing()
+        key = (
+            fn.__module__, fn.__qualname__, shard,
+            routing.read_after_lsn if routing is not None else None,
+            data_generation(),
+            freeze([arg for arg in args if arg is not db]),
+            freeze({k: v for k, v in kwargs.items() if v is not db}),
+        )
+        return flights.do(key, lambda: fn(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,136 @@
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from app.data.query_stats import RequestQueryStats
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+MAX_FINGERPRINTS = 1000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]+\)s|%s|\?|(?<!:):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Нормализует SQL: литералы и параметры заменяются на `?`,
+    списки `IN (...)` схлопываются, пробелы сжимаются"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _POSTCOMPILE.sub("(?)", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return _IN_LIST.sub("IN (...)", normalized)
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters):
+    """Типы связанных параметров без их значений"""
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {
+                "executemany": len(parameters),
+                "row": parameter_shapes(parameters[0]),
+            }
+        return [_value_shape(value) for value in parameters]
+    return _value_shape(parameters)
+
+
+def client_filter(stats: Optional[RequestQueryStats]) -> Optional[str]:
+    """Исходный JSON параметра `filter` из строки запроса клиента"""
+    if stats is None:
+        return None
+    query_string = stats.scope.get("query_string", b"").decode("latin-1")
+    values = parse_qs(query_string).get("filter")
+    return values[0] if values else None
+
+
+@dataclass
+class QueryStat:
+    """Агрегированная статистика по одному отпечатку запроса"""
+
+    fingerprint: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_calls: int = 0
+    routes: Dict[str, int] = field(default_factory=dict)
+    last_slow_filter: Optional[str] = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class SlowQueryLog:
+    """Журнал медленных запросов и агрегаты по отпечаткам SQL"""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 max_fingerprints: int = MAX_FINGERPRINTS):
+        self.threshold_ms = threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, QueryStat] = {}
+        self._lock = Lock()
+
+    def record(self, statement, parameters, elapsed, stats):
+        """Слушатель `query_stats`: учитывает каждый выполненный запрос"""
+        key = fingerprint(statement)
+        elapsed_ms = elapsed * 1000
+        route = stats.route if stats is not None else ""
+        is_slow = elapsed_ms >= self.threshold_ms
+        filter_json = client_filter(stats) if is_slow else None
+
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None and len(self._stats) < self.max_fingerprints:
+                stat = self._stats[key] = QueryStat(fingerprint=key)
+            if stat is not None:
+                stat.calls += 1
+                stat.total_ms += elapsed_ms
+                stat.max_ms = max(stat.max_ms, elapsed_ms)
+                stat.routes[route] = stat.routes.get(route, 0) + 1
+                if is_slow:
+                    stat.slow_calls += 1
+                if filter_json:
+                    stat.last_slow_filter = filter_json
+
+        if is_slow:
+            logger.warning(
+                "Медленный запрос %.1f мс, маршрут %s, filter=%s, "
+                "параметры %s: %s",
+                elapsed_ms, route or "-", filter_json,
+                parameter_shapes(parameters), key,
+            )
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List:
+        """Самые затратные отпечатки запросов"""
+        with self._lock:
+            stats = list(self._stats.values())
+        return sorted(
+            stats, key=lambda stat: getattr(stat, order_by), reverse=True
+        )[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_log = SlowQueryLog()
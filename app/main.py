@@ -1,15 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.routers import attribute, auth, category, product, warehouse
+from app.data.database import get_databases, session_factories
+from app.middleware.metrics import MetricsMiddleware, register_pool_metrics
+from app.middleware.query_budget import QueryBudgetMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.replicas import ReplicaRoutingMiddleware
+from app.routers import (
+    admin, alert, attribute, auth, category, health, job, metrics,
+    product, reservation, shards, transfer, warehouse
+)
+from app.services import warmup_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Прогрев процесса при старте; `/health/ready` отвечает 200 только
+    после него"""
+    databases = get_databases()
+    if databases.replica_pool is not None:
+        databases.replica_pool.start_health_checks()
+    warmup_service.start_warm_up(session_factories)
+    yield
+    warmup_service.stop_warm_up()
+    if databases.replica_pool is not None:
+        databases.replica_pool.stop()
+
 
 app = FastAPI(
     title="warehouse_manager",
     description="система управления складами",
-    version="0.1"
+    version="0.1",
+    lifespan=lifespan,
 )
 
+app.add_middleware(ReplicaRoutingMiddleware.for_process)
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(RateLimitMiddleware, router=app.router)
+app.add_middleware(MetricsMiddleware)
+register_pool_metrics(lambda: get_databases().engine)
+
 app.include_router(auth.router)
 app.include_router(product.router)
 app.include_router(attribute.router)
 app.include_router(category.router)
 app.include_router(warehouse.router)
+app.include_router(reservation.router)
+app.include_router(transfer.router)
+app.include_router(alert.router)
+app.include_router(shards.router)
+app.include_router(job.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(admin.router)
@@ -0,0 +1,145 @@
+import os
+from time import perf_counter
+from typing import Callable, List
+
+from prometheus_client import Gauge, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector, CollectorRegistry
+from sqlalchemy.engine import Engine
+
+from app.data import query_stats
+
+BACKGROUND_ROUTE = "<background>"
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Количество SQL-запросов на один HTTP-запрос",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_query_duration_per_request_seconds",
+    "Суммарное время SQL-запросов на один HTTP-запрос",
+    ["method", "route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения отдельного SQL-запроса",
+    ["route"],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5),
+)
+
+
+POOL_GAUGES = {
+    "db_pool_size": ("Размер пула соединений", "size"),
+    "db_pool_checked_out": ("Выданные соединения", "checkedout"),
+    "db_pool_checked_in": ("Свободные соединения", "checkedin"),
+    "db_pool_overflow": ("Соединения сверх размера пула", "overflow"),
+}
+
+
+class PoolCollector(Collector):
+    """Снимает состояние пула соединений в момент опроса `/metrics`.
+
+    Движок запрашивается у `get_engine` только при опросе, поэтому
+    регистрация не создает его при импорте приложения.
+    """
+
+    def __init__(self, get_engine: Callable[[], Engine]):
+        self.get_engine = get_engine
+
+    def describe(self):
+        for name, (documentation, _) in POOL_GAUGES.items():
+            yield GaugeMetricFamily(name, documentation)
+
+    def collect(self):
+        pool = self.get_engine().pool
+        for name, (documentation, method) in POOL_GAUGES.items():
+            if hasattr(pool, method):
+                yield GaugeMetricFamily(
+                    name, documentation, value=getattr(pool, method)())
+
+
+_pool_collectors: List[PoolCollector] = []
+
+
+def register_pool_metrics(get_engine: Callable[[], Engine]):
+    """Публикует метрики пула соединений движка"""
+    collector = PoolCollector(get_engine)
+    _pool_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def metrics_registry():
+    """Реестр для `/metrics`.
+
+    С `PROMETHEUS_MULTIPROC_DIR` (несколько воркеров gunicorn) метрики
+    собираются из файлов всех воркеров; пул соединений — только
+    воркера, ответившего на опрос.
+    """
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _pool_collectors:
+        registry.register(collector)
+    return registry
+
+
+def _observe_query(statement, parameters, elapsed, stats):
+    route = stats.route if stats is not None else BACKGROUND_ROUTE
+    DB_QUERY_DURATION.labels(route).observe(elapsed)
+
+
+query_stats.add_query_listener(_observe_query)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: задержка по маршрутам, запросы в работе и
+    SQL-нагрузка каждого HTTP-запроса"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = perf_counter()
+        with query_stats.track_request(scope) as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                in_progress.dec()
+                route = stats.route
+                REQUEST_LATENCY.labels(
+                    method, route, str(status_code)).observe(
+                        perf_counter() - start)
+                DB_QUERIES_PER_REQUEST.labels(method, route).observe(
+                    stats.count)
+                DB_TIME_PER_REQUEST.labels(method, route).observe(
+                    stats.duration)
@@ -0,0 +1,125 @@
+import logging
+import os
+from contextlib import contextmanager
+
+from prometheus_client import Counter
+
+from app.data import query_stats
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+QUERY_COUNT_HEADER = b"x-query-count"
+RANGE_LIMIT_HEADER = b"x-range-limit"
+
+QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded",
+    "HTTP-запросы, превысившие бюджет SQL-запросов",
+    ["method", "route"],
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут выполнил больше SQL-запросов, чем объявлено"""
+
+
+def query_budget(max_queries: int):
+    """Объявляет максимальное число SQL-запросов для обработчика маршрута.
+
+    Ставится под `@router.<method>(...)`, учитывает и запросы зависимостей
+    (например, `get_current_user`).
+    """
+    def decorator(endpoint):
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+def get_query_budget(scope: dict):
+    route = scope.get("route")
+    endpoint = getattr(route, "endpoint", None)
+    return getattr(endpoint, "__query_budget__", None)
+
+
+def check_query_budget(stats: query_stats.RequestQueryStats, budget: int):
+    """Возвращает описание нарушения бюджета или None; повторы одного
+    запроса на шардах при веерном чтении в бюджет не входят"""
+    if budget is None or stats.count - stats.shard_repeats <= budget:
+        return None
+    statement, repeats = stats.statements.most_common(1)[0]
+    message = (
+        f"{stats.method} {stats.route}: выполнено {stats.count} SQL-запросов "
+        f"при бюджете {budget}"
+    )
+    if repeats > 1:
+        message += (
+            f"; возможен N+1, запрос повторён {repeats} раз: "
+            f"{' '.join(statement.split())[:200]}"
+        )
+    return message
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """Проверка в тестах: блок выполняет не больше `max_queries` запросов"""
+    with query_stats.track_request({}) as stats:
+        yield stats
+    message = check_query_budget(stats, max_queries)
+    if message:
+        raise QueryBudgetExceeded(message)
+
+
+class QueryBudgetMiddleware:
+    """ASGI-middleware: сверяет число SQL-запросов с бюджетом маршрута.
+
+    Режимы (`QUERY_BUDGET_MODE`): `off`, `log` — предупреждение в лог,
+    `raise` — исключение, чтобы тест с превышением бюджета падал. В режиме
+    `raise` бюджет проверяется до отправки заголовков ответа, и клиент
+    получает 500 вместо успешного ответа; запросы, выполненные уже при
+    отправке тела, только попадают в лог.
+    Фактическое число запросов отдаётся в заголовке `X-Query-Count`,
+    урезанный по стоимости размер страницы — в `X-Range-Limit`.
+    """
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        reported = False
+        with query_stats.track_request(scope) as stats:
+            async def send_wrapper(message):
+                nonlocal reported
+                if message["type"] == "http.response.start":
+                    if self.mode == "raise":
+                        reported = self.report(scope, stats)
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (QUERY_COUNT_HEADER, str(stats.count).encode())
+                    ]
+                    if stats.range_limit is not None:
+                        message["headers"].append((
+                            RANGE_LIMIT_HEADER,
+                            str(stats.range_limit).encode(),
+                        ))
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        if not reported:
+            self.report(scope, stats, raising=False)
+
+    def report(self, scope, stats, raising: bool = True) -> bool:
+        """Учитывает превышение бюджета; с `raising` — исключение"""
+        message = check_query_budget(stats, get_query_budget(scope))
+        if message is None:
+            return False
+        QUERY_BUDGET_EXCEEDED.labels(stats.method, stats.route).inc()
+        if raising:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        return True
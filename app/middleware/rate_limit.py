@@ -0,0 +1,216 @@
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic, time
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+
+from app.services.user_service import ALGORITHM, SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MODE = os.getenv("RATE_LIMIT_MODE", "on")
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "300/60")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_PREFIX = "rate:"
+MEMORY_BUCKETS_LIMIT = 100_000
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Ведро токенов: `burst` запросов сразу, затем `requests` за `period`
+    секунд"""
+
+    requests: int
+    period: float
+    burst: int
+
+    @property
+    def per_second(self) -> float:
+        return self.requests / self.period
+
+
+def parse_rate(value: str) -> Rate:
+    """Лимит вида `100/60` (запросов/секунд), необязательно `/burst`"""
+    parts = value.split("/")
+    requests, period = int(parts[0]), float(parts[1])
+    burst = int(parts[2]) if len(parts) > 2 else requests
+    return Rate(requests, period, burst)
+
+
+def rate_limit(requests: int, period: float = 60, burst: int = None):
+    """Объявляет лимит запросов маршрута на пользователя (или IP).
+
+    Ставится под `@router.<method>(...)`, как `query_budget`.
+    """
+    def decorator(endpoint):
+        endpoint.__rate_limit__ = Rate(requests, period, burst or requests)
+        return endpoint
+    return decorator
+
+
+class MemoryBackend:
+    """Ведра токенов в памяти процесса.
+
+    Сверх `max_buckets` вытесняется ведро, к которому дольше всех не
+    обращались (LRU за O(1)); оно почти всегда уже полное, то есть ничем
+    не отличается от отсутствующего.
+    """
+
+    blocking = False
+
+    def __init__(self, max_buckets: int = MEMORY_BUCKETS_LIMIT):
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: str, rate: Rate, now: Optional[float] = None):
+        """Забирает токен; возвращает 0 или сколько секунд ждать"""
+        now = monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rate.burst, now))
+            tokens = min(
+                rate.burst, tokens + (now - updated) * rate.per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate.per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+TOKEN_BUCKET_LUA = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local burst = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * per_second)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / per_second * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Ведра токенов в Redis (или совместимом по протоколу хранилище),
+    общие для всех процессов; списание атомарно через Lua-скрипт"""
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = RATE_LIMIT_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def acquire(self, key: str, rate: Rate, now: Optional[float] = None):
+        wait = self.client.eval(
+            TOKEN_BUCKET_LUA, 1, self.prefix + key,
+            rate.burst, rate.per_second, time() if now is None else now,
+        )
+        return float(wait)
+
+
+def create_backend(redis_url: Optional[str] = RATE_LIMIT_REDIS_URL):
+    if not redis_url:
+        return MemoryBackend()
+    import redis
+
+    return RedisBackend(redis.Redis.from_url(redis_url))
+
+
+def client_identity(scope: dict) -> str:
+    """Пользователь из bearer-токена (без запроса к БД) или IP клиента"""
+    from jose import JWTError, jwt
+
+    headers = dict(scope.get("headers") or [])
+    scheme, _, token = headers.get(
+        b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = {}
+        user = payload.get("uid") or payload.get("sub")
+        if user is not None:
+            return f"user:{user}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI-middleware: лимит запросов по алгоритму ведра токенов.
+
+    Лимит маршрута задается `@rate_limit`, остальным маршрутам —
+    `RATE_LIMIT_DEFAULT`. Ведро свое у каждой пары маршрут + пользователь
+    (или IP для анонимных запросов); при превышении — 429 с `Retry-After`.
+    """
+
+    def __init__(self, app, router, backend=None,
+                 default: str = RATE_LIMIT_DEFAULT,
+                 mode: str = RATE_LIMIT_MODE):
+        self.app = app
+        self.router = router
+        self.backend = backend or create_backend()
+        self.default = parse_rate(default) if default else None
+        self.mode = mode
+
+    def match_route(self, scope: dict):
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        route = self.match_route(scope)
+        rate = getattr(
+            getattr(route, "endpoint", None), "__rate_limit__", self.default)
+        if route is None or rate is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['method']} {route.path} {client_identity(scope)}"
+        if self.backend.blocking:
+            wait = await run_in_threadpool(self.backend.acquire, key, rate)
+        else:
+            wait = self.backend.acquire(key, rate)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        logger.warning("Превышен лимит запросов: %s", key)
+        body = json.dumps(
+            {"detail": "Слишком много запросов, повторите позже"},
+            ensure_ascii=False,
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
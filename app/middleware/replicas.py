@@ -0,0 +1,63 @@
+from http.cookies import SimpleCookie
+
+from starlette.concurrency import run_in_threadpool
+
+from app.data import replicas
+from app.data.database import get_databases
+from app.data.replicas import (
+    READ_AFTER_LSN_COOKIE, READ_AFTER_LSN_HEADER, REPLICA_STICKY_SECONDS
+)
+
+
+def read_after_lsn(scope: dict):
+    """LSN последней записи клиента из заголовка или cookie"""
+    headers = dict(scope.get("headers") or [])
+    value = headers.get(READ_AFTER_LSN_HEADER.encode())
+    if value is None:
+        cookie = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+        morsel = cookie.get(READ_AFTER_LSN_COOKIE)
+        return replicas.parse_lsn(morsel.value) if morsel else None
+    return replicas.parse_lsn(value.decode("latin-1"))
+
+
+class ReplicaRoutingMiddleware:
+    """ASGI-middleware: чтение своих записей при работе с репликами.
+
+    После запроса, зафиксировавшего изменения, клиент получает позицию WAL
+    основной БД в заголовке `X-Read-After-LSN` и cookie; следующие чтения
+    идут только на реплики, уже применившие эту позицию.
+    """
+
+    def __init__(self, app, engine, pool):
+        self.app = app
+        self.engine = engine
+        self.pool = pool
+
+    @classmethod
+    def for_process(cls, app):
+        """Middleware для баз процесса; движки создаются при сборке
+        стека middleware на старте приложения, а не при импорте"""
+        databases = get_databases()
+        return cls(app, databases.engine, databases.replica_pool)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        with replicas.track_routing(read_after_lsn(scope)) as routing:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and routing.wrote:
+                    lsn = await run_in_threadpool(
+                        replicas.primary_lsn, self.engine)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (READ_AFTER_LSN_HEADER.encode(), lsn.encode()),
+                        (b"set-cookie", (
+                            f"{READ_AFTER_LSN_COOKIE}={lsn}; "
+                            f"Max-Age={REPLICA_STICKY_SECONDS}; Path=/; "
+                            f"HttpOnly; SameSite=Lax"
+                        ).encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
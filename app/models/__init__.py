@@ -1,2 +1,4 @@
 from app.models.base import Base
-from app.models.warehouse import Attribute, Category, Product, Warehouse
+from app.models.warehouse import (
+    Attribute, Category, Product, ProductTombstone, Warehouse
+)
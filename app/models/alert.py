@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Index, Integer, String, text
+)
+
+from app.models.base import Base
+
+
+class StockAlertEvent(Base):
+    """Смена состояния оповещения о низком остатке товара"""
+
+    __tablename__ = "stock_alert_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    state = Column(String, nullable=False)
+    available_quantity = Column(Integer, nullable=False)
+    threshold = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    txid = Column(
+        BigInteger, nullable=False, server_default=text("txid_current()"))
+
+    __table_args__ = (
+        Index("ix_stock_alert_events_txid_id", "txid", "id"),
+    )
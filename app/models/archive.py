@@ -0,0 +1,40 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String
+
+from app.models.base import Base
+
+
+class ProductArchive(Base):
+    """Архивная копия товара, вынесенного из горячей таблицы `products`"""
+
+    __tablename__ = "products_archive"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    category_id = Column(Integer)
+    warehouse_id = Column(Integer)
+    quantity = Column(Integer, nullable=False)
+    reserved_quantity = Column(Integer, nullable=False)
+    is_active = Column(Boolean)
+    created_by = Column(Integer)
+    updated_by = Column(Integer)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_products_archive_archived_at", "archived_at"),
+    )
+
+
+class AttributeArchive(Base):
+    """Архивная копия характеристики архивированного товара"""
+
+    __tablename__ = "attributes_archive"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    value = Column(String, nullable=False)
+    product_id = Column(Integer, index=True)
+    archived_at = Column(DateTime, nullable=False)
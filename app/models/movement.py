@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, String
+)
+
+from app.models.base import Base
+
+
+class StockMovement(Base):
+    """Изменение остатка товара; таблица только на дополнение,
+    секционирована по месяцам по `created_at`"""
+
+    __tablename__ = "stock_movements"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(
+        DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
+    product_id = Column(Integer, nullable=False)
+    warehouse_id = Column(Integer, nullable=True)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    reference_id = Column(Integer, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+
+    __table_args__ = (
+        Index(
+            "ix_stock_movements_product_id_created_at",
+            "product_id", "created_at",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class StockDaily(Base):
+    """Суточный итог изменений остатка товара"""
+
+    __tablename__ = "stock_daily"
+
+    product_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    net_change = Column(Integer, nullable=False, default=0)
+    movements = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy import text
+
+from app.models.base import Base
+
+
+class Reservation(Base):
+    """Резерв количества товара со сроком действия"""
+
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="active")
+    expires_at = Column(DateTime, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_reservations_active_expires_at", "expires_at",
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
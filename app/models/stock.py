@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    CheckConstraint, Column, DateTime, ForeignKey, Integer, String
+)
+from sqlalchemy.orm import relationship
+
+from app.models.base import Base
+
+
+class WarehouseStock(Base):
+    """Остаток товара на конкретном складе"""
+
+    __tablename__ = "warehouse_stock"
+
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True)
+    warehouse_id = Column(
+        Integer, ForeignKey("warehouses.id", ondelete="CASCADE"),
+        primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        CheckConstraint(
+            "quantity >= 0", name="ck_warehouse_stock_quantity_non_negative"),
+    )
+
+
+class TransferOrder(Base):
+    """Заказ на перемещение товаров между складами"""
+
+    __tablename__ = "transfer_orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_warehouse_id = Column(
+        Integer, ForeignKey("warehouses.id"), nullable=False)
+    destination_warehouse_id = Column(
+        Integer, ForeignKey("warehouses.id"), nullable=False)
+    status = Column(String, nullable=False, default="completed")
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    lines = relationship(
+        "TransferOrderLine", backref="transfer",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+
+
+class TransferOrderLine(Base):
+    """Строка заказа на перемещение: товар и количество.
+
+    `product_id` без внешнего ключа: история перемещений сохраняется после
+    архивации товара.
+    """
+
+    __tablename__ = "transfer_order_lines"
+
+    id = Column(Integer, primary_key=True)
+    transfer_id = Column(
+        Integer, ForeignKey("transfer_orders.id", ondelete="CASCADE"),
+        nullable=False, index=True)
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
@@ -1,6 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    BigInteger, Boolean, CheckConstraint, Column, DateTime, FetchedValue,
+    ForeignKey, Index, Integer, String, text
+)
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -16,11 +19,14 @@ class Warehouse(Base):
     address = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, server_default="1")
 
     products = relationship(
         "Product", backref="warehouse", cascade="all, delete-orphan"
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Category(Base):
     """Категория товара"""
@@ -30,6 +36,7 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True)
     is_active = Column(Boolean, default=True)
+    reorder_threshold = Column(Integer, nullable=True)
 
     products = relationship(
         "Product", backref="category", cascade="all, delete-orphan")
@@ -41,21 +48,84 @@ class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, unique=True)
+    name = Column(String, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"))
     warehouse_id = Column(Integer, ForeignKey("warehouses.id"))
     quantity = Column(Integer, nullable=False, default=0)
+    reserved_quantity = Column(
+        Integer, nullable=False, default=0, server_default="0")
+    reorder_threshold = Column(Integer, nullable=True)
+    low_stock = Column(
+        Boolean, nullable=False, default=False, server_default="false")
     is_active = Column(Boolean, default=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, server_default="1")
+    deleted_at = Column(DateTime, nullable=True)
+    change_txid = Column(
+        BigInteger, server_default=FetchedValue(),
+        server_onupdate=FetchedValue())
 
     attributes = relationship(
         "Attribute", backref="product", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_products_change_txid_id", "change_txid", "id"),
+        Index(
+            "uq_products_name_live", "name", unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_products_live_category_id", "category_id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_products_live_warehouse_id", "warehouse_id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        Index(
+            "ix_products_low_stock", "id",
+            postgresql_where=text("low_stock AND deleted_at IS NULL"),
+        ),
+        CheckConstraint(
+            "reserved_quantity >= 0",
+            name="ck_products_reserved_quantity_non_negative"),
+        CheckConstraint(
+            "reserved_quantity <= quantity",
+            name="ck_products_reserved_within_quantity"),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def available_quantity(self) -> int:
+        """Свободный остаток: количество за вычетом активных резервов"""
+        return (self.quantity or 0) - (self.reserved_quantity or 0)
+
+
+class ProductTombstone(Base):
+    """Отметка об удалении товара для инкрементальной синхронизации.
+
+    При мягком удалении ее пишет `delete_product`; для товаров, удаленных
+    сразу (каскадом со складом или категорией), — триггер БД
+    `products_write_tombstone`.
+    """
+
+    __tablename__ = "product_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    txid = Column(BigInteger, server_default=FetchedValue())
+
+    __table_args__ = (
+        Index("ix_product_tombstones_txid_product_id",
+              "txid", "product_id"),
+    )
+
 
 class Attribute(Base):
     """Характеристика товара"""
@@ -0,0 +1,29 @@
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from app.data.slow_queries import slow_query_log
+from app.middleware.query_budget import query_budget
+from app.schemas.admin import QueryStatResponse
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries", response_model=List[QueryStatResponse])
+@query_budget(1)
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: Literal[
+        "total_ms", "max_ms", "mean_ms", "calls", "slow_calls"
+    ] = "total_ms",
+    current_user: dict = Depends(get_current_user),
+):
+    return slow_query_log.top(limit, order_by)
+
+
+@router.delete("/slow-queries")
+@query_budget(1)
+def reset_slow_queries(current_user: dict = Depends(get_current_user)):
+    slow_query_log.reset()
+    return {"detail": "Статистика запросов сброшена"}
@@ -0,0 +1,39 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.data.database import get_read_db
+from app.middleware.query_budget import query_budget
+from app.schemas.alerts import StockAlertFeed
+from app.schemas.warehouse import ProductResponse
+from app.services import alert_service, fast_json, product_service
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+
+@router.get("/events", response_model=StockAlertFeed)
+@query_budget(2)
+def get_alert_events(
+    after: Optional[str] = None,
+    limit: int = Query(
+        100, ge=1, le=alert_service.ALERT_EVENTS_LIMIT),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return alert_service.get_alert_events(db, after, limit)
+
+
+@router.get("/low-stock", response_model=List[ProductResponse])
+@query_budget(2)
+def get_low_stock_products(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    if fast_json.FAST_JSON_RESPONSES:
+        return fast_json.rows_response(alert_service.get_low_stock_products(
+            skip, limit, db, product_service.PRODUCT_COLUMNS))
+    return alert_service.get_low_stock_products(skip, limit, db)
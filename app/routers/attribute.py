@@ -3,17 +3,20 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.data.database import get_db
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.schemas import utils
 from app.schemas.warehouse import (
     AttributeCreate, AttributeResponse, AttributeUpdate
     )
-from app.services import attribute_service
+from app.services import attribute_service, fast_json
 from app.services.user_service import get_current_user
 
 router = APIRouter(prefix="/attributes", tags=["Attributes"])
 
 
 @router.post("/", response_model=AttributeResponse)
+@query_budget(5)
 def create_attribute(
     attribute: AttributeCreate,
     db: Session = Depends(get_db),
@@ -23,25 +26,32 @@ def create_attribute(
 
 
 @router.get("/", response_model=List[AttributeResponse])
+@query_budget(2)
 def get_attributes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    query_params: utils.QueryParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return attribute_service.get_attributes(skip, limit, db)
+    rows = attribute_service.get_attributes(skip, limit, db, query_params)
+    if query_params.fields:
+        return fast_json.rows_response(rows)
+    return rows
 
 
 @router.get("/{attribute_id}", response_model=AttributeResponse)
+@query_budget(2)
 def get_attribute(
     attribute_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
     return attribute_service.get_attribute(attribute_id, db)
 
 
 @router.patch("/{attribute_id}", response_model=AttributeResponse)
+@query_budget(4)
 def update_attribute(
     attribute_id: int,
     attribute_update: AttributeUpdate,
@@ -53,6 +63,7 @@ def update_attribute(
 
 
 @router.delete("/{attribute_id}")
+@query_budget(3)
 def delete_attribute(
     attribute_id: int,
     db: Session = Depends(get_db),
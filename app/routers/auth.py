@@ -5,20 +5,25 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.data.database import get_db
+from app.data.database import get_user_db, get_user_read_db
+from app.middleware.query_budget import query_budget
+from app.middleware.rate_limit import rate_limit
+from app.schemas import utils
 from app.schemas.users import (
     Token, UserCreate, UserInDB, UserResponse, UserUpdate
     )
-from app.services import user_service
+from app.services import fast_json, user_service
 
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=Token)
+@query_budget(1)
+@rate_limit(10, 60)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_user_db)
 ):
 
     user = user_service.authenticate_user(
@@ -32,12 +37,14 @@ async def login_for_access_token(
     access_token_expires = timedelta(
         minutes=user_service.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = user_service.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id},
+        expires_delta=access_token_expires,
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/users/me", response_model=UserResponse)
+@query_budget(1)
 async def read_users_me(
     current_user: UserResponse = Depends(user_service.get_current_user),
 ):
@@ -45,32 +52,40 @@ async def read_users_me(
 
 
 @router.get("/users/", response_model=List[UserResponse])
+@query_budget(2)
 def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    query_params: utils.QueryParams = Depends(),
+    db: Session = Depends(get_user_read_db),
     current_user: dict = Depends(user_service.get_current_user),
 ):
-    return user_service.get_all_users(skip, limit, db)
+    rows = user_service.get_all_users(skip, limit, db, query_params)
+    if query_params.fields:
+        return fast_json.rows_response(rows)
+    return rows
 
 
 @router.post("/register/", response_model=UserResponse)
-def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+@query_budget(4)
+def register_user(user_data: UserCreate, db: Session = Depends(get_user_db)):
     return user_service.register_handler(user_data, db)
 
 
 @router.patch("/users/{user_id}", response_model=UserResponse)
+@query_budget(6)
 def patch_user(user_id: int, user_data: UserUpdate,
-               db: Session = Depends(get_db),
+               db: Session = Depends(get_user_db),
                current_user: UserInDB = Depends(
                    user_service.get_current_user)):
     return user_service.update_user_handler(user_id, user_data, db)
 
 
 @router.delete("/users/{user_id}")
+@query_budget(5)
 def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_user_db),
     current_user: UserInDB = Depends(user_service.get_current_user),
 ):
     if not current_user.id or current_user.id != user_id:
@@ -3,17 +3,20 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.data.database import get_db
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.schemas import utils
 from app.schemas.warehouse import (
     CategoryCreate, CategoryResponse, CategoryUpdate
     )
-from app.services import category_service
+from app.services import category_service, fast_json
 from app.services.user_service import get_current_user
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.post("/", response_model=CategoryResponse)
+@query_budget(4)
 def create_category(
     category: CategoryCreate,
     db: Session = Depends(get_db),
@@ -23,25 +26,32 @@ def create_category(
 
 
 @router.get("/", response_model=List[CategoryResponse])
+@query_budget(2)
 def get_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    query_params: utils.QueryParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return category_service.get_categories(skip, limit, db)
+    rows = category_service.get_categories(skip, limit, db, query_params)
+    if query_params.fields:
+        return fast_json.rows_response(rows)
+    return rows
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
+@query_budget(2)
 def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
     return category_service.get_category(category_id, db)
 
 
 @router.patch("/{category_id}", response_model=CategoryResponse)
+@query_budget(5)
 def update_category(
     category_id: int,
     category_update: CategoryUpdate,
@@ -52,6 +62,7 @@ def update_category(
 
 
 @router.delete("/{category_id}")
+@query_budget(6)
 def delete_category(
     category_id: int,
     db: Session = Depends(get_db),
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services import warmup_service
+
+router = APIRouter(prefix="/health", tags=["Monitoring"])
+
+
+@router.get("/live", include_in_schema=False)
+def get_liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+def get_readiness():
+    """Готовность принимать трафик: только после прогрева процесса"""
+    state = warmup_service.state
+    body = {
+        "ready": state.ready,
+        "attempts": state.attempts,
+        "steps": state.steps,
+        "error": state.error,
+    }
+    return JSONResponse(body, status_code=200 if state.ready else 503)
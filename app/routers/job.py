@@ -0,0 +1,87 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.models.user import User
+from app.schemas.jobs import JobResponse
+from app.schemas.warehouse import BulkMoveCreate
+from app.services import job_service
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.post("/imports/products", response_model=JobResponse)
+@query_budget(3)
+def import_products(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return job_service.enqueue_product_import(
+        file.filename, file.file, db, current_user)
+
+
+@router.post("/exports/products", response_model=JobResponse)
+@query_budget(3)
+def export_products(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return job_service.enqueue_product_export(db, current_user)
+
+
+@router.post("/moves/products", response_model=JobResponse)
+@query_budget(4)
+def move_products(
+    move_data: BulkMoveCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return job_service.enqueue_bulk_move(move_data, db, current_user)
+
+
+@router.post("/archives/products", response_model=JobResponse)
+@query_budget(3)
+def archive_products(
+    days: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return job_service.enqueue_product_archive(days, db, current_user)
+
+
+@router.get("/", response_model=List[JobResponse])
+@query_budget(2)
+def get_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return job_service.get_jobs(skip, limit, db, current_user)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+@query_budget(2)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return job_service.get_job(job_id, db)
+
+
+@router.get("/{job_id}/download")
+@query_budget(2)
+def download_job_file(
+    job_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    path = job_service.get_job_file(job_id, db)
+    return FileResponse(path, filename=path.rsplit("/", 1)[-1])
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.middleware.metrics import metrics_registry
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(
+        generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -1,24 +1,40 @@
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter, Depends, File, Header, Query, Response, UploadFile
+)
 from sqlalchemy.orm import Session
 
-from app.data.database import get_db
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.middleware.rate_limit import rate_limit
 from app.models.user import User
 from app.schemas import utils
+from app.schemas.movements import (
+    StockHistoryDay, StockLevelResponse, StockMovementResponse
+)
+from app.schemas.stock import StockResponse
 from app.schemas.warehouse import (
+    ProductChanges,
     ProductCreate,
+    ProductImportReport,
     ProductMove,
     ProductResponse,
     ProductUpdate,
 )
-from app.services import product_service
+from app.services import (
+    fast_json, import_service, movement_service, product_service,
+    stock_service
+)
 from app.services.user_service import get_current_user
+from app.services.version_service import etag, parse_if_match
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
 @router.post("/", response_model=ProductResponse)
+@query_budget(9)
 def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
@@ -27,37 +43,127 @@ def create_product(
     return product_service.create_product(product, db, current_user)
 
 
+@router.post("/import", response_model=ProductImportReport)
+@query_budget(17)
+@rate_limit(5, 60)
+def import_products(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return import_service.import_products(
+        file.filename, file.file, db, current_user)
+
+
 @router.get("", response_model=List[ProductResponse])
 @router.get("/", response_model=List[ProductResponse])
+@query_budget(2)
 def get_products(
     query_params: utils.QueryParams = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
+    if fast_json.FAST_JSON_RESPONSES or query_params.fields:
+        return fast_json.rows_response(
+            product_service.get_product_rows(db, query_params))
     return product_service.get_products(db, query_params)
 
 
+@router.get("/changes", response_model=ProductChanges)
+@query_budget(3)
+def get_product_changes(
+    since: Optional[str] = None,
+    limit: int = Query(
+        product_service.CHANGES_LIMIT, ge=1,
+        le=product_service.CHANGES_LIMIT),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return product_service.get_product_changes(db, since, limit)
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
+@query_budget(2)
 def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    product = product_service.get_product_response(product_id, db)
+    response.headers["ETag"] = etag(product)
+    return product
+
+
+@router.get("/{product_id}/stock", response_model=List[StockResponse])
+@query_budget(2)
+def get_product_stock(
+    product_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return stock_service.get_product_stock(product_id, db)
+
+
+@router.get(
+    "/{product_id}/movements", response_model=List[StockMovementResponse])
+@query_budget(2)
+def get_product_movements(
+    product_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(
+        movement_service.MOVEMENTS_LIMIT, ge=1,
+        le=movement_service.MOVEMENTS_LIMIT),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return movement_service.get_movements(
+        product_id, db, since, until, limit)
+
+
+@router.get("/{product_id}/stock-level", response_model=StockLevelResponse)
+@query_budget(3)
+def get_product_stock_level(
+    product_id: int,
+    on_date: date = Query(..., alias="date"),
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return movement_service.get_stock_level(product_id, on_date, db)
+
+
+@router.get(
+    "/{product_id}/stock-history", response_model=List[StockHistoryDay])
+@query_budget(3)
+def get_product_stock_history(
+    product_id: int,
+    days: int = Query(90, ge=1, le=movement_service.HISTORY_MAX_DAYS),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return product_service.get_product(product_id, db)
+    return movement_service.get_stock_history(product_id, days, db)
 
 
 @router.patch("/{product_id}", response_model=ProductResponse)
+@query_budget(14)
 def update_product(
     product_id: int,
     product_update: ProductUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return product_service.update_product(
-        product_id, product_update, db, current_user)
+    product = product_service.update_product(
+        product_id, product_update, db, current_user,
+        parse_if_match(if_match))
+    response.headers["ETag"] = etag(product)
+    return product
 
 
 @router.delete("/{product_id}")
+@query_budget(4)
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
@@ -67,11 +173,16 @@ def delete_product(
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
+@query_budget(9)
 def put_product(
     product_id: int,
     move_data: ProductMove,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return product_service.move_product(
-        product_id, move_data, db, current_user)
+    product = product_service.move_product(
+        product_id, move_data, db, current_user, parse_if_match(if_match))
+    response.headers["ETag"] = etag(product)
+    return product
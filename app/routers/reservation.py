@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.models.user import User
+from app.schemas.reservations import ReservationCreate, ReservationResponse
+from app.services import reservation_service
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"])
+
+
+@router.post("/", response_model=ReservationResponse)
+@query_budget(5)
+def create_reservation(
+    reservation: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return reservation_service.create_reservation(
+        reservation, db, current_user)
+
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+@query_budget(2)
+def get_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return reservation_service.get_reservation(reservation_id, db)
+
+
+@router.post("/{reservation_id}/commit", response_model=ReservationResponse)
+@query_budget(7)
+def commit_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return reservation_service.commit_reservation(reservation_id, db)
+
+
+@router.post("/{reservation_id}/release", response_model=ReservationResponse)
+@query_budget(5)
+def release_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return reservation_service.release_reservation(reservation_id, db)
@@ -0,0 +1,32 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from app.middleware.query_budget import query_budget
+from app.middleware.rate_limit import rate_limit
+from app.schemas import utils
+from app.schemas.shards import ShardProductResponse, WarehouseSummary
+from app.services import shard_service
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/shards", tags=["Shards"])
+
+
+@router.get("/products", response_model=List[ShardProductResponse])
+@query_budget(2)
+@rate_limit(30, 60)
+def get_products(
+    query_params: utils.QueryParams = Depends(),
+    current_user: dict = Depends(get_current_user),
+):
+    return shard_service.get_products(query_params)
+
+
+@router.get(
+    "/warehouses/summary", response_model=List[WarehouseSummary])
+@query_budget(2)
+@rate_limit(30, 60)
+def get_warehouse_summary(
+    current_user: dict = Depends(get_current_user),
+):
+    return shard_service.get_warehouse_summary()
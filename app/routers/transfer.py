@@ -0,0 +1,44 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.models.user import User
+from app.schemas.stock import TransferCreate, TransferResponse
+from app.services import stock_service
+from app.services.user_service import get_current_user
+
+router = APIRouter(prefix="/transfers", tags=["Transfers"])
+
+
+@router.post("/", response_model=TransferResponse)
+@query_budget(10)
+def create_transfer(
+    transfer: TransferCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return stock_service.create_transfer(transfer, db, current_user)
+
+
+@router.get("/", response_model=List[TransferResponse])
+@query_budget(3)
+def get_transfers(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return stock_service.get_transfers(skip, limit, db)
+
+
+@router.get("/{transfer_id}", response_model=TransferResponse)
+@query_budget(3)
+def get_transfer(
+    transfer_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    return stock_service.get_transfer(transfer_id, db)
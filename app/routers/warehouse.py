@@ -1,19 +1,24 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from sqlalchemy.orm import Session
 
-from app.data.database import get_db
+from app.data.database import get_db, get_read_db
+from app.middleware.query_budget import query_budget
+from app.schemas import utils
+from app.schemas.stock import StockResponse
 from app.schemas.warehouse import (
     WarehouseCreate, WarehouseResponse, WarehouseUpdate
     )
-from app.services import warehouse_service
+from app.services import fast_json, stock_service, warehouse_service
+from app.services.version_service import etag, parse_if_match
 from app.services.user_service import get_current_user
 
 router = APIRouter(prefix="/warehouses", tags=["Warehouses"])
 
 
 @router.post("/", response_model=WarehouseResponse)
+@query_budget(3)
 def create_warehouse(
     warehouse: WarehouseCreate,
     db: Session = Depends(get_db),
@@ -23,36 +28,63 @@ def create_warehouse(
 
 
 @router.get("/", response_model=List[WarehouseResponse])
+@query_budget(2)
 def get_warehouses(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    query_params: utils.QueryParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return warehouse_service.get_warehouses(skip, limit, db)
+    rows = warehouse_service.get_warehouses(skip, limit, db, query_params)
+    if query_params.fields:
+        return fast_json.rows_response(rows)
+    return rows
 
 
 @router.get("/{warehouse_id}", response_model=WarehouseResponse)
+@query_budget(2)
 def get_warehouse(
     warehouse_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    warehouse = warehouse_service.get_warehouse_response(warehouse_id, db)
+    response.headers["ETag"] = etag(warehouse)
+    return warehouse
+
+
+@router.get("/{warehouse_id}/stock", response_model=List[StockResponse])
+@query_budget(2)
+def get_warehouse_stock(
+    warehouse_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return warehouse_service.get_warehouse(warehouse_id, db)
+    return stock_service.get_warehouse_stock(warehouse_id, skip, limit, db)
 
 
 @router.patch("/{warehouse_id}", response_model=WarehouseResponse)
+@query_budget(4)
 def update_warehouse(
     warehouse_id: int,
     warehouse_update: WarehouseUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return warehouse_service.update_warehouse(
-        warehouse_id, warehouse_update, db)
+    warehouse = warehouse_service.update_warehouse(
+        warehouse_id, warehouse_update, db, parse_if_match(if_match))
+    response.headers["ETag"] = etag(warehouse)
+    return warehouse
 
 
 @router.delete("/{warehouse_id}")
+@query_budget(4)
 def delete_warehouse(
     warehouse_id: int,
     db: Session = Depends(get_db),
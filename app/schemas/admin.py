@@ -0,0 +1,18 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class QueryStatResponse(BaseModel):
+    """Статистика по нормализованному SQL-запросу"""
+
+    fingerprint: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    slow_calls: int
+    routes: Dict[str, int]
+    last_slow_filter: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class StockAlertEventResponse(BaseModel):
+    """Смена состояния оповещения о низком остатке"""
+
+    id: int
+    product_id: int
+    state: str
+    available_quantity: int
+    threshold: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockAlertFeed(BaseModel):
+    """Порция ленты оповещений и курсор для следующего запроса"""
+
+    events: List[StockAlertEventResponse]
+    next_after: Optional[str] = None
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class StockMovementResponse(BaseModel):
+    """Запись журнала изменений остатка"""
+
+    id: int
+    product_id: int
+    warehouse_id: Optional[int] = None
+    delta: int
+    reason: str
+    reference_id: Optional[int] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StockLevelResponse(BaseModel):
+    """Остаток товара на конец дня"""
+
+    product_id: int
+    day: date
+    quantity: int
+
+
+class StockHistoryDay(BaseModel):
+    """Суточный итог в динамике остатка"""
+
+    day: date
+    quantity: int
+    net_change: int
+    movements: int
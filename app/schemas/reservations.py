@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+RESERVATION_MAX_TTL_SECONDS = 7 * 24 * 3600
+
+
+class ReservationCreate(BaseModel):
+    """Схема для резервирования товара"""
+
+    product_id: int
+    quantity: int = Field(gt=0)
+    ttl_seconds: Optional[int] = Field(
+        None, gt=0, le=RESERVATION_MAX_TTL_SECONDS)
+
+
+class ReservationResponse(BaseModel):
+    """Ответ API о резерве"""
+
+    id: int
+    product_id: int
+    quantity: int
+    status: str
+    expires_at: datetime
+    created_by: Optional[int] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict
+
+from app.schemas.warehouse import ProductResponse
+
+
+class ShardProductResponse(ProductResponse):
+    """Товар из общей выборки по всем шардам"""
+
+    shard: str
+
+
+class WarehouseSummary(BaseModel):
+    """Сводка по складу одного из шардов"""
+
+    shard: str
+    warehouse_id: int
+    name: str
+    products: int
+    quantity: int
+    low_stock: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+TRANSFER_MAX_LINES = 10_000
+
+
+class StockResponse(BaseModel):
+    """Остаток товара на складе"""
+
+    product_id: int
+    warehouse_id: int
+    quantity: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TransferLine(BaseModel):
+    """Строка перемещения"""
+
+    product_id: int
+    quantity: int = Field(gt=0)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TransferCreate(BaseModel):
+    """Схема для создания заказа на перемещение"""
+
+    source_warehouse_id: int
+    destination_warehouse_id: int
+    lines: List[TransferLine] = Field(
+        min_length=1, max_length=TRANSFER_MAX_LINES)
+
+
+class TransferResponse(BaseModel):
+    """Ответ API о заказе на перемещение"""
+
+    id: int
+    source_warehouse_id: int
+    destination_warehouse_id: int
+    status: str
+    created_by: Optional[int] = None
+    created_at: datetime
+    lines: List[TransferLine]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -10,6 +10,7 @@ class QueryParams(BaseModel):
     filter: Optional[str] = Field(default=None, alias="filter")
     sort: Optional[str] = Field(default=None, alias="sort")
     range: Optional[str] = Field(default=None, alias="range")
+    fields: Optional[str] = Field(default=None, alias="fields")
 
     def parse_sort(self) -> List[Dict[str, str]]:
         """Преобразует `sort` из строки в список"""
@@ -37,3 +38,12 @@ class QueryParams(BaseModel):
             except json.JSONDecodeError:
                 return {}
         return self.range or {}
+
+    def parse_fields(self) -> List[str]:
+        """Преобразует `fields` вида `id,quantity` в список без повторов"""
+        fields = []
+        for field in (self.fields or "").split(","):
+            field = field.strip()
+            if field and field not in fields:
+                fields.append(field)
+        return fields
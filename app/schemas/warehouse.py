@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class WarehouseCreate(BaseModel):
@@ -34,6 +34,7 @@ class WarehouseResponse(BaseModel):
     address: str
     description: Optional[str] = None
     is_active: Optional[bool] = None
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -43,6 +44,7 @@ class CategoryCreate(BaseModel):
 
     name: str
     is_active: Optional[bool] = True
+    reorder_threshold: Optional[int] = Field(None, ge=0)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -52,6 +54,7 @@ class CategoryUpdate(BaseModel):
 
     name: Optional[str] = None
     is_active: Optional[bool] = None
+    reorder_threshold: Optional[int] = Field(None, ge=0)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -62,6 +65,7 @@ class CategoryResponse(BaseModel):
     id: int
     name: str
     is_active: bool
+    reorder_threshold: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -73,6 +77,7 @@ class ProductCreate(BaseModel):
     category_id: Optional[int] = None
     warehouse_id: Optional[int] = None
     quantity: Optional[int] = None
+    reorder_threshold: Optional[int] = Field(None, ge=0)
     is_active: Optional[bool] = True
 
     model_config = ConfigDict(from_attributes=True)
@@ -85,6 +90,7 @@ class ProductUpdate(BaseModel):
     category_id: Optional[int] = None
     warehouse_id: Optional[int] = None
     quantity: Optional[int] = None
+    reorder_threshold: Optional[int] = Field(None, ge=0)
     is_active: Optional[bool] = None
 
     model_config = ConfigDict(from_attributes=True)
@@ -98,21 +104,67 @@ class ProductResponse(BaseModel):
     category_id: int
     warehouse_id: int
     quantity: Optional[int] = None
+    reserved_quantity: int = 0
+    available_quantity: int = 0
+    reorder_threshold: Optional[int] = None
+    low_stock: bool = False
     is_active: Optional[bool] = None
     created_at: datetime
     updated_at: datetime
     created_by: int
     updated_by: Optional[int] = None
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductTombstoneResponse(BaseModel):
+    """Удаленный товар в ленте изменений"""
+
+    product_id: int
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProductChanges(BaseModel):
+    """Порция изменений товаров после отметки `since`"""
+
+    changed: List[ProductResponse]
+    deleted: List[ProductTombstoneResponse]
+    next_since: Optional[str] = None
+
+
+class ProductImportError(BaseModel):
+    """Ошибка в строке файла импорта"""
+
+    row: int
+    error: str
+
+
+class ProductImportReport(BaseModel):
+    """Результат импорта товаров из файла"""
+
+    total_rows: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ProductImportError]
+
+
 class ProductMove(BaseModel):
     """Перемещение товара между складами"""
 
     destination_warehouse_id: int
 
 
+class BulkMoveCreate(BaseModel):
+    """Массовое перемещение товаров между складами"""
+
+    product_ids: List[int] = Field(min_length=1, max_length=1_000_000)
+    destination_warehouse_id: int
+
+
 class AttributeCreate(BaseModel):
     """Создание характеристики"""
 
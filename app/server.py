@@ -0,0 +1,45 @@
+"""Модель процессов для production-запуска (gunicorn + uvicorn-воркеры).
+
+Модуль читается мастером gunicorn до загрузки приложения, поэтому не
+импортирует ничего из `app`.
+"""
+import os
+from typing import Tuple
+
+POOL_OVERFLOW_SHARE = 3
+
+
+def cpu_count() -> int:
+    """Число CPU, доступных процессу (с учетом привязки к ядрам)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(cpus: int, configured: str = None) -> int:
+    """Число воркеров: явное значение или по одному на CPU.
+
+    Запросы выполняются в пуле потоков воркера, поэтому больше процессов
+    на ядро нужно только для CPU-нагрузки (bcrypt, сериализация), которая
+    и так занимает ядро целиком.
+    """
+    if configured:
+        return max(1, int(configured))
+    return max(1, cpus)
+
+
+def pool_limits(budget: int, workers: int) -> Tuple[int, int]:
+    """`(pool_size, max_overflow)` одного воркера из общего бюджета
+    соединений к одной БД; треть доли воркера — соединения сверх пула.
+
+    Каждому воркеру нужно хотя бы одно соединение, поэтому бюджет меньше
+    числа воркеров — ошибка конфигурации, а не повод превысить бюджет.
+    """
+    if budget < workers:
+        raise ValueError(
+            f"DB_CONNECTION_BUDGET={budget} меньше числа воркеров "
+            f"{workers}: увеличьте бюджет или уменьшите WEB_CONCURRENCY")
+    per_worker = budget // workers
+    overflow = per_worker // POOL_OVERFLOW_SHARE
+    return per_worker - overflow, overflow
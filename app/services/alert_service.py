@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.alert import StockAlertEvent
+from app.models.warehouse import Product
+from app.services import change_feed
+
+ALERT_EVENTS_LIMIT = 1000
+IDS_SCOPE = "SELECT unnest(CAST(:ids AS integer[]))"
+
+EVALUATE_SQL = """
+WITH evaluated AS (
+    SELECT
+        p.id,
+        p.quantity - p.reserved_quantity AS available_quantity,
+        coalesce(p.reorder_threshold, c.reorder_threshold) AS threshold
+    FROM products p
+    LEFT JOIN categories c ON c.id = p.category_id
+    WHERE p.id IN ({scope}) AND p.deleted_at IS NULL
+), changed AS (
+    UPDATE products p SET low_stock = NOT p.low_stock
+    FROM evaluated e
+    WHERE p.id = e.id
+      AND p.low_stock
+          <> coalesce(e.available_quantity <= e.threshold, false)
+    RETURNING p.id, p.low_stock, e.available_quantity, e.threshold
+)
+INSERT INTO stock_alert_events (
+    product_id, state, available_quantity, threshold, created_at)
+SELECT
+    id, CASE WHEN low_stock THEN 'low' ELSE 'ok' END,
+    available_quantity, threshold, :now
+FROM changed
+"""
+
+
+def evaluate_products(
+    db: Session, product_ids: Optional[Iterable[int]] = None,
+    scope: str = IDS_SCOPE, params: Optional[dict] = None,
+):
+    """Пересчитывает состояние оповещений только для измененных товаров.
+
+    Товары задаются списком `product_ids` или подзапросом `scope` с
+    параметрами `params`. Порог товара важнее порога категории; смена
+    состояния пишется в ленту `stock_alert_events` в текущей транзакции.
+    """
+    params = dict(params or {}, now=datetime.utcnow())
+    if product_ids is not None:
+        params["ids"] = list(product_ids)
+        if not params["ids"]:
+            return
+    db.execute(text(EVALUATE_SQL.format(scope=scope)), params)
+
+
+def get_alert_events(
+    db: Session, after: Optional[str] = None, limit: int = 100
+):
+    """Лента смен состояния оповещений после курсора `after`
+    (`<txid>,<id>`, см. `change_feed.feed_query`)"""
+    try:
+        events = change_feed.feed_query(
+            db.query(StockAlertEvent),
+            StockAlertEvent.txid, StockAlertEvent.id, after,
+        ).limit(limit).all()
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
+    return {
+        "events": events,
+        "next_after": (
+            change_feed.make_cursor(events[-1].txid, events[-1].id)
+            if events else after),
+    }
+
+
+def get_low_stock_products(skip: int, limit: int, db: Session, columns=None):
+    """Товары с активным оповещением о низком остатке"""
+    try:
+        return (
+            (db.query(*columns) if columns else db.query(Product))
+            .filter_by(low_stock=True, deleted_at=None)
+            .order_by(Product.id).offset(skip).limit(limit).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
@@ -0,0 +1,103 @@
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import movement_service
+
+PRODUCT_ARCHIVE_AFTER_DAYS = int(
+    os.getenv("PRODUCT_ARCHIVE_AFTER_DAYS", "180"))
+
+PRODUCT_COLUMNS = (
+    "id, name, category_id, warehouse_id, quantity, reserved_quantity, "
+    "is_active, created_by, updated_by, created_at, updated_at, version, "
+    "deleted_at"
+)
+ATTRIBUTE_COLUMNS = "id, name, value, product_id"
+
+CANDIDATES_SQL = """
+SELECT p.id FROM products p
+WHERE p.id > :last_id
+  AND (
+    p.deleted_at < :cutoff
+    OR (
+        p.is_active = false
+        AND p.updated_at < :cutoff
+        AND p.reserved_quantity = 0
+        AND NOT EXISTS (
+            SELECT 1 FROM warehouse_stock ws
+            WHERE ws.product_id = p.id AND ws.quantity > 0
+        )
+    )
+  )
+ORDER BY p.id
+LIMIT :limit
+FOR UPDATE SKIP LOCKED
+"""
+
+ARCHIVE_ATTRIBUTES_SQL = f"""
+WITH moved AS (
+    DELETE FROM attributes WHERE product_id = ANY(:ids)
+    RETURNING {ATTRIBUTE_COLUMNS}
+)
+INSERT INTO attributes_archive ({ATTRIBUTE_COLUMNS}, archived_at)
+SELECT {ATTRIBUTE_COLUMNS}, :now FROM moved
+"""
+
+REMAINING_STOCK_SQL = """
+SELECT product_id, warehouse_id, -quantity AS delta FROM warehouse_stock
+WHERE product_id = ANY(:ids) AND quantity <> 0
+"""
+
+ARCHIVE_PRODUCTS_SQL = f"""
+WITH moved AS (
+    DELETE FROM products WHERE id = ANY(:ids)
+    RETURNING {PRODUCT_COLUMNS}
+)
+INSERT INTO products_archive ({PRODUCT_COLUMNS}, archived_at)
+SELECT {PRODUCT_COLUMNS}, :now FROM moved
+"""
+
+
+def archive_cutoff(days: Optional[int] = None) -> datetime:
+    return datetime.utcnow() - timedelta(
+        days=PRODUCT_ARCHIVE_AFTER_DAYS if days is None else days)
+
+
+def archive_products(
+    db: Session, cutoff: datetime, chunk_size: int,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Переносит товары, удаленные или неактивные дольше `cutoff`, вместе
+    с характеристиками в архивные таблицы.
+
+    Каждая порция из `chunk_size` товаров — отдельная транзакция.
+    Неактивные товары с остатком на складах или резервами не трогаются;
+    остаток удаленных товаров списывается движением `archive`, чтобы
+    журнал сходился с остатками после каскадного удаления
+    `warehouse_stock`.
+    Для архивированных, но не удаленных товаров отметку удаления для
+    инкрементальной синхронизации пишет триггер `products_write_tombstone`.
+    """
+    archived, last_id = 0, 0
+    while True:
+        ids = db.execute(
+            text(CANDIDATES_SQL),
+            {"last_id": last_id, "cutoff": cutoff, "limit": chunk_size},
+        ).scalars().all()
+        if not ids:
+            db.rollback()
+            return archived
+        params = {"ids": ids, "now": datetime.utcnow()}
+        db.execute(text(ARCHIVE_ATTRIBUTES_SQL), params)
+        remaining = db.execute(text(REMAINING_STOCK_SQL), params)
+        movement_service.record_movements(
+            db, [dict(row) for row in remaining.mappings()], "archive")
+        db.execute(text(ARCHIVE_PRODUCTS_SQL), params)
+        db.commit()
+        archived += len(ids)
+        last_id = ids[-1]
+        if on_chunk is not None:
+            on_chunk(archived)
@@ -1,16 +1,22 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.warehouse import Attribute, Product
+from app.schemas.utils import QueryParams
 from app.schemas.warehouse import AttributeCreate, AttributeUpdate
+from app.services import filter_service
+
+ATTRIBUTE_FIELDS = ("id", "name", "value", "product_id")
 
 
 def create_attribute(attribute_data: AttributeCreate, db: Session):
     """Создание нового атрибута товара"""
     try:
         product = db.query(Product).filter_by(
-            id=attribute_data.product_id).first()
+            id=attribute_data.product_id, deleted_at=None).first()
         if not product:
             raise HTTPException(status_code=400, detail="Товар не найден")
         attribute = (
@@ -33,14 +39,16 @@ def create_attribute(attribute_data: AttributeCreate, db: Session):
             status_code=500, detail=f"Ошибка базы данных: {str(e)}")
 
 
-def get_attributes(skip: int, limit: int, db: Session):
-    """Получение списка атрибутов с пагинацией"""
-    try:
-        return db.query(Attribute).offset(skip).limit(limit).all()
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
-        )
+def get_attributes(
+    skip: int, limit: int, db: Session,
+    query_params: Optional[QueryParams] = None,
+):
+    """Получение списка атрибутов с пагинацией, фильтрами и сортировкой
+    из `QueryParams`"""
+    return filter_service.get_filtered_data(
+        db, Attribute, query_params or QueryParams(), ATTRIBUTE_FIELDS,
+        skip, limit,
+    )
 
 
 def get_attribute(attribute_id: int, db: Session):
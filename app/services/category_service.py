@@ -1,9 +1,20 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.warehouse import Category
+from app.schemas.utils import QueryParams
 from app.schemas.warehouse import CategoryCreate, CategoryUpdate
+from app.services import alert_service, filter_service
+
+CATEGORY_FIELDS = ("id", "name", "is_active", "reorder_threshold")
+
+CATEGORY_PRODUCTS_SQL = (
+    "SELECT id FROM products "
+    "WHERE category_id = :category_id AND deleted_at IS NULL"
+)
 
 
 def create_category(category_data: CategoryCreate, db: Session):
@@ -29,14 +40,16 @@ def create_category(category_data: CategoryCreate, db: Session):
             status_code=500, detail=f"Ошибка базы данных: {str(e)}")
 
 
-def get_categories(skip: int, limit: int, db: Session):
-    """Получение списка категорий с пагинацией"""
-    try:
-        return db.query(Category).offset(skip).limit(limit).all()
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
-        )
+def get_categories(
+    skip: int, limit: int, db: Session,
+    query_params: Optional[QueryParams] = None,
+):
+    """Получение списка категорий с пагинацией, фильтрами и сортировкой
+    из `QueryParams`"""
+    return filter_service.get_filtered_data(
+        db, Category, query_params or QueryParams(), CATEGORY_FIELDS,
+        skip, limit,
+    )
 
 
 def get_category(category_id: int, db: Session):
@@ -60,6 +73,12 @@ def update_category(
         setattr(category, key, value)
 
     try:
+        if "reorder_threshold" in updated_data:
+            db.flush()
+            alert_service.evaluate_products(
+                db, scope=CATEGORY_PRODUCTS_SQL,
+                params={"category_id": category_id},
+            )
         db.commit()
         db.refresh(category)
         return category
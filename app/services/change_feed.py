@@ -0,0 +1,39 @@
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_
+
+
+def committed_horizon():
+    """`xmin` снимка: транзакции с меньшими номерами уже завершены, и их
+    записи не появятся в ленте задним числом"""
+    return func.txid_snapshot_xmin(func.txid_current_snapshot())
+
+
+def parse_cursor(cursor: str) -> Tuple[int, int]:
+    """Разбирает курсор ленты вида `<txid>,<id>`"""
+    try:
+        txid, row_id = cursor.split(",")
+        return int(txid), int(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Неверный формат курсора ленты")
+
+
+def make_cursor(txid: int, row_id: int) -> str:
+    return f"{txid},{row_id}"
+
+
+def feed_query(query, txid_column, id_column, cursor: Optional[str]):
+    """Записи после курсора в порядке `(txid, id)`, только из транзакций
+    ниже `committed_horizon`.
+
+    Порядок по номеру транзакции, а не по времени или id из
+    последовательности, и граница по снимку гарантируют, что запись,
+    зафиксированная позже соседних, окажется после курсора клиента.
+    """
+    query = query.filter(txid_column < committed_horizon())
+    if cursor:
+        query = query.filter(
+            tuple_(txid_column, id_column) > tuple_(*parse_cursor(cursor)))
+    return query.order_by(txid_column, id_column)
@@ -0,0 +1,39 @@
+import os
+from typing import Iterable, List, Type
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FAST_JSON_RESPONSES = orjson is not None and os.getenv(
+    "FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+
+def schema_columns(model, schema: Type[BaseModel], **expressions) -> List:
+    """Столбцы модели под поля схемы ответа, помеченные именами полей.
+
+    Поля, которых нет среди столбцов таблицы (свойства модели), задаются
+    SQL-выражениями в `expressions`.
+    """
+    columns = []
+    for name in schema.model_fields:
+        expression = expressions.get(name)
+        if expression is None:
+            expression = model.__table__.c[name]
+        columns.append(expression.label(name))
+    return columns
+
+
+def rows_response(rows: Iterable) -> Response:
+    """Ответ из строк выборки столбцов без Pydantic-валидации каждой строки;
+    формат совпадает с `model_dump(mode="json")` схемы"""
+    content = [row._asdict() for row in rows]
+    if orjson is None:
+        return JSONResponse(jsonable_encoder(content))
+    return Response(orjson.dumps(content), media_type="application/json")
@@ -1,21 +1,61 @@
-from typing import Any, Dict, List, Type
+import heapq
+import logging
+import os
+from collections import OrderedDict
+from functools import cmp_to_key
+from itertools import islice
+from threading import Lock
+from typing import Any, Collection, Dict, Iterable, List, Optional, Type
+from fastapi import HTTPException
+from sqlalchemy import String
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Query, Session
 
+from app.data import query_stats
 from app.schemas.utils import QueryParams
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_LIMIT = 100
+MAX_LIMIT = int(os.getenv("QUERY_MAX_LIMIT", "1000"))
+QUERY_COST_MODE = os.getenv("QUERY_COST_MODE", "reject")
+BINARY_COLLATION = "C"
+QUERY_COST_LIMIT = float(os.getenv("QUERY_COST_LIMIT", "100000"))
+QUERY_COST_CAPPED_LIMIT = int(os.getenv("QUERY_COST_CAPPED_LIMIT", "100"))
+COST_CACHE_SIZE = 1024
+QUERY_CANCELED = "57014"
+
+_cost_cache: "OrderedDict[tuple, float]" = OrderedDict()
+_cost_lock = Lock()
+
 
+def check_allowed(field: str, allowed: Optional[Collection[str]]):
+    """Поле должно входить в белый список модели, если он задан"""
+    if allowed is not None and field not in allowed:
+        raise ValueError(f"Поле `{field}` недоступно для фильтра и сортировки")
 
-def apply_filters(query: Query, model, filters: Dict[str, Any]) -> Query:
-    """Применяет фильтры к SQLAlchemy-запросу"""
+
+def apply_filters(
+    query: Query, model, filters: Dict[str, Any],
+    allowed: Optional[Collection[str]] = None,
+) -> Query:
+    """Применяет фильтры к SQLAlchemy-запросу; неверное условие или
+    неизвестный оператор — ValueError (400), а не пропуск фильтра"""
     if not filters:
         return query
+    if not isinstance(filters, dict):
+        raise ValueError("Filter must be an object of field conditions")
 
     for field, condition in filters.items():
+        check_allowed(field, allowed)
         column = getattr(model, field, None)
         if not column:
             raise ValueError(
                 f"Field '{field}' not found in model {model.__name__}")
+        if not isinstance(condition, dict):
+            raise ValueError(
+                f"Condition for '{field}' must be an object like "
+                f'{{"EQUAL": value}}')
 
         for operator, value in condition.items():
             if operator == "NOT":
@@ -43,26 +83,41 @@ def apply_filters(query: Query, model, filters: Dict[str, Any]) -> Query:
                 if not isinstance(value, list) or len(value) != 2:
                     raise ValueError("BETWEEN must be a list with two values")
                 query = query.filter(column.between(value[0], value[1]))
+            else:
+                raise ValueError(
+                    f"Unknown filter operator '{operator}' for '{field}'")
 
     return query
 
 
-def apply_sorting(query: Query, model, sorting: List[Dict[str, str]]) -> Query:
-    """Применяет сортировку к SQLAlchemy-запросу"""
+def apply_sorting(
+    query: Query, model, sorting: List[Dict[str, str]],
+    allowed: Optional[Collection[str]] = None,
+    collation: Optional[str] = None,
+) -> Query:
+    """Применяет сортировку к SQLAlchemy-запросу; строковые поля с
+    `collation` сравниваются по этому правилу сортировки"""
     if not sorting:
-        print("⚠️ Нет параметров сортировки!")
         return query
 
-    print(f"🛠 Применяем сортировку: {sorting}")
+    logger.debug("Применяем сортировку: %s", sorting)
+    if not isinstance(sorting, list):
+        raise ValueError(" `sort` должен быть списком условий сортировки")
 
     order_by_clauses = []
 
     for sort_param in sorting:
+        if not isinstance(sort_param, dict):
+            raise ValueError(
+                f" Условие сортировки должно быть объектом вида "
+                f'{{"field": ..., "order": ...}}: {sort_param!r}')
         field = sort_param.get("field")
-        order = sort_param.get("order", "ASC").upper()
+        order = sort_param.get("order", "ASC")
+        order = order.upper() if isinstance(order, str) else order
 
         if not field:
             raise ValueError(" Поле `field` обязательно для сортировки!")
+        check_allowed(field, allowed)
 
         column = getattr(model, field, None)
         if not column:
@@ -75,36 +130,229 @@ def apply_sorting(query: Query, model, sorting: List[Dict[str, str]]) -> Query:
                 f"{order}. Ожидается 'ASC' или 'DESC'."
             )
 
+        if collation and isinstance(column.type, String):
+            column = column.collate(collation)
         order_by_clauses.append(
             column.asc() if order == "ASC" else column.desc())
 
-    query = query.order_by(*order_by_clauses)
+    return query.order_by(*order_by_clauses)
 
-    print(f"✅ Итоговый SQL-запрос с сортировкой: {str(query)}")
-    return query
 
+def select_fields(columns: List, fields: List[str]) -> List:
+    """Оставляет из размеченных столбцов только поля из `fields`"""
+    available = {column.name: column for column in columns}
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(
+            f"Поля недоступны для выборки: {', '.join(unknown)}")
+    return [available[field] for field in fields]
 
-def apply_range(query: Query, range_params: Dict[str, int]) -> Query:
-    if not range_params:
-        return query
 
+def model_columns(model) -> List:
+    """Все столбцы таблицы модели, помеченные именами атрибутов"""
+    return [
+        getattr(model, column.key).label(column.key)
+        for column in model.__mapper__.column_attrs
+    ]
+
+
+def compare_rows(a, b, sorting: List[Dict[str, str]]) -> int:
+    """Сравнивает записи по спецификации `apply_sorting`; NULL, как в
+    PostgreSQL, больше любого значения. Строки сравниваются по кодовым
+    точкам, как в PostgreSQL с `BINARY_COLLATION`"""
+    for sort_param in sorting:
+        field = sort_param.get("field")
+        left = getattr(a, field)
+        right = getattr(b, field)
+        left_key, right_key = (left is None, left), (right is None, right)
+        result = (left_key > right_key) - (left_key < right_key)
+        if sort_param.get("order", "ASC").upper() == "DESC":
+            result = -result
+        if result:
+            return result
+    return 0
+
+
+def merge_sorted(
+    sequences: Iterable[List], sorting: List[Dict[str, str]],
+    offset: int = 0, limit: int = DEFAULT_LIMIT,
+) -> List:
+    """Сливает списки, уже упорядоченные `apply_sorting` с
+    `BINARY_COLLATION`, в одну страницу"""
+    key = cmp_to_key(lambda a, b: compare_rows(a, b, sorting or []))
+    merged = heapq.merge(*sequences, key=key)
+    return list(islice(merged, offset, offset + limit))
+
+
+def page_bounds(range_params: Dict[str, int]):
+    """Смещение и размер страницы; без `range` — не больше `MAX_LIMIT`
+    записей, запрошенный размер тоже урезается до `MAX_LIMIT`"""
+    if not range_params:
+        return 0, MAX_LIMIT
+    if not isinstance(range_params, dict):
+        raise ValueError(
+            '`range` должен быть объектом вида {"offset": 0, "limit": 100}')
     limit = range_params.get("limit", DEFAULT_LIMIT)
     offset = range_params.get("offset", 0)
+    if not isinstance(limit, int) or not isinstance(offset, int) or (
+            limit < 0 or offset < 0):
+        raise ValueError(
+            "`offset` и `limit` должны быть неотрицательными целыми")
+    return offset, min(limit, MAX_LIMIT)
 
-    query = query.offset(offset).limit(limit)
-    return query
+
+def apply_range(query: Query, range_params: Dict[str, int]) -> Query:
+    offset, limit = page_bounds(range_params)
+    if offset:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+
+def query_shape(
+    model, query_params: QueryParams, offset: int, limit: int,
+) -> tuple:
+    """Форма запроса без значений: поля и операторы фильтра, сортировка,
+    выбранные поля, размер страницы и порядок смещения (степень двойки):
+    глубокая страница стоит дороже первой и оценивается отдельно.
+    `offset` и `limit` — фактически примененные к запросу"""
+    filters = query_params.parse_filter()
+    return (
+        model.__name__,
+        tuple(sorted(
+            (field, tuple(sorted(condition)))
+            for field, condition in filters.items()
+        )),
+        tuple(
+            (sort_param.get("field"), sort_param.get("order", "ASC").upper())
+            for sort_param in query_params.parse_sort()
+        ),
+        tuple(query_params.parse_fields()),
+        limit,
+        offset.bit_length(),
+    )
+
+
+def explain_cost(db: Session, query: Query) -> float:
+    """Оценка стоимости запроса планировщиком PostgreSQL"""
+    compiled = query.statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    with query_stats.untracked():
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params,
+        ).scalar()
+    return plan[0]["Plan"]["Total Cost"]
+
+
+def shape_cost(db: Session, query: Query, shape: tuple) -> float:
+    """Стоимость по кешу форм запроса; EXPLAIN — только для новой формы"""
+    with _cost_lock:
+        if shape in _cost_cache:
+            _cost_cache.move_to_end(shape)
+            return _cost_cache[shape]
+    cost = explain_cost(db, query)
+    with _cost_lock:
+        _cost_cache[shape] = cost
+        if len(_cost_cache) > COST_CACHE_SIZE:
+            _cost_cache.popitem(last=False)
+    return cost
+
+
+def guard_query(db: Session, query: Query, shape: tuple) -> Query:
+    """Проверяет стоимость клиентского запроса перед выполнением.
+
+    Режимы `QUERY_COST_MODE`: `reject` — 400 при стоимости выше
+    `QUERY_COST_LIMIT`, `cap` — страница урезается до
+    `QUERY_COST_CAPPED_LIMIT` с тем же смещением, а фактический размер
+    страницы отдается клиенту в заголовке `X-Range-Limit`; `off` — без
+    проверки. Работает только на PostgreSQL.
+    """
+    if QUERY_COST_MODE == "off" or db.get_bind().dialect.name != "postgresql":
+        return query
+    cost = shape_cost(db, query, shape)
+    if cost <= QUERY_COST_LIMIT:
+        return query
+    logger.warning(
+        "Запрос формы %s дороже бюджета: %.0f > %.0f",
+        shape, cost, QUERY_COST_LIMIT,
+    )
+    if QUERY_COST_MODE == "cap":
+        limit = min(shape[4], QUERY_COST_CAPPED_LIMIT)
+        stats = query_stats.current_stats()
+        if stats is not None:
+            stats.range_limit = limit
+        return query.limit(limit)
+    raise HTTPException(
+        status_code=400,
+        detail="Слишком дорогой запрос: уточните фильтр или уменьшите range",
+    )
+
+
+def read_error(e: SQLAlchemyError) -> HTTPException:
+    """Ошибка чтения для клиента; отмена по `statement_timeout` — 503"""
+    if getattr(getattr(e, "orig", None), "pgcode", None) == QUERY_CANCELED:
+        return HTTPException(
+            status_code=503,
+            detail="Запрос выполнялся дольше допустимого, уточните фильтр",
+        )
+    return HTTPException(
+        status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}")
+
+
+def query_page(
+    query_params: QueryParams, skip: int = 0, limit: int = DEFAULT_LIMIT,
+) -> Dict[str, int]:
+    """Страница из `range`, а без него — из `skip`/`limit`"""
+    return query_params.parse_range() or {"offset": skip, "limit": limit}
+
+
+def apply_query_params(
+    query: Query, model, query_params: Optional[QueryParams],
+    allowed: Optional[Collection[str]] = None,
+    skip: int = 0, limit: int = DEFAULT_LIMIT,
+) -> Query:
+    """Фильтры, сортировка и страница из `QueryParams`; без `range`
+    страница задается `skip`/`limit`"""
+    query_params = query_params or QueryParams()
+    query = apply_filters(
+        query, model, query_params.parse_filter(), allowed)
+    query = apply_sorting(query, model, query_params.parse_sort(), allowed)
+    return apply_range(query, query_page(query_params, skip, limit))
 
 
 def get_filtered_data(
     db: Session,
     model: Type,
     query_params: QueryParams,
+    allowed: Optional[Collection[str]] = None,
+    skip: int = 0,
+    limit: int = DEFAULT_LIMIT,
 ) -> List:
-    """Применяет фильтрацию, сортировку и пагинацию к модели"""
-    query = db.query(model)
+    """Применяет фильтрацию, сортировку и пагинацию к модели.
 
-    query = apply_filters(query, model, query_params.filter)
-    query = apply_sorting(query, model, query_params.sort)
-    query = apply_range(query, query_params.range)
+    С `fields` выбираются только эти столбцы, результат — строки, а не
+    объекты модели. Ошибки параметров запроса — HTTP 400.
+    """
+    try:
+        fields = query_params.parse_fields()
+        if fields:
+            columns = [
+                column for column in model_columns(model)
+                if allowed is None or column.name in allowed
+            ]
+            query = db.query(*select_fields(columns, fields))
+        else:
+            query = db.query(model)
+        query = apply_query_params(
+            query, model, query_params, allowed, skip, limit)
+        offset, limit = page_bounds(query_page(query_params, skip, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return query.all()
+    try:
+        query = guard_query(
+            db, query, query_shape(model, query_params, offset, limit))
+        return query.all()
+    except SQLAlchemyError as e:
+        raise read_error(e)
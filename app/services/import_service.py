@@ -0,0 +1,299 @@
+import codecs
+import csv
+import os
+from datetime import datetime
+from typing import IO, Iterator, List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.data.bulk import copy_rows
+from app.models.user import User
+from app.services import alert_service
+
+IMPORT_COLUMNS = ("name", "category", "warehouse", "quantity", "is_active")
+IMPORT_ERROR_LIMIT = 1000
+STAGING_TABLE = "product_import_staging"
+STAGING_COLUMNS = ("row_number",) + IMPORT_COLUMNS + ("error",)
+
+TRUE_VALUES = ("", "1", "true", "yes", "да")
+FALSE_VALUES = ("0", "false", "no", "нет")
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMPORARY TABLE {STAGING_TABLE} (
+    row_number integer PRIMARY KEY,
+    name text,
+    category text,
+    warehouse text,
+    quantity text,
+    is_active text,
+    error text,
+    category_id integer,
+    warehouse_id integer
+) ON COMMIT DROP
+"""
+
+VALIDATION_SQL = [
+    ("Не указано название товара",
+     "coalesce(trim(s.name), '') = ''"),
+    ("Количество должно быть целым неотрицательным числом",
+     r"coalesce(nullif(trim(s.quantity), ''), '0') !~ '^\d{1,9}$'"),
+    ("Неверное значение is_active",
+     "NOT lower(trim(coalesce(s.is_active, ''))) "
+     "= ANY(:true_values || :false_values)"),
+    ("Категория не найдена", "s.category_id IS NULL"),
+    ("Склад не найден", "s.warehouse_id IS NULL"),
+    ("Товар повторяется в файле",
+     f"EXISTS (SELECT 1 FROM {STAGING_TABLE} d "
+     f"WHERE trim(d.name) = trim(s.name) "
+     f"AND d.row_number < s.row_number AND d.error IS NULL)"),
+]
+
+RESOLVE_SQL = [
+    f"UPDATE {STAGING_TABLE} s SET category_id = c.id "
+    f"FROM categories c WHERE c.name = trim(s.category)",
+    f"UPDATE {STAGING_TABLE} s SET warehouse_id = w.id "
+    f"FROM warehouses w WHERE w.name = trim(s.warehouse)",
+]
+
+MERGE_SQL = f"""
+WITH merged AS (
+    INSERT INTO products (
+        name, category_id, warehouse_id, quantity, is_active,
+        created_by, updated_by, created_at, updated_at
+    )
+    SELECT
+        trim(s.name), s.category_id, s.warehouse_id,
+        coalesce(nullif(trim(s.quantity), ''), '0')::integer,
+        lower(trim(coalesce(s.is_active, ''))) = ANY(:true_values),
+        :user_id, :user_id,
+        timezone('utc', now()), timezone('utc', now())
+    FROM {STAGING_TABLE} s
+    WHERE s.error IS NULL
+    ON CONFLICT (name) WHERE deleted_at IS NULL DO UPDATE SET
+        category_id = EXCLUDED.category_id,
+        warehouse_id = EXCLUDED.warehouse_id,
+        quantity = EXCLUDED.quantity,
+        is_active = EXCLUDED.is_active,
+        updated_by = EXCLUDED.updated_by,
+        updated_at = EXCLUDED.updated_at,
+        version = products.version + 1
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated
+FROM merged
+"""
+
+MOVEMENTS_SQL = f"""
+WITH changes AS (
+    SELECT
+        p.id AS product_id, s.warehouse_id,
+        coalesce(nullif(trim(s.quantity), ''), '0')::integer
+        - coalesce(ws.quantity, 0) AS delta
+    FROM {STAGING_TABLE} s
+    JOIN products p ON p.name = trim(s.name) AND p.deleted_at IS NULL
+    LEFT JOIN warehouse_stock ws
+        ON ws.product_id = p.id AND ws.warehouse_id = s.warehouse_id
+    WHERE s.error IS NULL
+), logged AS (
+    INSERT INTO stock_movements (
+        product_id, warehouse_id, delta, reason, created_by, created_at)
+    SELECT product_id, warehouse_id, delta, 'import', :user_id, :now
+    FROM changes WHERE delta <> 0
+)
+INSERT INTO stock_daily (product_id, day, net_change, movements)
+SELECT product_id, CAST(:now AS date), sum(delta), count(*)
+FROM changes WHERE delta <> 0
+GROUP BY product_id
+ON CONFLICT (product_id, day) DO UPDATE SET
+    net_change = stock_daily.net_change + EXCLUDED.net_change,
+    movements = stock_daily.movements + EXCLUDED.movements
+"""
+
+IMPORTED_PRODUCTS_SQL = f"""
+SELECT p.id FROM products p
+JOIN {STAGING_TABLE} s ON trim(s.name) = p.name AND s.error IS NULL
+WHERE p.deleted_at IS NULL
+"""
+
+STOCK_SQL = f"""
+INSERT INTO warehouse_stock (product_id, warehouse_id, quantity)
+SELECT
+    p.id, s.warehouse_id,
+    coalesce(nullif(trim(s.quantity), ''), '0')::integer
+FROM {STAGING_TABLE} s
+JOIN products p ON p.name = trim(s.name) AND p.deleted_at IS NULL
+WHERE s.error IS NULL
+ON CONFLICT (product_id, warehouse_id) DO UPDATE SET
+    quantity = EXCLUDED.quantity
+"""
+
+TOTALS_SQL = f"""
+UPDATE products p SET quantity = t.quantity
+FROM (
+    SELECT ws.product_id, sum(ws.quantity) AS quantity
+    FROM warehouse_stock ws
+    JOIN products p2 ON p2.id = ws.product_id AND p2.deleted_at IS NULL
+    JOIN {STAGING_TABLE} s ON trim(s.name) = p2.name AND s.error IS NULL
+    GROUP BY ws.product_id
+) t
+WHERE p.id = t.product_id AND p.quantity <> t.quantity
+"""
+
+
+def normalize_header(header: Sequence) -> List[str]:
+    return [str(cell or "").strip().lower() for cell in header]
+
+
+def cell_to_text(value):
+    """Значение ячейки как текст; целые числа из XLSX без `.0`"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def rows_with_errors(
+    header: Sequence, rows: Iterator[Sequence]
+) -> Iterator[tuple]:
+    """Строки файла в колонках промежуточной таблицы; строки неверной
+    структуры попадают в отчет об ошибках, не прерывая загрузку"""
+    columns = normalize_header(header)
+    missing = [
+        column for column in IMPORT_COLUMNS[:3] if column not in columns]
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"В файле нет обязательных колонок: {', '.join(missing)}",
+        )
+    positions = [
+        columns.index(column) if column in columns else None
+        for column in IMPORT_COLUMNS
+    ]
+    for row_number, row in enumerate(rows, start=2):
+        if not any(cell not in (None, "") for cell in row):
+            continue
+        if len(row) > len(columns):
+            yield (row_number,) + (None,) * len(IMPORT_COLUMNS) + (
+                "Лишние значения в строке",)
+            continue
+        values = tuple(
+            None if pos is None or pos >= len(row) else cell_to_text(row[pos])
+            for pos in positions
+        )
+        yield (row_number,) + values + (None,)
+
+
+def parse_csv(file: IO[bytes]) -> Iterator[tuple]:
+    """Потоковый разбор CSV (UTF-8, разделитель `,` или `;`)"""
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    first_line = next(lines, "")
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    header = next(csv.reader([first_line], delimiter=delimiter), [])
+    yield from rows_with_errors(
+        header, csv.reader(lines, delimiter=delimiter))
+
+
+def parse_xlsx(file: IO[bytes]) -> Iterator[tuple]:
+    """Потоковый разбор первого листа XLSX в режиме read-only"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        yield from rows_with_errors(header, rows)
+    finally:
+        workbook.close()
+
+
+def parse_upload(filename: str, file: IO[bytes]) -> Iterator[tuple]:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return parse_csv(file)
+    if extension == ".xlsx":
+        return parse_xlsx(file)
+    raise HTTPException(
+        status_code=400, detail="Поддерживаются только файлы .csv и .xlsx")
+
+
+def stage_rows(db: Session, rows: Iterator[tuple]) -> int:
+    """Создает временную таблицу и загружает в нее строки через COPY"""
+    db.execute(text(CREATE_STAGING_SQL))
+    cursor = db.connection().connection.cursor()
+    try:
+        return copy_rows(cursor, STAGING_TABLE, STAGING_COLUMNS, rows)
+    finally:
+        cursor.close()
+
+
+def validate_staged(db: Session):
+    """Сопоставляет названия с id и помечает ошибочные строки"""
+    for statement in RESOLVE_SQL:
+        db.execute(text(statement))
+    for message, condition in VALIDATION_SQL:
+        db.execute(
+            text(
+                f"UPDATE {STAGING_TABLE} s SET error = :message "
+                f"WHERE s.error IS NULL AND {condition}"
+            ),
+            {
+                "message": message,
+                "true_values": list(TRUE_VALUES),
+                "false_values": list(FALSE_VALUES),
+            },
+        )
+
+
+def import_products(
+    filename: str, file: IO[bytes], db: Session, current_user: User
+):
+    """Импорт товаров из CSV/XLSX: COPY в промежуточную таблицу, проверка
+    и слияние с `products` набором SQL-запросов.
+
+    Количество в строке файла — остаток товара на указанном в ней складе;
+    общее количество товара пересчитывается по всем складам.
+    """
+    rows = parse_upload(filename, file)
+    try:
+        total_rows = stage_rows(db, rows)
+        validate_staged(db)
+        merged = db.execute(
+            text(MERGE_SQL),
+            {"true_values": list(TRUE_VALUES), "user_id": current_user.id},
+        ).mappings().one()
+        db.execute(
+            text(MOVEMENTS_SQL),
+            {"user_id": current_user.id, "now": datetime.utcnow()},
+        )
+        db.execute(text(STOCK_SQL))
+        db.execute(text(TOTALS_SQL))
+        alert_service.evaluate_products(db, scope=IMPORTED_PRODUCTS_SQL)
+        failed = db.execute(text(
+            f"SELECT count(*) FROM {STAGING_TABLE} WHERE error IS NOT NULL"
+        )).scalar()
+        errors = db.execute(
+            text(
+                f"SELECT row_number AS row, error FROM {STAGING_TABLE} "
+                f"WHERE error IS NOT NULL ORDER BY row_number LIMIT :limit"
+            ),
+            {"limit": IMPORT_ERROR_LIMIT},
+        ).mappings().all()
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка импорта товаров: {str(e)}")
+
+    return {
+        "total_rows": total_rows,
+        "inserted": merged["inserted"],
+        "updated": merged["updated"],
+        "failed": failed,
+        "errors": [dict(error) for error in errors],
+    }
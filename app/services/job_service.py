@@ -0,0 +1,304 @@
+import csv
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from typing import IO, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.models.user import User
+from app.models.warehouse import Product, Warehouse
+from app.schemas.warehouse import BulkMoveCreate
+from app.services import (
+    archive_service, import_service, movement_service, stock_service
+)
+
+logger = logging.getLogger(__name__)
+
+JOBS_STORAGE_DIR = os.getenv("JOBS_STORAGE_DIR", "/tmp/warehouse_jobs")
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_RETRY_DELAY_SECONDS = 30
+JOB_CHUNK_SIZE = 5000
+
+EXPORT_COLUMNS = (
+    "id", "name", "category_id", "warehouse_id", "quantity", "is_active",
+    "created_at", "updated_at",
+)
+
+JobHandler = Callable[[Session, Job], Optional[dict]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Регистрирует обработчик задач вида `kind`"""
+    def decorator(handler: JobHandler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def storage_path(filename: str) -> str:
+    os.makedirs(JOBS_STORAGE_DIR, exist_ok=True)
+    return os.path.join(JOBS_STORAGE_DIR, filename)
+
+
+def enqueue_job(
+    db: Session, kind: str, payload: dict, current_user: User,
+    max_attempts: int = 3,
+):
+    """Ставит задачу в очередь"""
+    job = Job(
+        kind=kind,
+        payload=payload,
+        created_by=current_user.id,
+        max_attempts=max_attempts,
+    )
+    try:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+
+
+def enqueue_product_import(
+    filename: str, file: IO[bytes], db: Session, current_user: User
+):
+    """Сохраняет загруженный файл и ставит импорт в очередь"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in (".csv", ".xlsx"):
+        raise HTTPException(
+            status_code=400, detail="Поддерживаются только файлы .csv и .xlsx")
+    path = storage_path(f"import-{uuid.uuid4().hex}{extension}")
+    with open(path, "wb") as target:
+        shutil.copyfileobj(file, target)
+    return enqueue_job(
+        db, "product_import",
+        {"path": path, "filename": filename}, current_user,
+        max_attempts=1,
+    )
+
+
+def enqueue_product_export(db: Session, current_user: User):
+    return enqueue_job(db, "product_export", {}, current_user)
+
+
+def enqueue_bulk_move(
+    move_data: BulkMoveCreate, db: Session, current_user: User
+):
+    destination = db.query(Warehouse).filter_by(
+        id=move_data.destination_warehouse_id).first()
+    if not destination:
+        raise HTTPException(status_code=404, detail="Целевой склад не найден")
+    return enqueue_job(
+        db, "bulk_move", move_data.model_dump(), current_user)
+
+
+def enqueue_product_archive(
+    days: Optional[int], db: Session, current_user: User
+):
+    return enqueue_job(
+        db, "product_archive", {"days": days}, current_user)
+
+
+def get_job(job_id: int, db: Session):
+    """Получение задачи по ID"""
+    job = db.query(Job).filter_by(id=job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return job
+
+
+def get_jobs(skip: int, limit: int, db: Session, current_user: User):
+    """Задачи текущего пользователя, новые первыми"""
+    try:
+        return (
+            db.query(Job).filter_by(created_by=current_user.id)
+            .order_by(Job.id.desc()).offset(skip).limit(limit).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
+
+
+def get_job_file(job_id: int, db: Session) -> str:
+    """Путь к файлу-результату завершенной задачи"""
+    job = get_job(job_id, db)
+    path = (job.result or {}).get("path")
+    if job.status != "succeeded" or not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Файл задачи не найден")
+    return path
+
+
+def claim_next_job(db: Session) -> Optional[Job]:
+    """Забирает следующую задачу через `FOR UPDATE SKIP LOCKED`.
+
+    Задачи в статусе `running`, у которых истекла аренда (воркер упал),
+    возвращаются в работу.
+    """
+    now = datetime.utcnow()
+    lease_expired = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    job = db.scalars(
+        select(Job)
+        .where(or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            and_(Job.status == "running", Job.locked_at < lease_expired),
+        ))
+        .order_by(Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        db.rollback()
+        return None
+    job.status = "running"
+    job.attempts += 1
+    job.locked_at = now
+    job.error = None
+    db.commit()
+    return job
+
+
+def report_progress(
+    db: Session, job: Job, progress: int, total: Optional[int] = None
+):
+    """Сохраняет прогресс, продлевает аренду задачи и фиксирует транзакцию
+    вместе с уже выполненной порцией работы"""
+    values = {"progress": progress, "locked_at": datetime.utcnow()}
+    if total is not None:
+        values["total"] = total
+    db.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.commit()
+
+
+def run_job(db: Session, job: Job):
+    """Выполняет задачу; при ошибке ставит повтор с растущей задержкой"""
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Неизвестный тип задачи: {job.kind}")
+        result = handler(db, job)
+    except Exception as e:
+        db.rollback()
+        logger.exception(
+            "Задача %s (%s) завершилась ошибкой", job.id, job.kind)
+        job = db.get(Job, job.id)
+        job.error = str(e)
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(
+                seconds=JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1))
+        else:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+        db.commit()
+        return
+    job.status = "succeeded"
+    job.result = result
+    job.locked_at = None
+    job.finished_at = datetime.utcnow()
+    if job.total is not None:
+        job.progress = job.total
+    db.commit()
+
+
+def chunks(values: List[int], size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+@job_handler("bulk_move")
+def run_bulk_move(db: Session, job: Job):
+    """Перемещение товаров порциями; каждая порция — своя транзакция,
+    повтор после сбоя безопасен"""
+    product_ids = sorted(set(job.payload["product_ids"]))
+    destination_id = job.payload["destination_warehouse_id"]
+    report_progress(db, job, 0, len(product_ids))
+    moved = 0
+    for done, chunk in enumerate(chunks(product_ids, JOB_CHUNK_SIZE), 1):
+        movement_service.record_movements(
+            db,
+            movement_service.transfer_rows(
+                stock_service.move_home_stock(db, chunk, destination_id),
+                destination_id,
+            ),
+            "move", created_by=job.created_by,
+        )
+        moved += db.execute(
+            update(Product)
+            .where(Product.id.in_(chunk), Product.deleted_at.is_(None))
+            .values(
+                warehouse_id=destination_id,
+                updated_by=job.created_by,
+                updated_at=datetime.utcnow(),
+                version=Product.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        report_progress(
+            db, job, min(done * JOB_CHUNK_SIZE, len(product_ids)))
+    return {"moved": moved, "not_found": len(product_ids) - moved}
+
+
+@job_handler("product_export")
+def run_product_export(db: Session, job: Job):
+    """Выгрузка каталога в CSV порциями по `JOB_CHUNK_SIZE` с переходом
+    по ключу, без OFFSET и долгой транзакции"""
+    total = db.scalar(
+        select(func.count(Product.id)).where(Product.deleted_at.is_(None)))
+    report_progress(db, job, 0, total)
+    path = storage_path(f"export-{job.id}.csv")
+    columns = [getattr(Product, column) for column in EXPORT_COLUMNS]
+    exported, last_id = 0, 0
+    with open(path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow(EXPORT_COLUMNS)
+        while True:
+            rows = db.execute(
+                select(*columns)
+                .where(Product.id > last_id, Product.deleted_at.is_(None))
+                .order_by(Product.id).limit(JOB_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            writer.writerows(rows)
+            exported += len(rows)
+            last_id = rows[-1].id
+            report_progress(db, job, exported)
+    return {"path": path, "rows": exported}
+
+
+@job_handler("product_import")
+def run_product_import(db: Session, job: Job):
+    """Импорт файла, сохраненного при постановке задачи"""
+    user = db.get(User, job.created_by)
+    if user is None:
+        raise ValueError("Автор задачи импорта удален")
+    with open(job.payload["path"], "rb") as file:
+        report = import_service.import_products(
+            job.payload["filename"], file, db, user)
+    os.remove(job.payload["path"])
+    return report
+
+
+@job_handler("product_archive")
+def run_product_archive(db: Session, job: Job):
+    """Перенос давно удаленных и неактивных товаров в архивные таблицы"""
+    cutoff = archive_service.archive_cutoff(job.payload.get("days"))
+    report_progress(db, job, 0)
+    archived = archive_service.archive_products(
+        db, cutoff, JOB_CHUNK_SIZE,
+        on_chunk=lambda done: report_progress(db, job, done),
+    )
+    return {"archived": archived, "cutoff": cutoff.isoformat()}
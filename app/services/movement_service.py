@@ -0,0 +1,225 @@
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.movement import StockDaily, StockMovement
+from app.models.warehouse import Product
+
+MOVEMENTS_LIMIT = 1000
+HISTORY_MAX_DAYS = 366
+MOVEMENT_PARTITIONS_AHEAD = int(os.getenv("MOVEMENT_PARTITIONS_AHEAD", "3"))
+
+PARTITION_SQL = (
+    "CREATE TABLE IF NOT EXISTS {name} PARTITION OF stock_movements "
+    "FOR VALUES FROM ('{start}') TO ('{end}')"
+)
+DEFAULT_PARTITION = "stock_movements_default"
+DEFAULT_HAS_ROWS_SQL = (
+    f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+    f"WHERE created_at >= :start AND created_at < :end)"
+)
+DETACH_DEFAULT_SQL = (
+    f"ALTER TABLE stock_movements DETACH PARTITION {DEFAULT_PARTITION}")
+MOVE_FROM_DEFAULT_SQL = f"""
+WITH moved AS (
+    DELETE FROM {DEFAULT_PARTITION}
+    WHERE created_at >= :start AND created_at < :end
+    RETURNING *
+)
+INSERT INTO stock_movements SELECT * FROM moved
+"""
+ATTACH_DEFAULT_SQL = (
+    f"ALTER TABLE stock_movements ATTACH PARTITION {DEFAULT_PARTITION} "
+    f"DEFAULT"
+)
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    month = value.month - 1 + offset
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(
+    db: Session, months_ahead: int = MOVEMENT_PARTITIONS_AHEAD
+):
+    """Создает месячные секции `stock_movements` на текущий и
+    `months_ahead` следующих месяцев.
+
+    Если строки месяца уже попали в секцию по умолчанию, секцию месяца
+    рядом с ней создать нельзя: секция по умолчанию отсоединяется, строки
+    переносятся в новую секцию, и она присоединяется обратно. Все шаги —
+    в одной транзакции, записи в журнал на это время ждут блокировки.
+    """
+    today = datetime.utcnow().date()
+    for offset in range(months_ahead + 1):
+        start = month_start(today, offset)
+        name = f"stock_movements_y{start.year}m{start.month:02d}"
+        if db.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+            continue
+        bounds = {"start": start, "end": month_start(start, 1)}
+        stranded = db.scalar(text(DEFAULT_HAS_ROWS_SQL), bounds)
+        if stranded:
+            db.execute(text(DETACH_DEFAULT_SQL))
+        db.execute(text(PARTITION_SQL.format(
+            name=name,
+            start=start.isoformat(),
+            end=bounds["end"].isoformat(),
+        )))
+        if stranded:
+            db.execute(text(MOVE_FROM_DEFAULT_SQL), bounds)
+            db.execute(text(ATTACH_DEFAULT_SQL))
+    db.commit()
+
+
+def record_movements(
+    db: Session, movements: List[dict], reason: str,
+    created_by: Optional[int] = None, reference_id: Optional[int] = None,
+):
+    """Записывает изменения остатков `{product_id, warehouse_id, delta}` и
+    обновляет суточные итоги в текущей транзакции.
+
+    Два запроса независимо от числа строк: пакетная вставка в журнал и
+    INSERT ... ON CONFLICT в `stock_daily`.
+    """
+    movements = [row for row in movements if row["delta"]]
+    if not movements:
+        return
+    now = datetime.utcnow()
+    db.execute(
+        insert(StockMovement.__table__).execution_options(
+            insertmanyvalues_page_size=len(movements)),
+        [
+            {
+                "product_id": row["product_id"],
+                "warehouse_id": row.get("warehouse_id"),
+                "delta": row["delta"],
+                "reason": reason,
+                "reference_id": reference_id,
+                "created_by": created_by,
+                "created_at": now,
+            }
+            for row in movements
+        ],
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for row in movements:
+        totals[row["product_id"]][0] += row["delta"]
+        totals[row["product_id"]][1] += 1
+    statement = pg_insert(StockDaily).values([
+        {
+            "product_id": product_id,
+            "day": now.date(),
+            "net_change": net_change,
+            "movements": count,
+        }
+        for product_id, (net_change, count) in totals.items()
+    ])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["product_id", "day"],
+        set_={
+            "net_change":
+                StockDaily.net_change + statement.excluded.net_change,
+            "movements": StockDaily.movements + statement.excluded.movements,
+        },
+    ))
+
+
+def transfer_rows(moved, destination_id: int) -> List[dict]:
+    """Пары списание/зачисление для остатков `(product_id, warehouse_id,
+    quantity)`, перенесенных на склад `destination_id`"""
+    rows = []
+    for product_id, warehouse_id, quantity in moved:
+        rows.append({
+            "product_id": product_id,
+            "warehouse_id": warehouse_id,
+            "delta": -quantity,
+        })
+        rows.append({
+            "product_id": product_id,
+            "warehouse_id": destination_id,
+            "delta": quantity,
+        })
+    return rows
+
+
+def get_live_product(product_id: int, db: Session):
+    product = db.query(Product).filter_by(
+        id=product_id, deleted_at=None).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Товар не найден")
+    return product
+
+
+def get_movements(
+    product_id: int, db: Session, since: Optional[datetime] = None,
+    until: Optional[datetime] = None, limit: int = MOVEMENTS_LIMIT,
+):
+    """Журнал изменений остатка товара, новые первыми; границы периода
+    отсекают лишние месячные секции"""
+    query = db.query(StockMovement).filter_by(product_id=product_id)
+    if since is not None:
+        query = query.filter(StockMovement.created_at >= since)
+    if until is not None:
+        query = query.filter(StockMovement.created_at < until)
+    try:
+        return (
+            query.order_by(
+                StockMovement.created_at.desc(), StockMovement.id.desc())
+            .limit(limit).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
+
+
+def get_stock_level(product_id: int, on_date: date, db: Session):
+    """Остаток товара на конец дня `on_date`: текущее количество минус
+    суточные итоги после этой даты"""
+    product = get_live_product(product_id, db)
+    later_changes = db.scalar(
+        select(func.coalesce(func.sum(StockDaily.net_change), 0)).where(
+            StockDaily.product_id == product_id, StockDaily.day > on_date)
+    )
+    return {
+        "product_id": product_id,
+        "day": on_date,
+        "quantity": product.quantity - later_changes,
+    }
+
+
+def get_stock_history(product_id: int, days: int, db: Session):
+    """Остаток на конец каждого из последних `days` дней по суточным
+    итогам, без чтения журнала"""
+    product = get_live_product(product_id, db)
+    today = datetime.utcnow().date()
+    first_day = today - timedelta(days=days - 1)
+    rollups = {
+        rollup.day: rollup
+        for rollup in db.query(StockDaily).filter(
+            StockDaily.product_id == product_id,
+            StockDaily.day >= first_day,
+        )
+    }
+    history = []
+    quantity = product.quantity
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        rollup = rollups.get(day)
+        history.append({
+            "day": day,
+            "quantity": quantity,
+            "net_change": rollup.net_change if rollup else 0,
+            "movements": rollup.movements if rollup else 0,
+        })
+        if rollup:
+            quantity -= rollup.net_change
+    history.reverse()
+    return history
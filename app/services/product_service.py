@@ -1,12 +1,40 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import HTTPException
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.data.single_flight import coalesced
 from app.models.user import User
-from app.models.warehouse import Category, Product, Warehouse
+from app.models.warehouse import Category, Product, ProductTombstone, Warehouse
 from app.schemas.utils import QueryParams
-from app.schemas.warehouse import ProductCreate, ProductMove, ProductUpdate
-from app.services import filter_service
+from app.schemas.warehouse import (
+    ProductCreate, ProductMove, ProductResponse, ProductUpdate
+)
+from app.services import (
+    alert_service, change_feed, fast_json, filter_service, movement_service,
+    stock_service
+)
+from app.services.version_service import CONFLICT_DETAIL, check_version
+
+CHANGES_LIMIT = 1000
+
+PRODUCT_FILTER_FIELDS = (
+    "id", "name", "category_id", "warehouse_id", "quantity",
+    "reserved_quantity", "reorder_threshold", "low_stock", "is_active",
+    "created_at", "updated_at", "created_by", "updated_by", "version",
+)
+
+PRODUCT_COLUMNS = fast_json.schema_columns(
+    Product, ProductResponse,
+    available_quantity=(
+        func.coalesce(Product.quantity, 0)
+        - func.coalesce(Product.reserved_quantity, 0)
+    ),
+)
 
 
 def create_product(
@@ -27,6 +55,22 @@ def create_product(
             created_by=created_by,
         )
         db.add(db_product)
+        db.flush()
+        stock_service.add_stock(db, [{
+            "product_id": db_product.id,
+            "warehouse_id": db_product.warehouse_id,
+            "quantity": db_product.quantity or 0,
+        }])
+        movement_service.record_movements(
+            db,
+            [{
+                "product_id": db_product.id,
+                "warehouse_id": db_product.warehouse_id,
+                "delta": db_product.quantity or 0,
+            }],
+            "create", created_by=created_by,
+        )
+        alert_service.evaluate_products(db, [db_product.id])
         db.commit()
         db.refresh(db_product)
         return db_product
@@ -42,39 +86,141 @@ def create_product(
             status_code=500, detail=f"Ошибка базы данных: {str(e)}")
 
 
-def get_products(db: Session, query_params: QueryParams):
-    """Получение списка товаров с фильтрацией, сортировкой и пагинацией"""
+def get_products(
+    db: Session, query_params: QueryParams, columns=None,
+    collation: Optional[str] = None,
+):
+    """Получение списка товаров с фильтрацией, сортировкой и пагинацией.
+
+    С `columns` возвращает строки только этих столбцов вместо объектов;
+    `fields` сужает их до запрошенных клиентом полей ответа. `collation`
+    задает правило сортировки строковых полей.
+    """
     try:
-        query = db.query(Product)
+        fields = query_params.parse_fields()
+        if fields:
+            columns = filter_service.select_fields(
+                columns or PRODUCT_COLUMNS, fields)
+        query = db.query(*columns) if columns else db.query(Product)
+        query = query.filter_by(deleted_at=None)
         query = filter_service.apply_filters(
-            query, Product, query_params.parse_filter()
+            query, Product, query_params.parse_filter(), PRODUCT_FILTER_FIELDS
         )
         query = filter_service.apply_sorting(
-            query, Product, query_params.parse_sort())
+            query, Product, query_params.parse_sort(), PRODUCT_FILTER_FIELDS,
+            collation)
         query = filter_service.apply_range(query, query_params.parse_range())
+        offset, limit = filter_service.page_bounds(query_params.parse_range())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        query = filter_service.guard_query(
+            db, query, filter_service.query_shape(
+                Product, query_params, offset, limit))
         return query.all()
+    except SQLAlchemyError as e:
+        raise filter_service.read_error(e)
+
+
+def get_product_changes(
+    db: Session, since: Optional[str] = None, limit: int = CHANGES_LIMIT
+):
+    """Изменения и удаления товаров после отметки `since` в порядке ключа.
+
+    Отметка — курсор `change_feed` вида `<txid>,<id>` по номеру
+    транзакции последнего изменения товара (`change_txid` ставит триггер
+    БД) или записи надгробия.
+    """
+    changed_query = change_feed.feed_query(
+        db.query(Product).filter_by(deleted_at=None),
+        Product.change_txid, Product.id, since,
+    )
+    deleted_query = change_feed.feed_query(
+        db.query(ProductTombstone),
+        ProductTombstone.txid, ProductTombstone.product_id, since,
+    )
+    try:
+        changed = changed_query.limit(limit).all()
+        deleted = deleted_query.limit(limit).all()
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
         )
 
+    events = [(p.change_txid, p.id, p) for p in changed]
+    events += [(t.txid, t.product_id, t) for t in deleted]
+    events = sorted(events, key=lambda event: event[:2])[:limit]
+
+    next_since = since
+    if events:
+        next_since = change_feed.make_cursor(*events[-1][:2])
+    return {
+        "changed": [e[2] for e in events if isinstance(e[2], Product)],
+        "deleted": [
+            e[2] for e in events if isinstance(e[2], ProductTombstone)],
+        "next_since": next_since,
+    }
+
 
 def get_product(product_id: int, db: Session):
     """Получение товара по ID"""
-    product = db.query(Product).filter_by(id=product_id).first()
+    product = db.query(Product).filter_by(
+        id=product_id, deleted_at=None).first()
     if not product:
         raise HTTPException(status_code=404, detail="Товар не найден")
     return product
 
 
+@coalesced
+def get_product_rows(
+    db: Session, query_params: QueryParams, columns=PRODUCT_COLUMNS
+):
+    """`get_products` по столбцам `columns`: строки не привязаны
+    к сессии, поэтому одну выборку можно отдать нескольким запросам"""
+    return get_products(db, query_params, columns)
+
+
+@coalesced
+def get_product_response(product_id: int, db: Session) -> ProductResponse:
+    """Товар по ID в виде схемы ответа, не связанной с сессией"""
+    return ProductResponse.model_validate(get_product(product_id, db))
+
+
+ALERT_FIELDS = {"quantity", "category_id", "reorder_threshold"}
+
+
+def commit_versioned(db: Session, alert_product_ids=()):
+    """Фиксация изменений версионируемой записи; 409 при гонке записи.
+
+    Для `alert_product_ids` перед фиксацией пересчитываются оповещения
+    о низком остатке.
+    """
+    try:
+        if alert_product_ids:
+            db.flush()
+            alert_service.evaluate_products(db, alert_product_ids)
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Изменение нарушает ограничения данных товара",
+        )
+
+
 def update_product(
     product_id: int, product_data: ProductUpdate,
-    db: Session, current_user: User
+    db: Session, current_user: User, expected_version: Optional[int] = None
 ):
-    """Обновление данных товара"""
-    product = db.query(Product).filter_by(id=product_id).first()
+    """Обновление данных товара с проверкой версии (If-Match)"""
+    product = db.query(Product).filter_by(
+        id=product_id, deleted_at=None).first()
     if not product:
         raise HTTPException(status_code=404, detail="Товар не найден")
+    check_version(product, expected_version)
     updated_data = product_data.dict(exclude_unset=True)
     if "category_id" in updated_data:
         category = db.query(Category).filter_by(
@@ -88,40 +234,93 @@ def update_product(
         )
         if not warehouse:
             raise HTTPException(status_code=400, detail="Склад не найден")
+    quantity = updated_data.get("quantity")
+    if quantity is not None and quantity < (product.reserved_quantity or 0):
+        raise HTTPException(
+            status_code=400,
+            detail="Количество меньше зарезервированного по активным резервам",
+        )
+    warehouse_id = updated_data.get("warehouse_id", product.warehouse_id)
+    if warehouse_id is not None:
+        if warehouse_id != product.warehouse_id:
+            moved = stock_service.move_home_stock(
+                db, [product.id], warehouse_id)
+            movement_service.record_movements(
+                db, movement_service.transfer_rows(moved, warehouse_id),
+                "move", created_by=current_user.id,
+            )
+        if quantity is not None and quantity != product.quantity:
+            delta = quantity - (product.quantity or 0)
+            stock_service.adjust_home_stock(
+                db, product.id, warehouse_id, delta)
+            movement_service.record_movements(
+                db,
+                [{
+                    "product_id": product.id,
+                    "warehouse_id": warehouse_id,
+                    "delta": delta,
+                }],
+                "adjust", created_by=current_user.id,
+            )
     for key, value in updated_data.items():
         setattr(product, key, value)
     product.updated_by = current_user.id
-    db.commit()
+    commit_versioned(
+        db, [product.id] if ALERT_FIELDS & updated_data.keys() else ())
     db.refresh(product)
     return product
 
 
 def delete_product(product_id: int, db: Session):
-    """Удаление товара"""
-    product = db.query(Product).filter_by(id=product_id).first()
+    """Мягкое удаление товара: строка помечается `deleted_at` и позже
+    переносится в архив фоновой задачей"""
+    product = db.query(Product).filter_by(
+        id=product_id, deleted_at=None).first()
     if not product:
         raise HTTPException(status_code=404, detail="Товар не найден")
+    if product.reserved_quantity:
+        raise HTTPException(
+            status_code=409,
+            detail="Товар зарезервирован, удаление невозможно",
+        )
 
-    db.delete(product)
-    db.commit()
+    product.deleted_at = datetime.utcnow()
+    product.is_active = False
+    db.add(ProductTombstone(product_id=product.id))
+    commit_versioned(db)
     return {"detail": "Товар успешно удален"}
 
 
 def move_product(
-    product_id: int, move_data: ProductMove, db: Session, current_user: User
+    product_id: int, move_data: ProductMove, db: Session, current_user: User,
+    expected_version: Optional[int] = None,
 ):
-    """Перемещение товара между складами с обновлением updated_by."""
-    product = db.query(Product).filter_by(id=product_id).first()
+    """Перемещение товара между складами с обновлением updated_by.
+
+    Весь остаток с прежнего основного склада переносится на новый;
+    частичное перемещение выполняется заказом на перемещение.
+    """
+    product = db.query(Product).filter_by(
+        id=product_id, deleted_at=None).first()
     if not product:
         raise HTTPException(status_code=404, detail="Товар не найден")
+    check_version(product, expected_version)
     destination_warehouse = (
         db.query(Warehouse).filter_by(
             id=move_data.destination_warehouse_id).first()
     )
     if not destination_warehouse:
         raise HTTPException(status_code=404, detail="Целевой склад не найден")
+    moved = stock_service.move_home_stock(
+        db, [product.id], move_data.destination_warehouse_id)
+    movement_service.record_movements(
+        db,
+        movement_service.transfer_rows(
+            moved, move_data.destination_warehouse_id),
+        "move", created_by=current_user.id,
+    )
     product.warehouse_id = move_data.destination_warehouse_id
     product.updated_by = current_user.id
-    db.commit()
+    commit_versioned(db)
     db.refresh(product)
     return product
@@ -0,0 +1,195 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.reservation import Reservation
+from app.models.user import User
+from app.models.warehouse import Product
+from app.schemas.reservations import ReservationCreate
+from app.services import alert_service, movement_service, stock_service
+
+RESERVATION_TTL_SECONDS = int(os.getenv("RESERVATION_TTL_SECONDS", "900"))
+RESERVATION_SWEEP_BATCH = 1000
+
+EXPIRE_SQL = """
+WITH expired AS (
+    UPDATE reservations SET status = 'expired', finished_at = :now
+    WHERE id IN (
+        SELECT id FROM reservations
+        WHERE status = 'active' AND expires_at <= :now
+        ORDER BY expires_at
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING product_id, quantity
+), released AS (
+    UPDATE products p
+    SET reserved_quantity = p.reserved_quantity - e.quantity
+    FROM (
+        SELECT product_id, sum(quantity) AS quantity
+        FROM expired GROUP BY product_id
+    ) e
+    WHERE p.id = e.product_id
+    RETURNING p.id
+)
+SELECT
+    (SELECT count(*) FROM expired) AS expired,
+    ARRAY(SELECT id FROM released) AS product_ids
+"""
+
+
+def create_reservation(
+    reservation_data: ReservationCreate, db: Session, current_user: User
+):
+    """Резервирует количество товара, если хватает свободного остатка.
+
+    Проверка и увеличение `reserved_quantity` выполняются одним условным
+    UPDATE, поэтому параллельные резервы не уводят остаток в минус.
+    Версия товара растет: изменение количества, прочитанное до резерва,
+    получит 409 вместо количества меньше зарезервированного.
+    """
+    ttl = reservation_data.ttl_seconds or RESERVATION_TTL_SECONDS
+    try:
+        reserved = db.execute(
+            update(Product)
+            .where(
+                Product.id == reservation_data.product_id,
+                Product.deleted_at.is_(None),
+                Product.quantity - Product.reserved_quantity
+                >= reservation_data.quantity,
+            )
+            .values(
+                reserved_quantity=Product.reserved_quantity
+                + reservation_data.quantity,
+                version=Product.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not reserved:
+            exists = db.query(Product.id).filter_by(
+                id=reservation_data.product_id, deleted_at=None).first()
+            db.rollback()
+            if not exists:
+                raise HTTPException(status_code=404, detail="Товар не найден")
+            raise HTTPException(
+                status_code=409, detail="Недостаточно свободного остатка")
+        reservation = Reservation(
+            product_id=reservation_data.product_id,
+            quantity=reservation_data.quantity,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl),
+            created_by=current_user.id,
+        )
+        db.add(reservation)
+        alert_service.evaluate_products(db, [reservation_data.product_id])
+        db.commit()
+        db.refresh(reservation)
+        return reservation
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+
+
+def get_reservation(reservation_id: int, db: Session):
+    """Получение резерва по ID"""
+    reservation = db.query(Reservation).filter_by(id=reservation_id).first()
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Резерв не найден")
+    return reservation
+
+
+def finish_reservation(reservation_id: int, status: str, db: Session):
+    """Закрывает активный резерв: `committed` списывает товар с основного
+    склада, `released` возвращает количество в свободный остаток"""
+    now = datetime.utcnow()
+    conditions = [
+        Reservation.id == reservation_id, Reservation.status == "active"]
+    if status == "committed":
+        conditions.append(Reservation.expires_at > now)
+    try:
+        row = db.execute(
+            update(Reservation)
+            .where(*conditions)
+            .values(status=status, finished_at=now)
+            .returning(Reservation.product_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            db.rollback()
+            reservation = get_reservation(reservation_id, db)
+            if reservation.status == "active":
+                raise HTTPException(
+                    status_code=409, detail="Срок действия резерва истек")
+            raise HTTPException(
+                status_code=409,
+                detail=f"Резерв уже закрыт (статус {reservation.status})",
+            )
+        values = {
+            "reserved_quantity": Product.reserved_quantity - row.quantity}
+        if status == "committed":
+            values.update(
+                quantity=Product.quantity - row.quantity,
+                version=Product.version + 1,
+                updated_at=now,
+            )
+        warehouse_id = db.execute(
+            update(Product)
+            .where(Product.id == row.product_id)
+            .values(**values)
+            .returning(Product.warehouse_id)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if status == "committed":
+            if not stock_service.take_stock(
+                    db, warehouse_id, {row.product_id: row.quantity}):
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail="Недостаточно товара на основном складе")
+            movement_service.record_movements(
+                db,
+                [{
+                    "product_id": row.product_id,
+                    "warehouse_id": warehouse_id,
+                    "delta": -row.quantity,
+                }],
+                "reservation", reference_id=reservation_id,
+            )
+        else:
+            alert_service.evaluate_products(db, [row.product_id])
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+    return get_reservation(reservation_id, db)
+
+
+def commit_reservation(reservation_id: int, db: Session):
+    return finish_reservation(reservation_id, "committed", db)
+
+
+def release_reservation(reservation_id: int, db: Session):
+    return finish_reservation(reservation_id, "released", db)
+
+
+def expire_reservations(db: Session, now: Optional[datetime] = None) -> int:
+    """Снимает истекшие резервы порциями; строки, занятые параллельным
+    подтверждением или другим воркером, пропускаются"""
+    now = now or datetime.utcnow()
+    expired = 0
+    while True:
+        count, product_ids = db.execute(
+            text(EXPIRE_SQL),
+            {"now": now, "batch": RESERVATION_SWEEP_BATCH},
+        ).one()
+        alert_service.evaluate_products(db, product_ids)
+        db.commit()
+        expired += count
+        if count < RESERVATION_SWEEP_BATCH:
+            return expired
@@ -0,0 +1,85 @@
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.data import database
+from app.schemas.utils import QueryParams
+from app.services import filter_service, product_service
+
+WAREHOUSE_SUMMARY_SQL = """
+SELECT
+    w.id AS warehouse_id, w.name,
+    count(p.id) AS products,
+    coalesce(sum(ws.quantity), 0) AS quantity,
+    count(p.id) FILTER (WHERE p.low_stock) AS low_stock
+FROM warehouses w
+LEFT JOIN (
+    warehouse_stock ws
+    JOIN products p ON p.id = ws.product_id AND p.deleted_at IS NULL
+) ON ws.warehouse_id = w.id
+GROUP BY w.id
+ORDER BY w.id
+"""
+
+
+def get_products(query_params: QueryParams):
+    """Товары всех шардов: каждый шард отдает первые `offset + limit`
+    записей в порядке `sort`, страница собирается слиянием; `fields` здесь
+    не применяется — слиянию нужны поля сортировки. Шарды сортируют строки
+    по кодовым точкам (`BINARY_COLLATION`), как и слияние, а не по
+    правилам сортировки своих БД.
+
+    Шард отдает не больше `MAX_LIMIT` записей, поэтому более глубокие
+    страницы отклоняются с 400, а не собираются из неполных выборок.
+    """
+    try:
+        sorting = query_params.parse_sort()
+        offset, limit = filter_service.page_bounds(
+            query_params.parse_range()
+            or {"offset": 0, "limit": filter_service.DEFAULT_LIMIT})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if offset + limit > filter_service.MAX_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Для выборки по всем шардам offset + limit не должны "
+                f"превышать {filter_service.MAX_LIMIT}; уточните фильтр"
+            ),
+        )
+    shard_params = query_params.model_copy(
+        update={
+            "range": json.dumps({"offset": 0, "limit": offset + limit}),
+            "fields": None,
+        })
+
+    sequences = []
+    for shard, products in database.shard_router.fan_out(
+        lambda db: product_service.get_products(
+            db, shard_params,
+            collation=filter_service.BINARY_COLLATION)
+    ):
+        for product in products:
+            product.shard = shard
+        sequences.append(products)
+    return filter_service.merge_sorted(sequences, sorting, offset, limit)
+
+
+def get_warehouse_summary():
+    """Остатки и число товаров по складам всех шардов"""
+    def summarize(db):
+        try:
+            return db.execute(text(WAREHOUSE_SUMMARY_SQL)).mappings().all()
+        except SQLAlchemyError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Ошибка чтения базы данных: {str(e)}",
+            )
+
+    return [
+        dict(row, shard=shard)
+        for shard, rows in database.shard_router.fan_out(summarize)
+        for row in rows
+    ]
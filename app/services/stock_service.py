@@ -0,0 +1,309 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, and_, column, delete, literal, select, tuple_
+from sqlalchemy import update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.stock import TransferOrder, TransferOrderLine, WarehouseStock
+from app.models.user import User
+from app.models.warehouse import Product, Warehouse
+from app.schemas.stock import TRANSFER_MAX_LINES, TransferCreate
+from app.services import movement_service
+
+
+def upsert_stock(db: Session, statement):
+    """Выполняет INSERT в `warehouse_stock`, прибавляя количество к уже
+    существующим остаткам"""
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["product_id", "warehouse_id"],
+        set_={
+            "quantity": WarehouseStock.quantity + statement.excluded.quantity},
+    ))
+
+
+def add_stock(db: Session, rows: List[dict]):
+    """Увеличивает остатки строками `{product_id, warehouse_id, quantity}`"""
+    upsert_stock(db, insert(WarehouseStock).values(rows))
+
+
+def locked_stock(warehouse_ids: Iterable[int], product_ids: Iterable[int]):
+    """Подзапрос, блокирующий строки остатков в порядке
+    `(product_id, warehouse_id)`: встречные списания не блокируют друг
+    друга накрест"""
+    return (
+        select(WarehouseStock.product_id, WarehouseStock.warehouse_id)
+        .where(
+            WarehouseStock.warehouse_id.in_(sorted(warehouse_ids)),
+            WarehouseStock.product_id.in_(sorted(product_ids)),
+        )
+        .order_by(WarehouseStock.product_id, WarehouseStock.warehouse_id)
+        .with_for_update()
+    )
+
+
+def lock_stock(
+    db: Session, warehouse_ids: Iterable[int], product_ids: Iterable[int]
+):
+    """Заранее блокирует остатки товаров на нескольких складах"""
+    db.execute(locked_stock(warehouse_ids, product_ids)).all()
+
+
+def take_stock(
+    db: Session, warehouse_id: int, quantities: Dict[int, int]
+) -> bool:
+    """Списывает количества товаров со склада одним UPDATE.
+
+    Строки блокируются в порядке `(product_id, warehouse_id)`. Возвращает
+    False, если хотя бы одного товара не хватает; в этом случае транзакцию
+    нужно откатить.
+    """
+    requested = values(
+        column("product_id", Integer), column("quantity", Integer),
+        name="requested",
+    ).data(sorted(quantities.items()))
+    locked = locked_stock([warehouse_id], quantities)
+    taken = db.execute(
+        update(WarehouseStock)
+        .where(
+            WarehouseStock.warehouse_id == warehouse_id,
+            WarehouseStock.product_id == requested.c.product_id,
+            WarehouseStock.quantity >= requested.c.quantity,
+            tuple_(
+                WarehouseStock.product_id, WarehouseStock.warehouse_id,
+            ).in_(locked),
+        )
+        .values(quantity=WarehouseStock.quantity - requested.c.quantity)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return taken == len(quantities)
+
+
+def move_home_stock(
+    db: Session, product_ids: Iterable[int], destination_id: int
+):
+    """Переносит весь остаток товаров с их основного склада на склад
+    `destination_id`. Вызывается до смены `Product.warehouse_id`.
+
+    Возвращает перенесенные остатки `(product_id, warehouse_id, quantity)`.
+    """
+    product_ids = list(product_ids)
+    home_stock = (
+        select(
+            WarehouseStock.product_id, literal(destination_id),
+            WarehouseStock.quantity,
+        )
+        .join(Product, and_(
+            Product.id == WarehouseStock.product_id,
+            Product.warehouse_id == WarehouseStock.warehouse_id,
+            Product.deleted_at.is_(None),
+        ))
+        .where(
+            WarehouseStock.product_id.in_(product_ids),
+            WarehouseStock.warehouse_id != destination_id,
+        )
+    )
+    upsert_stock(db, insert(WarehouseStock).from_select(
+        ["product_id", "warehouse_id", "quantity"], home_stock))
+    return db.execute(
+        delete(WarehouseStock)
+        .where(
+            WarehouseStock.product_id.in_(product_ids),
+            WarehouseStock.warehouse_id != destination_id,
+            WarehouseStock.warehouse_id == select(Product.warehouse_id)
+            .where(
+                Product.id == WarehouseStock.product_id,
+                Product.deleted_at.is_(None),
+            )
+            .scalar_subquery(),
+        )
+        .returning(
+            WarehouseStock.product_id, WarehouseStock.warehouse_id,
+            WarehouseStock.quantity,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def adjust_home_stock(
+    db: Session, product_id: int, warehouse_id: int, delta: int
+):
+    """Изменяет остаток на основном складе товара на `delta`"""
+    if delta > 0:
+        add_stock(db, [{
+            "product_id": product_id,
+            "warehouse_id": warehouse_id,
+            "quantity": delta,
+        }])
+    elif delta < 0 and not take_stock(db, warehouse_id, {product_id: -delta}):
+        db.rollback()
+        raise HTTPException(
+            status_code=400, detail="Недостаточно товара на основном складе")
+
+
+def stock_shortage(
+    db: Session, warehouse_id: int, quantities: Dict[int, int]
+) -> List[int]:
+    """Товары, которых на складе меньше запрошенного"""
+    available = dict(db.execute(
+        select(WarehouseStock.product_id, WarehouseStock.quantity).where(
+            WarehouseStock.warehouse_id == warehouse_id,
+            WarehouseStock.product_id.in_(list(quantities)),
+        )
+    ).all())
+    return sorted(
+        product_id for product_id, quantity in quantities.items()
+        if available.get(product_id, 0) < quantity
+    )
+
+
+def create_transfer(
+    transfer_data: TransferCreate, db: Session, current_user: User
+):
+    """Перемещает указанные количества товаров между складами.
+
+    Все строки заказа списываются со склада-источника одним UPDATE и
+    зачисляются на склад назначения одним INSERT ... ON CONFLICT в одной
+    транзакции: заказ выполняется целиком или не выполняется совсем.
+    Остатки обоих складов блокируются в порядке `(product_id,
+    warehouse_id)`; архивные товары не перемещаются (404).
+    """
+    source_id = transfer_data.source_warehouse_id
+    destination_id = transfer_data.destination_warehouse_id
+    if source_id == destination_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Склад отправления совпадает со складом назначения",
+        )
+    found = db.query(Warehouse.id).filter(
+        Warehouse.id.in_([source_id, destination_id])).count()
+    if found != 2:
+        raise HTTPException(status_code=404, detail="Склад не найден")
+    quantities = Counter()
+    for line in transfer_data.lines:
+        quantities[line.product_id] += line.quantity
+    found = db.query(Product.id).filter(
+        Product.id.in_(list(quantities)), Product.deleted_at.is_(None),
+    ).count()
+    if found != len(quantities):
+        raise HTTPException(status_code=404, detail="Товар не найден")
+    try:
+        lock_stock(db, [source_id, destination_id], quantities)
+        if not take_stock(db, source_id, quantities):
+            db.rollback()
+            shortage = stock_shortage(db, source_id, quantities)
+            raise HTTPException(
+                status_code=409,
+                detail="Недостаточно товара на складе отправления: "
+                + ", ".join(map(str, shortage)),
+            )
+        add_stock(db, [
+            {
+                "product_id": product_id,
+                "warehouse_id": destination_id,
+                "quantity": quantity,
+            }
+            for product_id, quantity in sorted(quantities.items())
+        ])
+        transfer = TransferOrder(
+            source_warehouse_id=source_id,
+            destination_warehouse_id=destination_id,
+            created_by=current_user.id,
+        )
+        db.add(transfer)
+        db.flush()
+        movement_service.record_movements(
+            db,
+            [
+                {
+                    "product_id": product_id,
+                    "warehouse_id": warehouse_id,
+                    "delta": sign * quantity,
+                }
+                for product_id, quantity in quantities.items()
+                for warehouse_id, sign in (
+                    (source_id, -1), (destination_id, 1))
+            ],
+            "transfer", created_by=current_user.id, reference_id=transfer.id,
+        )
+        db.execute(
+            insert(TransferOrderLine.__table__).execution_options(
+                insertmanyvalues_page_size=TRANSFER_MAX_LINES),
+            [
+                {
+                    "transfer_id": transfer.id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                }
+                for product_id, quantity in quantities.items()
+            ],
+        )
+        db.commit()
+        db.refresh(transfer)
+        return transfer
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка базы данных: {str(e)}")
+
+
+def get_transfer(transfer_id: int, db: Session):
+    """Получение заказа на перемещение по ID"""
+    transfer = (
+        db.query(TransferOrder).options(selectinload(TransferOrder.lines))
+        .filter_by(id=transfer_id).first()
+    )
+    if not transfer:
+        raise HTTPException(
+            status_code=404, detail="Заказ на перемещение не найден")
+    return transfer
+
+
+def get_transfers(skip: int, limit: int, db: Session):
+    """Список заказов на перемещение, новые первыми"""
+    try:
+        return (
+            db.query(TransferOrder).options(selectinload(TransferOrder.lines))
+            .order_by(TransferOrder.id.desc()).offset(skip).limit(limit).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
+
+
+def get_warehouse_stock(
+    warehouse_id: int, skip: int, limit: int, db: Session
+):
+    """Остатки товаров на складе"""
+    try:
+        return (
+            db.query(WarehouseStock)
+            .join(Product, Product.id == WarehouseStock.product_id)
+            .filter(
+                WarehouseStock.warehouse_id == warehouse_id,
+                Product.deleted_at.is_(None),
+            )
+            .order_by(WarehouseStock.product_id)
+            .offset(skip).limit(limit).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
+
+
+def get_product_stock(product_id: int, db: Session):
+    """Остатки товара по складам"""
+    try:
+        return (
+            db.query(WarehouseStock).filter_by(product_id=product_id)
+            .order_by(WarehouseStock.warehouse_id).all()
+        )
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
+        )
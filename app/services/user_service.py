@@ -1,19 +1,20 @@
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from app.data.database import get_db
+from app.data.database import get_user_read_db
 from app.models.user import User
+from app.schemas.utils import QueryParams
 from app.schemas.users import (
     TokenData, UserInDB, UserUpdate, UserResponse
 )
+from app.services import filter_service
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,25 +22,38 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "default-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+USER_FIELDS = (
+    "id", "username", "first_name", "last_name", "age", "email", "phone",
+)
+
+
+@lru_cache(maxsize=None)
+def password_context():
+    """Контекст passlib; bcrypt загружается при первой проверке пароля,
+    а не при импорте"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Хеширование пароля."""
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 
 def create_access_token(
         data: dict, expires_delta: Union[timedelta, None] = None):
     """Создание токена."""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -87,20 +101,25 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 
-def get_all_users(skip: int, limit: int, db: Session):
-    """Получение списка пользователей с пагинацией"""
-    try:
-        return db.query(User).offset(skip).limit(limit).all()
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
-        )
+def get_all_users(
+    skip: int, limit: int, db: Session,
+    query_params: Optional[QueryParams] = None,
+):
+    """Получение списка пользователей с пагинацией, фильтрами и сортировкой
+    из `QueryParams`"""
+    return filter_service.get_filtered_data(
+        db, User, query_params or QueryParams(), USER_FIELDS,
+        skip, limit,
+    )
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_user_read_db),
 ):
     """Получение текущего пользователя."""
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Невозможно проверить учетные данные",
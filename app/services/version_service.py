@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+CONFLICT_DETAIL = "Запись изменена другим запросом, обновите данные"
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Ожидаемая версия из заголовка `If-Match` (`"3"`, `W/"3"` или `3`)"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="Неверный заголовок If-Match")
+
+
+def check_version(instance, expected_version: Optional[int]):
+    """409, если клиент редактирует устаревшую версию записи"""
+    if expected_version is not None and instance.version != expected_version:
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+
+def etag(instance) -> str:
+    return f'"{instance.version}"'
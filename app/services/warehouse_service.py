@@ -1,9 +1,23 @@
+from typing import Optional
+
 from fastapi import HTTPException
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.data.single_flight import coalesced
+from app.models.stock import WarehouseStock
+from app.models.warehouse import Product, Warehouse
+from app.schemas.utils import QueryParams
+from app.schemas.warehouse import (
+    WarehouseCreate, WarehouseResponse, WarehouseUpdate
+)
+from app.services import filter_service
+from app.services.version_service import CONFLICT_DETAIL, check_version
 
-from app.models.warehouse import Warehouse
-from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate
+WAREHOUSE_FIELDS = (
+    "id", "name", "address", "description", "is_active", "version")
 
 
 def create_warehouse(warehouse_data: WarehouseCreate, db: Session):
@@ -28,14 +42,16 @@ def create_warehouse(warehouse_data: WarehouseCreate, db: Session):
             )
 
 
-def get_warehouses(skip: int, limit: int, db: Session):
-    """Получение списка складов с пагинацией"""
-    try:
-        return db.query(Warehouse).offset(skip).limit(limit).all()
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=500, detail=f"Ошибка чтения базы данных: {str(e)}"
-        )
+def get_warehouses(
+    skip: int, limit: int, db: Session,
+    query_params: Optional[QueryParams] = None,
+):
+    """Получение списка складов с пагинацией, фильтрами и сортировкой
+    из `QueryParams`"""
+    return filter_service.get_filtered_data(
+        db, Warehouse, query_params or QueryParams(), WAREHOUSE_FIELDS,
+        skip, limit,
+    )
 
 
 def get_warehouse(warehouse_id: int, db: Session):
@@ -46,12 +62,22 @@ def get_warehouse(warehouse_id: int, db: Session):
     return warehouse
 
 
+@coalesced
+def get_warehouse_response(
+    warehouse_id: int, db: Session
+) -> WarehouseResponse:
+    """Склад по ID в виде схемы ответа, не связанной с сессией"""
+    return WarehouseResponse.model_validate(get_warehouse(warehouse_id, db))
+
+
 def update_warehouse(
-        warehouse_id: int, warehouse_data: WarehouseUpdate, db: Session):
-    """Обновление данных склада"""
+        warehouse_id: int, warehouse_data: WarehouseUpdate, db: Session,
+        expected_version: Optional[int] = None):
+    """Обновление данных склада с проверкой версии (If-Match)"""
     warehouse = db.query(Warehouse).filter_by(id=warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Склад не найден")
+    check_version(warehouse, expected_version)
 
     updated_data = warehouse_data.dict(exclude_unset=True)
 
@@ -62,6 +88,9 @@ def update_warehouse(
         db.commit()
         db.refresh(warehouse)
         return warehouse
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
     except IntegrityError as e:
         db.rollback()
         raise HTTPException(
@@ -77,10 +106,30 @@ def update_warehouse(
 
 
 def delete_warehouse(warehouse_id: int, db: Session):
-    """Удаление склада"""
+    """Удаление склада вместе с его товарами.
+
+    Пока на складе или у его товаров на других складах есть остатки,
+    удаление отклоняется с 409: остатки сначала перемещают или архивируют,
+    чтобы каждое списание попало в журнал движений.
+    """
     warehouse = db.query(Warehouse).filter_by(id=warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Склад не найден")
+    stocked = db.query(WarehouseStock.product_id).filter(
+        WarehouseStock.quantity != 0,
+        or_(
+            WarehouseStock.warehouse_id == warehouse_id,
+            WarehouseStock.product_id.in_(
+                select(Product.id).where(
+                    Product.warehouse_id == warehouse_id)),
+        ),
+    ).first()
+    if stocked:
+        raise HTTPException(
+            status_code=409,
+            detail="На складе или у его товаров есть остатки: "
+            "переместите или архивируйте их перед удалением",
+        )
 
     try:
         db.delete(warehouse)
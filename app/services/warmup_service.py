@@ -0,0 +1,140 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import timedelta
+from threading import Event, Thread
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, configure_mappers, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.schemas.utils import QueryParams
+from app.services import (
+    fast_json, product_service, user_service, warehouse_service
+)
+
+logger = logging.getLogger(__name__)
+
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", "2"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+
+WARMUP_READS: List[Callable[[Session], object]] = [
+    lambda db: user_service.get_user_for_api(db, ""),
+    lambda db: product_service.get_product_response(0, db),
+    lambda db: product_service.get_products(db, QueryParams()),
+    lambda db: fast_json.rows_response(
+        product_service.get_product_rows(db, QueryParams())),
+    lambda db: warehouse_service.get_warehouse_response(0, db),
+]
+
+
+@dataclass
+class WarmupState:
+    """Состояние прогрева процесса для проверки готовности"""
+
+    ready: bool = False
+    attempts: int = 0
+    steps: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+state = WarmupState()
+_stopped = Event()
+
+
+def prime_auth():
+    """Инициализирует bcrypt и jose до первого входа пользователя"""
+    from jose import jwt
+
+    hashed = user_service.get_password_hash("warmup")
+    user_service.verify_password("warmup", hashed)
+    token = user_service.create_access_token(
+        {"sub": "warmup"}, timedelta(minutes=1))
+    jwt.decode(
+        token, user_service.SECRET_KEY, algorithms=[user_service.ALGORITHM])
+
+
+def open_pool(session_factory: sessionmaker, size: int):
+    """Открывает `size` соединений, которые остаются в пуле; не больше
+    размера пула, чтобы прогрев не занимал соединения сверх него"""
+    engine = session_factory.kw["bind"]
+    if isinstance(engine.pool, QueuePool):
+        size = min(size, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def prime_statements(session_factory: sessionmaker):
+    """Выполняет частые чтения, заполняя кэш скомпилированных запросов
+    движка и кэш стоимости запросов по EXPLAIN"""
+    with session_factory() as db:
+        for read in WARMUP_READS:
+            try:
+                read(db)
+            except HTTPException:
+                pass
+
+
+def warm_up(session_factories: Iterable[sessionmaker]):
+    """Один проход прогрева; длительность шагов сохраняется в `state`"""
+    steps = [
+        ("mappers", configure_mappers),
+        ("auth", prime_auth),
+    ]
+    for index, session_factory in enumerate(session_factories):
+        steps.append((
+            f"pool:{index}",
+            lambda factory=session_factory: open_pool(
+                factory, WARMUP_POOL_CONNECTIONS),
+        ))
+        steps.append((
+            f"statements:{index}",
+            lambda factory=session_factory: prime_statements(factory),
+        ))
+    for name, step in steps:
+        started = perf_counter()
+        step()
+        state.steps[name] = round(perf_counter() - started, 4)
+    state.ready = True
+    state.error = None
+
+
+def run_warm_up(session_factories: Callable[[], List[sessionmaker]]):
+    """Повторяет прогрев, пока он не пройдет (например, пока БД
+    недоступна) или процесс не остановится. Непредвиденная ошибка тоже
+    не останавливает поток: она пишется в журнал с трассировкой и в
+    `state.error`, который отдает `/health/ready`"""
+    while not _stopped.is_set():
+        state.attempts += 1
+        try:
+            warm_up(session_factories())
+            logger.info("Прогрев завершен: %s", state.steps)
+            return
+        except (SQLAlchemyError, OSError) as e:
+            state.error = str(e)
+            logger.warning("Прогрев не удался, повтор: %s", e)
+        except Exception as e:
+            state.error = f"{type(e).__name__}: {e}"
+            logger.exception("Ошибка прогрева, повтор")
+        _stopped.wait(WARMUP_RETRY_SECONDS)
+
+
+def start_warm_up(session_factories: Callable[[], List[sessionmaker]]):
+    """Прогрев в фоновом потоке; готовность — `state.ready`"""
+    _stopped.clear()
+    Thread(
+        target=run_warm_up, args=(session_factories,),
+        name="warmup", daemon=True,
+    ).start()
+
+
+def stop_warm_up():
+    _stopped.set()
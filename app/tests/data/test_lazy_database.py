@@ -0,0 +1,57 @@
+from benchmarks.import_time import measure, packages, parse_importtime
+
+from app.data import database
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     jose.constants
+import time:      2000 |       2120 |   jose
+import time:       500 |       2620 | app.services.user_service
+"""
+
+
+def test_parse_importtime():
+    modules = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert modules["jose"] == {"self_ms": 2.0, "cumulative_ms": 2.12}
+    assert modules["app.services.user_service"]["cumulative_ms"] == 2.62
+    assert packages(modules) == {"jose": 2.12, "app": 0.5}
+
+
+def test_app_import_defers_database_and_auth_backends():
+    run = measure()
+
+    assert run["deferred"] == []
+    assert "app.main" in run["modules"]
+
+
+def test_databases_are_created_once_on_first_access():
+    databases = database.get_databases()
+
+    assert database.engine is databases.engine
+    assert database.SessionLocal is databases.session_factory
+    assert database.get_databases() is databases
+
+
+def test_every_engine_gets_the_per_worker_pool_limits(monkeypatch, tmp_path):
+    urls = {
+        name: f"sqlite:///{tmp_path / name}.db"
+        for name in ("primary", "replica", "north")
+    }
+    monkeypatch.setattr(database, "_databases", None)
+    monkeypatch.setattr(database, "DATABASE_URL", urls["primary"])
+    monkeypatch.setattr(database, "DB_REPLICA_URLS", [urls["replica"]])
+    monkeypatch.setattr(database, "DB_SHARD_URLS", {"north": urls["north"]})
+    monkeypatch.setattr(database, "DB_TENANT_SHARDS", {})
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 1)
+
+    databases = database.get_databases()
+
+    engines = [
+        shard.engine for shard in databases.shard_router.shards.values()]
+    engines += [replica.engine for replica in databases.replica_pool.replicas]
+    assert len(engines) == 3
+    for engine in engines:
+        assert engine.pool.size() == 2
+        assert engine.pool._max_overflow == 1
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.data.replicas import (
+    ReplicaPool,
+    format_lsn,
+    mark_write,
+    parse_lsn,
+    track_routing,
+)
+
+
+def make_pool(count, strategy="round_robin"):
+    pool = ReplicaPool(
+        [create_engine("sqlite://") for _ in range(count)], strategy)
+    for replica in pool.replicas:
+        replica.healthy = True
+    return pool
+
+
+def test_parse_and_format_lsn():
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert format_lsn(parse_lsn("16/B374D848")) == "16/B374D848"
+    assert parse_lsn("garbage") is None
+    assert parse_lsn(None) is None
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ReplicaPool([], "random")
+
+
+def test_choose_round_robin_skips_unhealthy():
+    pool = make_pool(3)
+    pool.replicas[1].healthy = False
+
+    chosen = [pool.choose() for _ in range(4)]
+
+    assert chosen == [
+        pool.replicas[0], pool.replicas[2], pool.replicas[0],
+        pool.replicas[2],
+    ]
+
+
+def test_choose_least_connections():
+    pool = ReplicaPool([MagicMock(), MagicMock()], "least_connections")
+    for replica, connections in zip(pool.replicas, (3, 1)):
+        replica.healthy = True
+        replica.engine.pool.checkedout.return_value = connections
+
+    assert pool.choose() is pool.replicas[1]
+
+
+def test_choose_requires_replayed_lsn():
+    pool = make_pool(2)
+    pool.replicas[0].replay_lsn = parse_lsn("0/100")
+    pool.replicas[1].replay_lsn = parse_lsn("0/200")
+
+    assert pool.choose(parse_lsn("0/180")) is pool.replicas[1]
+    assert pool.choose(parse_lsn("0/300")) is None
+
+
+def test_check_health_marks_failed_replica():
+    pool = make_pool(1)
+
+    pool.check_health()
+
+    assert pool.replicas[0].healthy is False
+    assert pool.choose() is None
+
+
+def test_mark_write_only_inside_request():
+    mark_write(MagicMock())
+
+    with track_routing() as routing:
+        mark_write(MagicMock())
+
+    assert routing.wrote is True
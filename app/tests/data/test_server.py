@@ -0,0 +1,27 @@
+import pytest
+
+from app.server import pool_limits, worker_count
+
+
+def test_worker_count_defaults_to_cpus():
+    assert worker_count(8) == 8
+    assert worker_count(0) == 1
+    assert worker_count(8, "3") == 3
+
+
+def test_pool_limits_split_budget_between_workers():
+    assert pool_limits(90, 4) == (15, 7)
+    assert pool_limits(16, 16) == (1, 0)
+
+
+def test_pool_limits_reject_budget_below_workers():
+    with pytest.raises(ValueError):
+        pool_limits(10, 16)
+
+
+def test_pool_limits_stay_within_budget():
+    for budget in (8, 40, 97, 200):
+        for workers in (1, 3, 8):
+            pool_size, max_overflow = pool_limits(budget, workers)
+            assert pool_size >= 1
+            assert (pool_size + max_overflow) * workers <= budget
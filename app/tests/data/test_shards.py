@@ -0,0 +1,89 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.data import database, query_stats
+from app.data.query_stats import register_query_timing
+from app.data.shards import Shard, ShardRouter, parse_pairs
+
+
+def make_shard(name):
+    engine = create_engine("sqlite://")
+    register_query_timing(engine)
+    return Shard(name, engine, sessionmaker(bind=engine))
+
+
+def test_parse_pairs_keeps_equals_in_value():
+    assert parse_pairs("north=postgresql://h/db?sslmode=require, bad,") == {
+        "north": "postgresql://h/db?sslmode=require"}
+
+
+def test_shard_for_tenant():
+    default, north = make_shard("default"), make_shard("north")
+    router = ShardRouter(default, [north], {"spb": "north"})
+
+    assert router.shard_for(None) is default
+    assert router.shard_for("spb") is north
+    assert router.shard_for("north") is north
+    with pytest.raises(KeyError):
+        router.shard_for("msk")
+
+
+def test_tenant_to_unknown_shard():
+    with pytest.raises(ValueError):
+        ShardRouter(make_shard("default"), tenants={"spb": "north"})
+
+
+def test_fan_out_counts_one_copy_in_budget():
+    router = ShardRouter(
+        make_shard("default"), [make_shard("north"), make_shard("south")])
+
+    with query_stats.track_request({}) as stats:
+        results = router.fan_out(
+            lambda db: db.execute(text("SELECT 1")).scalar())
+
+    assert results == [("default", 1), ("north", 1), ("south", 1)]
+    assert stats.count == 3
+    assert stats.count - stats.shard_repeats == 1
+
+
+def test_fan_out_closes_sessions():
+    session = MagicMock()
+    shard = Shard("default", None, MagicMock(return_value=session))
+
+    assert ShardRouter(shard).fan_out(lambda db: "ok") == [("default", "ok")]
+    session.close.assert_called_once()
+
+
+def test_user_db_ignores_tenant(monkeypatch):
+    default, north = make_shard("default"), make_shard("north")
+    router = ShardRouter(default, [north], {"spb": "north"})
+    monkeypatch.setattr(
+        database, "_databases",
+        database.Databases(default.engine, default.session_factory, None,
+                           router))
+
+    sessions = database.get_user_db()
+    db = next(sessions)
+
+    assert db.get_bind() is default.engine
+    sessions.close()
+
+
+def test_user_read_db_is_read_session_of_default_shard(monkeypatch):
+    default, north = make_shard("default"), make_shard("north")
+    router = ShardRouter(default, [north], {"spb": "north"})
+    monkeypatch.setattr(
+        database, "_databases",
+        database.Databases(default.engine, default.session_factory, None,
+                           router))
+
+    sessions = database.get_user_read_db()
+    db = next(sessions)
+
+    assert db.get_bind() is default.engine
+    assert db.info["statement_timeout"] == (
+        database.REQUEST_STATEMENT_TIMEOUT_MS)
+    sessions.close()
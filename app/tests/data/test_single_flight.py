@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.data.replicas import track_routing
+from app.data.single_flight import (
+    SINGLE_FLIGHT_INFO_KEY,
+    SingleFlight,
+    bump_generation,
+    coalesced,
+    flights,
+)
+from app.schemas.utils import QueryParams
+
+
+def read_session(shard="default"):
+    db = MagicMock(spec=Session)
+    db.info = {SINGLE_FLIGHT_INFO_KEY: shard}
+    return db
+
+
+def wait_for_waiters(call_flights, key, count):
+    for _ in range(1000):
+        call = call_flights._calls.get(key)
+        if call is not None and call.waiters == count:
+            return
+        Event().wait(0.005)
+    raise AssertionError("Ожидающие потоки не присоединились")
+
+
+def test_concurrent_calls_share_one_result():
+    single_flight = SingleFlight()
+    release = Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return ["warehouse"]
+
+    with ThreadPoolExecutor(5) as pool:
+        futures = [
+            pool.submit(single_flight.do, "key", load) for _ in range(5)]
+        wait_for_waiters(single_flight, "key", 4)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.in_flight() == 0
+
+
+def test_error_is_raised_for_every_waiter():
+    single_flight = SingleFlight()
+    release = Event()
+
+    def load():
+        release.wait(5)
+        raise HTTPException(status_code=404, detail="Склад не найден")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [
+            pool.submit(single_flight.do, "key", load) for _ in range(3)]
+        wait_for_waiters(single_flight, "key", 2)
+        release.set()
+        errors = []
+        for future in futures:
+            with pytest.raises(HTTPException) as error:
+                future.result()
+            errors.append(error.value)
+
+    assert len({id(error) for error in errors}) == 3
+    assert all(error.status_code == 404 for error in errors)
+    assert all(error.detail == "Склад не найден" for error in errors)
+    assert single_flight.in_flight() == 0
+
+
+def test_sequential_calls_are_not_cached():
+    single_flight = SingleFlight()
+    load = MagicMock(side_effect=[1, 2])
+
+    assert single_flight.do("key", load) == 1
+    assert single_flight.do("key", load) == 2
+
+
+def test_coalesced_skips_write_sessions(monkeypatch):
+    db = MagicMock(spec=Session)
+    db.info = {}
+    load = MagicMock(return_value="row")
+    monkeypatch.setattr(flights, "do", MagicMock())
+
+    assert coalesced(load)(1, db) == "row"
+    flights.do.assert_not_called()
+
+
+def test_coalesced_key_includes_params_shard_lsn_and_generation(
+    monkeypatch,
+):
+    keys = []
+    monkeypatch.setattr(
+        flights, "do", lambda key, fn: keys.append(key))
+
+    @coalesced
+    def load(db, query_params):
+        return None
+
+    load(read_session(), QueryParams(filter='{"name": "a"}'))
+    load(read_session(), QueryParams(filter='{"name": "a"}'))
+    load(read_session(), QueryParams(filter='{"name": "b"}'))
+    load(read_session("eu"), QueryParams(filter='{"name": "a"}'))
+    with track_routing(read_after_lsn=10):
+        load(read_session(), QueryParams(filter='{"name": "a"}'))
+    bump_generation()
+    load(read_session(), QueryParams(filter='{"name": "a"}'))
+
+    assert keys[0] == keys[1]
+    assert len(set(keys)) == 5
@@ -0,0 +1,72 @@
+import logging
+
+from app.data.query_stats import RequestQueryStats
+from app.data.slow_queries import SlowQueryLog, fingerprint, parameter_shapes
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    statement = (
+        "SELECT products.id FROM products\n"
+        "WHERE products.name ILIKE %(name_1)s AND products.id IN "
+        "(%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) AND products.quantity > 5 "
+        "AND note = 'it''s' LIMIT %(param_1)s"
+    )
+
+    assert fingerprint(statement) == (
+        "SELECT products.id FROM products WHERE products.name ILIKE ? "
+        "AND products.id IN (...) AND products.quantity > ? "
+        "AND note = ? LIMIT ?"
+    )
+
+
+def test_parameter_shapes_hide_values():
+    assert parameter_shapes({"name": "secret", "ids": [1, 2, 3]}) == {
+        "name": "str", "ids": "list[3]"}
+    assert parameter_shapes([{"id": 1}, {"id": 2}]) == {
+        "executemany": 2, "row": {"id": "int"}}
+
+
+def test_record_aggregates_by_fingerprint():
+    log = SlowQueryLog(threshold_ms=1000)
+
+    log.record("SELECT * FROM t WHERE id = %(id_1)s", {"id_1": 1}, 0.01, None)
+    log.record("SELECT * FROM t WHERE id = %(id_1)s", {"id_1": 2}, 0.03, None)
+    log.record("SELECT 1", {}, 0.001, None)
+
+    top = log.top(limit=1)
+    assert len(top) == 1
+    assert top[0].fingerprint == "SELECT * FROM t WHERE id = ?"
+    assert top[0].calls == 2
+    assert round(top[0].total_ms) == 40
+    assert round(top[0].max_ms) == 30
+    assert top[0].slow_calls == 0
+
+
+def test_slow_query_logged_with_route_and_client_filter(caplog):
+    log = SlowQueryLog(threshold_ms=100)
+    stats = RequestQueryStats(scope={
+        "method": "GET",
+        "query_string": b'filter={"name":{"ILIKE":"lap"}}',
+    })
+
+    with caplog.at_level(logging.WARNING):
+        log.record(
+            "SELECT * FROM products WHERE name ILIKE %(name_1)s",
+            {"name_1": "%lap%"}, 0.25, stats,
+        )
+
+    stat = log.top()[0]
+    assert stat.slow_calls == 1
+    assert stat.last_slow_filter == '{"name":{"ILIKE":"lap"}}'
+    assert '{"name":{"ILIKE":"lap"}}' in caplog.text
+    assert "'name_1': 'str'" in caplog.text
+    assert "%lap%" not in caplog.text
+
+
+def test_max_fingerprints_bounds_memory():
+    log = SlowQueryLog(threshold_ms=1000, max_fingerprints=2)
+
+    for table in ("a", "b", "c"):
+        log.record(f"SELECT * FROM {table}", {}, 0.001, None)
+
+    assert len(log.top()) == 2
@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock
+
+from app.data.database import apply_statement_timeout
+
+
+def test_statement_timeout_set_for_marked_sessions():
+    session = MagicMock(info={"statement_timeout": 2500})
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+
+    apply_statement_timeout(session, None, connection)
+
+    connection.exec_driver_sql.assert_called_once_with(
+        "SET LOCAL statement_timeout = 2500")
+
+
+def test_statement_timeout_skipped_without_limit():
+    connection = MagicMock()
+    connection.dialect.name = "postgresql"
+
+    apply_statement_timeout(MagicMock(info={}), None, connection)
+
+    connection.exec_driver_sql.assert_not_called()
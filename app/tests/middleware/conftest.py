@@ -0,0 +1,11 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.data.query_stats import register_query_timing
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    register_query_timing(engine)
+    return engine
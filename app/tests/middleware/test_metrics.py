@@ -0,0 +1,72 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.main import app as main_app
+from app.middleware.metrics import MetricsMiddleware
+
+
+@pytest.fixture
+def client(sqlite_engine):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_middleware_records_route_template(client):
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before_count = sample("db_queries_per_request_count", **labels)
+    before_sum = sample("db_queries_per_request_sum", **labels)
+
+    response = client.get("/items/42")
+
+    assert response.status_code == 200
+    assert sample("db_queries_per_request_count", **labels) == (
+        before_count + 1)
+    assert sample("db_queries_per_request_sum", **labels) == before_sum + 2
+    assert sample(
+        "http_request_duration_seconds_count", status="200", **labels) >= 1
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_metrics_middleware_groups_unmatched_routes(client):
+    labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/no-such-path/1")
+    client.get("/no-such-path/2")
+
+    assert sample(
+        "http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_metrics_endpoint_exposes_pool_gauges():
+    response = TestClient(main_app).get("/metrics")
+
+    assert response.status_code == 200
+    assert "db_pool_size" in response.text
+    assert "http_request_duration_seconds" in response.text
+
+
+def test_metrics_endpoint_reads_worker_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    response = TestClient(main_app).get("/metrics")
+
+    assert response.status_code == 200
+    assert "db_pool_size" in response.text
+    assert "http_request_duration_seconds" not in response.text
@@ -0,0 +1,107 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.data import query_stats
+from app.middleware.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    assert_max_queries,
+    query_budget,
+)
+
+
+def make_client(sqlite_engine, mode):
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, mode=mode)
+
+    @app.get("/items/{count}")
+    @query_budget(3)
+    def get_items(count: int):
+        with sqlite_engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(text("SELECT 1"))
+        return {"count": count}
+
+    @app.get("/unbudgeted")
+    def get_unbudgeted():
+        with sqlite_engine.connect() as conn:
+            for _ in range(10):
+                conn.execute(text("SELECT 1"))
+        return {}
+
+    return TestClient(app)
+
+
+def test_query_count_header(sqlite_engine):
+    client = make_client(sqlite_engine, "raise")
+
+    response = client.get("/items/2")
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "2"
+
+
+def test_budget_exceeded_raises_in_raise_mode(sqlite_engine):
+    client = make_client(sqlite_engine, "raise")
+
+    with pytest.raises(QueryBudgetExceeded) as exc_info:
+        client.get("/items/5")
+
+    assert "выполнено 5 SQL-запросов при бюджете 3" in str(exc_info.value)
+    assert "N+1" in str(exc_info.value)
+
+
+def test_budget_exceeded_logs_in_log_mode(sqlite_engine, caplog):
+    client = make_client(sqlite_engine, "log")
+
+    response = client.get("/items/5")
+
+    assert response.status_code == 200
+    assert "/items/{count}" in caplog.text
+
+
+def test_routes_without_budget_are_not_checked(sqlite_engine):
+    client = make_client(sqlite_engine, "raise")
+
+    response = client.get("/unbudgeted")
+
+    assert response.headers["X-Query-Count"] == "10"
+
+
+def test_assert_max_queries(sqlite_engine):
+    with assert_max_queries(2) as stats:
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert stats.count == 1
+
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_max_queries(1):
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+
+def test_capped_range_limit_header():
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, mode="log")
+
+    @app.get("/capped")
+    def get_capped():
+        query_stats.current_stats().range_limit = 100
+        return []
+
+    response = TestClient(app).get("/capped")
+
+    assert response.headers["X-Range-Limit"] == "100"
+
+
+def test_budget_exceeded_fails_before_response_in_raise_mode(sqlite_engine):
+    app = make_client(sqlite_engine, "raise").app
+    client = TestClient(app, raise_server_exceptions=False)
+
+    response = client.get("/items/5")
+
+    assert response.status_code == 500
+    assert "X-Query-Count" not in response.headers
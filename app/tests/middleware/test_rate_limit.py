@@ -0,0 +1,148 @@
+import math
+import sys
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limit import (
+    MemoryBackend,
+    Rate,
+    RateLimitMiddleware,
+    RedisBackend,
+    create_backend,
+    parse_rate,
+    rate_limit,
+)
+from app.services.user_service import create_access_token
+
+
+class FakeRedis:
+    """Локальная замена Redis: исполняет скрипт ведра токенов на Python"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.calls = []
+
+    def eval(self, script, numkeys, key, burst, per_second, now):
+        self.calls.append((numkeys, key))
+        tokens, updated = self.hashes.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0, now - updated) * per_second)
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / per_second
+        self.hashes[key] = (tokens, now)
+        return str(wait)
+
+
+def make_client(backend, default="100/60"):
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware, router=app.router, backend=backend,
+        default=default)
+
+    @app.get("/limited")
+    @rate_limit(2, 60)
+    def limited():
+        return {}
+
+    @app.get("/default")
+    def default_route():
+        return {}
+
+    return TestClient(app)
+
+
+def test_parse_rate():
+    assert parse_rate("100/60") == Rate(100, 60.0, 100)
+    assert parse_rate("10/1/50") == Rate(10, 1.0, 50)
+
+
+def test_memory_bucket_refills():
+    backend, rate = MemoryBackend(), Rate(2, 10, 2)
+
+    assert backend.acquire("k", rate, now=0) == 0
+    assert backend.acquire("k", rate, now=0) == 0
+    assert math.isclose(backend.acquire("k", rate, now=0), 5)
+    assert backend.acquire("k", rate, now=5) == 0
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend, rate = MemoryBackend(max_buckets=2), Rate(1, 1, 1)
+
+    backend.acquire("a", rate, now=0)
+    backend.acquire("b", rate, now=1)
+    backend.acquire("a", rate, now=2)
+    backend.acquire("c", rate, now=3)
+
+    assert list(backend._buckets) == ["a", "c"]
+
+
+def test_create_backend_builds_redis_backend_from_url(monkeypatch):
+    fake, urls = FakeRedis(), []
+
+    def from_url(url):
+        urls.append(url)
+        return fake
+
+    monkeypatch.setitem(
+        sys.modules, "redis",
+        SimpleNamespace(Redis=SimpleNamespace(from_url=from_url)))
+
+    backend = create_backend("redis://cache:6379/0")
+
+    assert isinstance(backend, RedisBackend)
+    assert urls == ["redis://cache:6379/0"]
+    assert backend.acquire("k", Rate(1, 2, 1), now=100) == 0
+    assert fake.calls == [(1, "rate:k")]
+
+
+def test_create_backend_defaults_to_memory():
+    assert isinstance(create_backend(None), MemoryBackend)
+
+
+def test_redis_backend_with_fake():
+    fake = FakeRedis()
+    backend, rate = RedisBackend(fake), Rate(1, 2, 1)
+
+    assert backend.acquire("k", rate, now=100) == 0
+    assert backend.acquire("k", rate, now=101) == 1
+    assert fake.calls[0] == (1, "rate:k")
+
+
+def test_route_limit_returns_retry_after():
+    client = make_client(MemoryBackend())
+
+    assert client.get("/limited").status_code == 200
+    assert client.get("/limited").status_code == 200
+    response = client.get("/limited")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert client.get("/default").status_code == 200
+
+
+def test_buckets_are_per_user():
+    client = make_client(RedisBackend(FakeRedis()))
+    tokens = [
+        create_access_token({"sub": name, "uid": uid})
+        for name, uid in (("alice", 1), ("bob", 2))
+    ]
+
+    for token in tokens:
+        headers = {"Authorization": f"Bearer {token}"}
+        statuses = [
+            client.get("/limited", headers=headers).status_code
+            for _ in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+
+
+def test_default_limit_by_ip():
+    client = make_client(MemoryBackend(), default="1/60")
+
+    assert client.get("/default").status_code == 200
+    assert client.get("/default").status_code == 429
+    assert client.get("/missing").status_code == 404
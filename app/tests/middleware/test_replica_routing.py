@@ -0,0 +1,54 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.data import replicas
+from app.middleware.replicas import ReplicaRoutingMiddleware
+
+
+def make_client(monkeypatch, seen):
+    monkeypatch.setattr(replicas, "primary_lsn", lambda engine: "0/16B3748")
+    app = FastAPI()
+    app.add_middleware(ReplicaRoutingMiddleware, engine=None, pool=object())
+
+    @app.post("/items")
+    def create_item():
+        replicas.mark_write(None)
+        return {}
+
+    @app.get("/items")
+    def get_items():
+        seen.append(replicas.current_routing().read_after_lsn)
+        return {}
+
+    return TestClient(app)
+
+
+def test_write_returns_lsn(monkeypatch):
+    client = make_client(monkeypatch, [])
+
+    response = client.post("/items")
+
+    assert response.headers["X-Read-After-LSN"] == "0/16B3748"
+    assert response.cookies[replicas.READ_AFTER_LSN_COOKIE] == "0/16B3748"
+
+
+def test_read_without_write_sets_nothing(monkeypatch):
+    client = make_client(monkeypatch, [])
+
+    response = client.get("/items")
+
+    assert "X-Read-After-LSN" not in response.headers
+    assert "set-cookie" not in response.headers
+
+
+def test_read_after_lsn_from_cookie_and_header(monkeypatch):
+    seen = []
+    client = make_client(monkeypatch, seen)
+
+    client.post("/items")
+    client.get("/items")
+    client.cookies.clear()
+    client.get("/items", headers={"X-Read-After-LSN": "0/FF"})
+    client.get("/items")
+
+    assert seen == [replicas.parse_lsn("0/16B3748"), 0xFF, None]
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.data.database import (
+    get_db, get_read_db, get_user_db, get_user_read_db
+)
+from app.data.query_stats import register_query_timing
+from app.middleware.query_budget import QueryBudgetMiddleware
+from app.models.base import Base
+from app.models.user import User
+from app.models.warehouse import Category, Product, Warehouse
+from app.routers import auth, product, warehouse
+from app.services import user_service
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool,
+        connect_args={"check_same_thread": False})
+    register_query_timing(engine)
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Category.__table__, Warehouse.__table__,
+        Product.__table__,
+    ])
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        now = datetime(2025, 1, 1)
+        db.add_all([
+            User(id=1, username="alice", email="alice@example.com",
+                 hashed_password="x"),
+            Category(id=1, name="Инструменты"),
+            Warehouse(id=1, name="Север", address="a", is_active=True),
+        ])
+        db.flush()
+        db.add(Product(
+            id=1, name="Дрель", category_id=1, warehouse_id=1, quantity=5,
+            created_by=1, created_at=now, updated_at=now))
+        db.commit()
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware, mode="raise")
+    for router in (auth.router, product.router, warehouse.router):
+        app.include_router(router)
+    for dependency in (get_db, get_read_db, get_user_db, get_user_read_db):
+        app.dependency_overrides[dependency] = override_db
+    token = user_service.create_access_token({"sub": "alice"})
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+
+@pytest.mark.parametrize("path, queries", [
+    ("/users/me", 1),
+    ("/products/1", 2),
+    ("/products/", 2),
+    ("/warehouses/1", 2),
+    ("/warehouses/", 2),
+])
+def test_read_routes_stay_within_budget(client, path, queries):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == str(queries)
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.alert import StockAlertEvent
+from app.services import change_feed
+from app.services.alert_service import (
+    IDS_SCOPE,
+    evaluate_products,
+    get_alert_events,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+def test_evaluate_products_by_ids(mock_db):
+    evaluate_products(mock_db, [3, 5])
+
+    statement, params = mock_db.execute.call_args[0]
+    assert IDS_SCOPE in str(statement)
+    assert "INSERT INTO stock_alert_events" in str(statement)
+    assert params["ids"] == [3, 5]
+
+
+def test_evaluate_products_skips_empty_ids(mock_db):
+    evaluate_products(mock_db, [])
+
+    mock_db.execute.assert_not_called()
+
+
+def test_evaluate_products_by_scope(mock_db):
+    scope = "SELECT id FROM products WHERE category_id = :category_id"
+    evaluate_products(mock_db, scope=scope, params={"category_id": 7})
+
+    statement, params = mock_db.execute.call_args[0]
+    assert scope in str(statement)
+    assert params["category_id"] == 7
+    assert "ids" not in params
+
+
+def test_get_alert_events_cursor(mock_db):
+    events = [StockAlertEvent(id=9, txid=700), StockAlertEvent(id=4, txid=701)]
+    query = mock_db.query.return_value.filter.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.all.return_value = events
+
+    result = get_alert_events(mock_db, after="700,3", limit=2)
+
+    assert result["events"] == events
+    assert result["next_after"] == "701,4"
+
+
+def test_get_alert_events_waits_for_running_transactions():
+    db = Session()
+
+    query = change_feed.feed_query(
+        db.query(StockAlertEvent),
+        StockAlertEvent.txid, StockAlertEvent.id, "700,3",
+    )
+
+    sql = str(query)
+    assert (
+        "stock_alert_events.txid < "
+        "txid_snapshot_xmin(txid_current_snapshot())"
+    ) in sql
+    assert "(stock_alert_events.txid, stock_alert_events.id) > " in sql
+    assert sql.endswith(
+        "ORDER BY stock_alert_events.txid, stock_alert_events.id")
+
+
+def test_get_alert_events_empty_keeps_cursor(mock_db):
+    query = mock_db.query.return_value.filter.return_value.filter.return_value
+    query.order_by.return_value.limit.return_value.all.return_value = []
+
+    assert get_alert_events(mock_db, after="700,12")["next_after"] == (
+        "700,12")
+
+
+def test_get_alert_events_rejects_bad_cursor(mock_db):
+    with pytest.raises(HTTPException) as exc_info:
+        get_alert_events(mock_db, after="12")
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,68 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+import pytest
+
+from app.services import archive_service
+from app.services.archive_service import (
+    ARCHIVE_PRODUCTS_SQL,
+    REMAINING_STOCK_SQL,
+    archive_cutoff,
+    archive_products,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+def test_archive_cutoff():
+    cutoff = archive_cutoff(30)
+
+    assert (datetime.utcnow() - cutoff).days == 30
+
+
+def test_archive_products_in_chunks(mock_db):
+    mock_db.execute.return_value.scalars().all.side_effect = [
+        [1, 2], [5], []]
+    progress = []
+
+    archived = archive_products(
+        mock_db, datetime(2025, 1, 1), chunk_size=2,
+        on_chunk=progress.append)
+
+    assert archived == 3
+    assert progress == [2, 3]
+    assert mock_db.commit.call_count == 2
+    candidate_params = [
+        call[0][1] for call in mock_db.execute.call_args_list
+        if "last_id" in call[0][1]
+    ]
+    assert [params["last_id"] for params in candidate_params] == [0, 2, 5]
+    archive_params = mock_db.execute.call_args_list[1][0][1]
+    assert archive_params["ids"] == [1, 2]
+
+
+def test_archive_products_nothing_to_archive(mock_db):
+    mock_db.execute.return_value.scalars().all.return_value = []
+
+    assert archive_products(mock_db, datetime(2025, 1, 1), 100) == 0
+    mock_db.commit.assert_not_called()
+
+
+def test_archive_products_writes_off_remaining_stock(mock_db, monkeypatch):
+    mock_db.execute.return_value.scalars().all.side_effect = [[7], []]
+    mock_db.execute.return_value.mappings.return_value = [
+        {"product_id": 7, "warehouse_id": 2, "delta": -4}]
+    record = MagicMock()
+    monkeypatch.setattr(
+        archive_service.movement_service, "record_movements", record)
+
+    archive_products(mock_db, datetime(2025, 1, 1), 100)
+
+    record.assert_called_once_with(
+        mock_db, [{"product_id": 7, "warehouse_id": 2, "delta": -4}],
+        "archive")
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert statements.index(REMAINING_STOCK_SQL) < statements.index(
+        ARCHIVE_PRODUCTS_SQL)
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.user import User
+from app.models.warehouse import Category, Product, Warehouse
+from app.schemas.utils import QueryParams
+from app.schemas.warehouse import ProductResponse
+from app.services import fast_json
+from app.services.alert_service import get_low_stock_products
+from app.services.filter_service import get_filtered_data
+from app.services.product_service import PRODUCT_COLUMNS, get_products
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Category.__table__, Warehouse.__table__,
+        Product.__table__,
+    ])
+    with Session(engine) as session:
+        session.add_all([
+            User(id=1, username="admin", hashed_password="x"),
+            Category(id=1, name="Категория"),
+            Warehouse(id=1, name="Склад", address="Адрес"),
+            Product(
+                id=1, name="Товар «1»", category_id=1, warehouse_id=1,
+                quantity=7, reserved_quantity=2, reorder_threshold=5,
+                created_by=1, created_at=datetime(2025, 3, 1, 12, 0, 0, 123),
+                updated_at=datetime(2025, 3, 2),
+            ),
+            Product(
+                id=2, name="Товар 2", category_id=1, warehouse_id=1,
+                quantity=None, is_active=False, low_stock=True,
+                created_by=1, updated_by=1,
+            ),
+        ])
+        session.commit()
+        yield session
+
+
+def expected(products):
+    return [
+        ProductResponse.model_validate(product).model_dump(mode="json")
+        for product in products
+    ]
+
+
+def test_product_rows_match_schema(db):
+    query_params = QueryParams(sort='[{"field": "id", "order": "DESC"}]')
+
+    response = fast_json.rows_response(
+        get_products(db, query_params, PRODUCT_COLUMNS))
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == expected(
+        get_products(db, query_params))
+
+
+def test_low_stock_rows_match_schema(db):
+    response = fast_json.rows_response(
+        get_low_stock_products(0, 100, db, PRODUCT_COLUMNS))
+
+    assert orjson.loads(response.body) == expected(
+        get_low_stock_products(0, 100, db))
+
+
+def test_schema_columns_cover_every_field():
+    assert [column.name for column in PRODUCT_COLUMNS] == list(
+        ProductResponse.model_fields)
+
+
+def test_sparse_fields_response(db):
+    query_params = QueryParams(fields="id, quantity,id")
+
+    response = fast_json.rows_response(
+        get_products(db, query_params, PRODUCT_COLUMNS))
+
+    assert orjson.loads(response.body) == [
+        {"id": 1, "quantity": 7}, {"id": 2, "quantity": 0}]
+
+
+def test_sparse_fields_reject_unknown(db):
+    with pytest.raises(HTTPException) as exc_info:
+        get_products(db, QueryParams(fields="id,deleted_at"))
+
+    assert exc_info.value.status_code == 400
+    assert "deleted_at" in exc_info.value.detail
+
+
+def test_filtered_data_fields(db):
+    rows = get_filtered_data(db, Category, QueryParams(
+        fields="name", filter='{"id": {"EQUAL": 1}}'))
+
+    assert [row._asdict() for row in rows] == [{"name": "Категория"}]
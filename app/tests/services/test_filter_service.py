@@ -0,0 +1,262 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.data import query_stats
+from app.models.base import Base
+from app.models.warehouse import Warehouse
+from app.schemas.utils import QueryParams
+from app.services import filter_service
+from app.services.filter_service import (
+    apply_filters,
+    apply_sorting,
+    guard_query,
+    page_bounds,
+    query_shape,
+    read_error,
+)
+from app.services.product_service import get_products
+from app.services.user_service import get_all_users
+from app.services.warehouse_service import get_warehouses
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Warehouse.__table__])
+    with Session(engine) as session:
+        session.add_all([
+            Warehouse(id=1, name="Север", address="a", is_active=True),
+            Warehouse(id=2, name="Юг", address="b", is_active=False),
+            Warehouse(id=3, name="Запад", address="c", is_active=True),
+        ])
+        session.commit()
+        yield session
+
+
+def test_whitelist_rejects_filter_and_sort():
+    query = MagicMock()
+
+    with pytest.raises(ValueError):
+        apply_filters(query, Warehouse, {"address": {"EQUAL": "a"}}, ["id"])
+    with pytest.raises(ValueError):
+        apply_sorting(query, Warehouse, [{"field": "address"}], ["id"])
+
+
+@pytest.mark.parametrize(
+    "sorting", [["name"], [["name", "ASC"]], {"field": "name"},
+                [{"field": "name", "order": 1}]])
+def test_sorting_rejects_malformed_items(sorting):
+    with pytest.raises(ValueError):
+        apply_sorting(MagicMock(), Warehouse, sorting)
+
+
+def test_sorting_collation_applies_to_string_fields(db):
+    query = apply_sorting(
+        db.query(Warehouse), Warehouse,
+        [{"field": "name"}, {"field": "id", "order": "DESC"}],
+        collation="C",
+    )
+
+    order_by = str(query).split("ORDER BY")[1]
+    assert 'warehouses.name COLLATE "C" ASC' in order_by
+    assert "warehouses.id DESC" in order_by
+
+
+@pytest.mark.parametrize("filters", [
+    {"name": "Север"},
+    {"name": {"LIKE": "Се"}},
+    [{"name": {"EQUAL": "Север"}}],
+])
+def test_invalid_filters_are_rejected(db, filters):
+    with pytest.raises(ValueError):
+        apply_filters(db.query(Warehouse), Warehouse, filters)
+
+
+def test_warehouses_filtered_sorted_in_sql(db):
+    query_params = QueryParams(
+        filter=json.dumps({"is_active": {"EQUAL": True}}),
+        sort=json.dumps([{"field": "name", "order": "DESC"}]),
+    )
+
+    result = get_warehouses(0, 100, db, query_params)
+
+    assert [warehouse.id for warehouse in result] == [1, 3]
+
+
+def test_skip_limit_used_without_range(db):
+    result = get_warehouses(1, 1, db, QueryParams())
+
+    assert [warehouse.id for warehouse in result] == [2]
+
+
+def test_warehouse_fields(db):
+    rows = get_warehouses(0, 100, db, QueryParams(fields="name"))
+
+    assert sorted(row._asdict()["name"] for row in rows) == [
+        "Запад", "Север", "Юг"]
+    assert all(list(row._asdict()) == ["name"] for row in rows)
+
+
+def test_user_password_hash_not_filterable():
+    query_params = QueryParams(
+        filter=json.dumps({"hashed_password": {"EQUAL": "x"}}))
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_all_users(0, 100, MagicMock(), query_params)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_user_password_hash_not_selectable():
+    with pytest.raises(HTTPException) as exc_info:
+        get_all_users(
+            0, 100, MagicMock(), QueryParams(fields="hashed_password"))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_products_reject_internal_fields():
+    query_params = QueryParams(
+        sort=json.dumps([{"field": "deleted_at"}]))
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_products(MagicMock(), query_params)
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.fixture
+def pg_db():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    return db
+
+
+@pytest.fixture(autouse=True)
+def clear_cost_cache():
+    filter_service._cost_cache.clear()
+
+
+def test_page_bounds_caps_limit(monkeypatch):
+    monkeypatch.setattr(filter_service, "MAX_LIMIT", 500)
+
+    assert page_bounds({}) == (0, 500)
+    assert page_bounds({"offset": 10, "limit": 10_000}) == (10, 500)
+    with pytest.raises(ValueError):
+        page_bounds({"limit": -1})
+    with pytest.raises(ValueError):
+        page_bounds({"limit": "all"})
+
+
+def test_page_bounds_rejects_list_range():
+    with pytest.raises(ValueError):
+        page_bounds([0, 10])
+
+
+def test_list_range_is_bad_request():
+    with pytest.raises(HTTPException) as exc_info:
+        get_warehouses(0, 100, MagicMock(), QueryParams(range="[0, 10]"))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_query_shape_ignores_values():
+    first = QueryParams(filter=json.dumps({"name": {"ILIKE": "болт"}}))
+    second = QueryParams(filter=json.dumps({"name": {"ILIKE": "гайка"}}))
+    third = QueryParams(filter=json.dumps({"name": {"EQUAL": "гайка"}}))
+
+    def shape(query_params):
+        return query_shape(Warehouse, query_params, 0, 100)
+
+    assert shape(first) == shape(second)
+    assert shape(first) != shape(third)
+
+
+def test_query_shape_separates_deep_offsets():
+    def shape(offset):
+        return query_shape(Warehouse, QueryParams(), offset, 100)
+
+    assert shape(0) != shape(5_000_000)
+    assert shape(600) == shape(1000)
+    assert shape(1000) != shape(5000)
+
+
+def test_filtered_data_shape_uses_skip_without_range(monkeypatch):
+    shapes = []
+    monkeypatch.setattr(
+        filter_service, "guard_query",
+        lambda db, query, shape: shapes.append(shape) or query)
+
+    for skip in (0, 1_000_000):
+        filter_service.get_filtered_data(
+            MagicMock(), Warehouse, QueryParams(), skip=skip, limit=20)
+
+    assert shapes[0][4:] == (20, 0)
+    assert shapes[1][4:] == (20, (1_000_000).bit_length())
+
+
+def test_guard_query_caches_explain_per_shape(pg_db, monkeypatch):
+    explain = MagicMock(return_value=10.0)
+    monkeypatch.setattr(filter_service, "explain_cost", explain)
+    query = MagicMock()
+
+    for _ in range(3):
+        assert guard_query(pg_db, query, ("shape",)) is query
+
+    explain.assert_called_once()
+
+
+def test_guard_query_rejects_expensive(pg_db, monkeypatch):
+    monkeypatch.setattr(filter_service, "explain_cost", lambda db, q: 1e9)
+
+    with pytest.raises(HTTPException) as exc_info:
+        guard_query(pg_db, MagicMock(), ("shape",))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_guard_query_caps_expensive(pg_db, monkeypatch):
+    monkeypatch.setattr(filter_service, "explain_cost", lambda db, q: 1e9)
+    monkeypatch.setattr(filter_service, "QUERY_COST_MODE", "cap")
+    query = MagicMock()
+
+    with query_stats.track_request({}) as stats:
+        guard_query(pg_db, query, ("Product", (), (), (), 1000, 0))
+
+    query.limit.assert_called_once_with(
+        filter_service.QUERY_COST_CAPPED_LIMIT)
+    assert stats.range_limit == filter_service.QUERY_COST_CAPPED_LIMIT
+
+
+def test_guard_query_cap_keeps_smaller_page(pg_db, monkeypatch):
+    monkeypatch.setattr(filter_service, "explain_cost", lambda db, q: 1e9)
+    monkeypatch.setattr(filter_service, "QUERY_COST_MODE", "cap")
+    query = MagicMock()
+
+    with query_stats.track_request({}) as stats:
+        guard_query(pg_db, query, ("Warehouse", (), (), (), 20, 20))
+
+    query.limit.assert_called_once_with(20)
+    assert stats.range_limit == 20
+
+
+def test_guard_query_skips_other_dialects(monkeypatch):
+    explain = MagicMock()
+    monkeypatch.setattr(filter_service, "explain_cost", explain)
+
+    guard_query(MagicMock(), MagicMock(), ("shape",))
+
+    explain.assert_not_called()
+
+
+def test_read_error_statement_timeout():
+    error = OperationalError("SELECT", {}, MagicMock(pgcode="57014"))
+
+    assert read_error(error).status_code == 503
+    assert read_error(OperationalError("SELECT", {}, None)).status_code == 500
@@ -0,0 +1,136 @@
+import io
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+
+from app.models.user import User
+from app.services.import_service import (
+    STAGING_COLUMNS,
+    STAGING_TABLE,
+    VALIDATION_SQL,
+    import_products,
+    parse_csv,
+    parse_upload,
+    parse_xlsx,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_user():
+    return User(id=1, username="test_user")
+
+
+def test_parse_csv_streams_rows_in_staging_order():
+    data = (
+        "\ufeffName;Category;Warehouse;Quantity\n"
+        "Ноутбук;Электроника;Склад №1;10\n"
+        "\n"
+        "Куртка;Одежда;Склад №2\n"
+        "Лишнее;Одежда;Склад №2;1;2\n"
+    ).encode("utf-8")
+
+    rows = list(parse_csv(io.BytesIO(data)))
+
+    assert len(rows[0]) == len(STAGING_COLUMNS)
+    assert rows[0] == (
+        2, "Ноутбук", "Электроника", "Склад №1", "10", None, None)
+    assert rows[1] == (4, "Куртка", "Одежда", "Склад №2", None, None, None)
+    assert rows[2][0] == 5
+    assert rows[2][-1] == "Лишние значения в строке"
+
+
+def test_parse_csv_missing_required_columns():
+    with pytest.raises(HTTPException) as exc_info:
+        list(parse_csv(io.BytesIO(b"name,quantity\nA,1\n")))
+
+    assert exc_info.value.status_code == 400
+    assert "category, warehouse" in exc_info.value.detail
+
+
+def test_parse_xlsx_normalizes_numeric_cells():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["name", "category", "warehouse", "quantity", "is_active"])
+    sheet.append(["Ноутбук", "Электроника", "Склад №1", 10.0, True])
+    data = io.BytesIO()
+    workbook.save(data)
+    data.seek(0)
+
+    rows = list(parse_xlsx(data))
+
+    assert rows == [
+        (2, "Ноутбук", "Электроника", "Склад №1", "10", "True", None)]
+
+
+def test_parse_upload_rejects_unknown_extension():
+    with pytest.raises(HTTPException) as exc_info:
+        parse_upload("products.txt", io.BytesIO(b""))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_import_products_reports_merge_and_errors(mock_db, mock_user):
+    cursor = MagicMock()
+    copied = []
+    cursor.copy_expert.side_effect = (
+        lambda statement, buffer: copied.append(buffer.read()))
+    mock_db.connection().connection.cursor.return_value = cursor
+    mock_db.execute().mappings().one.return_value = {
+        "inserted": 1, "updated": 0}
+    mock_db.execute().scalar.return_value = 1
+    mock_db.execute().mappings().all.return_value = [
+        {"row": 3, "error": "Категория не найдена"}]
+    data = (
+        "name,category,warehouse,quantity\n"
+        "Ноутбук,Электроника,Склад №1,10\n"
+        "Куртка,Нет такой,Склад №1,5\n"
+    ).encode("utf-8")
+
+    result = import_products("products.csv", io.BytesIO(data), mock_db,
+                             mock_user)
+
+    assert result == {
+        "total_rows": 2,
+        "inserted": 1,
+        "updated": 0,
+        "failed": 1,
+        "errors": [{"row": 3, "error": "Категория не найдена"}],
+    }
+    assert "Ноутбук,Электроника" in copied[0]
+    mock_db.commit.assert_called_once()
+
+
+def test_duplicate_rule_ignores_surrounding_spaces():
+    message, condition = next(
+        rule for rule in VALIDATION_SQL
+        if rule[0] == "Товар повторяется в файле")
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {STAGING_TABLE} "
+            f"(row_number integer, name text, error text)"))
+        conn.execute(
+            text(f"INSERT INTO {STAGING_TABLE} VALUES (:row, :name, NULL)"),
+            [{"row": 2, "name": "Foo"}, {"row": 3, "name": " Foo "},
+             {"row": 4, "name": "Bar"}],
+        )
+        conn.execute(
+            text(
+                f"UPDATE {STAGING_TABLE} AS s SET error = :message "
+                f"WHERE s.error IS NULL AND {condition}"
+            ),
+            {"message": message},
+        )
+        errors = conn.execute(text(
+            f"SELECT row_number, error FROM {STAGING_TABLE} "
+            f"ORDER BY row_number")).all()
+
+    assert errors == [(2, None), (3, message), (4, None)]
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.job import Job
+from app.models.user import User
+from app.models.warehouse import Warehouse
+from app.schemas.warehouse import BulkMoveCreate
+from app.services.job_service import (
+    enqueue_bulk_move,
+    get_job,
+    get_job_file,
+    run_bulk_move,
+    run_job,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_user():
+    return User(id=1, username="test_user")
+
+
+def test_enqueue_bulk_move_success(mock_db, mock_user):
+    mock_db.query().filter_by().first.return_value = Warehouse(id=2)
+
+    job = enqueue_bulk_move(
+        BulkMoveCreate(product_ids=[1, 2], destination_warehouse_id=2),
+        mock_db, mock_user)
+
+    assert job.kind == "bulk_move"
+    assert job.payload == {"product_ids": [1, 2],
+                           "destination_warehouse_id": 2}
+    assert job.created_by == 1
+    mock_db.add.assert_called_once_with(job)
+    mock_db.commit.assert_called_once()
+
+
+def test_enqueue_bulk_move_warehouse_not_found(mock_db, mock_user):
+    mock_db.query().filter_by().first.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        enqueue_bulk_move(
+            BulkMoveCreate(product_ids=[1], destination_warehouse_id=99),
+            mock_db, mock_user)
+
+    assert exc_info.value.status_code == 404
+    mock_db.add.assert_not_called()
+
+
+def test_get_job_not_found(mock_db):
+    mock_db.query().filter_by().first.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_job(99, mock_db)
+
+    assert exc_info.value.status_code == 404
+    assert "Задача не найдена" in exc_info.value.detail
+
+
+def test_get_job_file_requires_finished_job(mock_db):
+    mock_db.query().filter_by().first.return_value = Job(
+        id=1, status="running", result=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_job_file(1, mock_db)
+
+    assert exc_info.value.status_code == 404
+
+
+def test_run_job_success(mock_db):
+    job = Job(id=1, kind="test", attempts=1, max_attempts=3, total=None)
+
+    with patch.dict("app.services.job_service.JOB_HANDLERS",
+                    {"test": lambda db, job: {"ok": True}}):
+        run_job(mock_db, job)
+
+    assert job.status == "succeeded"
+    assert job.result == {"ok": True}
+    assert job.finished_at is not None
+    mock_db.commit.assert_called_once()
+
+
+def test_run_job_retries_with_backoff(mock_db):
+    job = Job(id=1, kind="test", attempts=1, max_attempts=3)
+    mock_db.get.return_value = job
+
+    def failing_handler(db, job):
+        raise RuntimeError("boom")
+
+    with patch.dict("app.services.job_service.JOB_HANDLERS",
+                    {"test": failing_handler}):
+        run_job(mock_db, job)
+
+    assert job.status == "queued"
+    assert job.error == "boom"
+    assert job.run_after is not None
+    mock_db.rollback.assert_called_once()
+
+
+def test_run_job_fails_after_last_attempt(mock_db):
+    job = Job(id=1, kind="unknown", attempts=3, max_attempts=3)
+    mock_db.get.return_value = job
+
+    run_job(mock_db, job)
+
+    assert job.status == "failed"
+    assert "Неизвестный тип задачи" in job.error
+    assert job.finished_at is not None
+
+
+def test_run_bulk_move_commits_per_chunk(mock_db):
+    job = Job(id=1, kind="bulk_move", created_by=1, payload={
+        "product_ids": [3, 1, 2, 3], "destination_warehouse_id": 2})
+    mock_db.execute.return_value.rowcount = 1
+
+    with patch("app.services.job_service.JOB_CHUNK_SIZE", 2):
+        result = run_bulk_move(mock_db, job)
+
+    assert result == {"moved": 2, "not_found": 1}
+    assert mock_db.commit.call_count == 3
@@ -0,0 +1,130 @@
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+
+from app.models.movement import StockDaily
+from app.models.warehouse import Product
+from app.services.movement_service import (
+    ensure_partitions,
+    get_stock_history,
+    get_stock_level,
+    month_start,
+    record_movements,
+    transfer_rows,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+def test_month_start_rolls_over_year():
+    assert month_start(date(2025, 11, 17), 2) == date(2026, 1, 1)
+    assert month_start(date(2025, 1, 5), -1) == date(2024, 12, 1)
+
+
+def test_ensure_partitions(mock_db):
+    mock_db.scalar.return_value = None
+
+    ensure_partitions(mock_db, months_ahead=2)
+
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert len(statements) == 3
+    assert all("PARTITION OF stock_movements" in sql for sql in statements)
+    mock_db.commit.assert_called_once()
+
+
+def test_ensure_partitions_moves_rows_out_of_default(mock_db):
+    mock_db.scalar.side_effect = [
+        "stock_movements_y2025m03", None, True]
+
+    ensure_partitions(mock_db, months_ahead=1)
+
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert len(statements) == 4
+    assert "DETACH PARTITION stock_movements_default" in statements[0]
+    assert "PARTITION OF stock_movements" in statements[1]
+    assert "DELETE FROM stock_movements_default" in statements[2]
+    assert "ATTACH PARTITION stock_movements_default DEFAULT" in (
+        statements[3])
+    mock_db.commit.assert_called_once()
+
+
+def test_record_movements_skips_zero_delta(mock_db):
+    record_movements(
+        mock_db, [{"product_id": 1, "warehouse_id": 1, "delta": 0}], "adjust")
+
+    mock_db.execute.assert_not_called()
+
+
+def test_record_movements_updates_daily_rollups(mock_db):
+    record_movements(
+        mock_db,
+        [
+            {"product_id": 1, "warehouse_id": 1, "delta": -3},
+            {"product_id": 1, "warehouse_id": 2, "delta": 3},
+            {"product_id": 2, "warehouse_id": 1, "delta": 5},
+        ],
+        "transfer", created_by=7, reference_id=11,
+    )
+
+    assert mock_db.execute.call_count == 2
+    journal = mock_db.execute.call_args_list[0][0][1]
+    assert len(journal) == 3
+    assert {row["reason"] for row in journal} == {"transfer"}
+    assert {row["reference_id"] for row in journal} == {11}
+    rollup = mock_db.execute.call_args_list[1][0][0]
+    assert "ON CONFLICT (product_id, day) DO UPDATE" in str(rollup)
+    params = rollup.compile().params
+    assert sorted(
+        value for key, value in params.items() if key.startswith("net_change")
+    ) == [0, 5]
+
+
+def test_transfer_rows():
+    rows = transfer_rows([(1, 3, 10)], 4)
+
+    assert rows == [
+        {"product_id": 1, "warehouse_id": 3, "delta": -10},
+        {"product_id": 1, "warehouse_id": 4, "delta": 10},
+    ]
+
+
+def test_get_stock_level(mock_db):
+    mock_db.query().filter_by().first.return_value = Product(
+        id=1, quantity=40)
+    mock_db.scalar.return_value = 15
+
+    result = get_stock_level(1, date(2025, 3, 1), mock_db)
+
+    assert result["quantity"] == 25
+
+
+def test_get_stock_level_product_not_found(mock_db):
+    mock_db.query().filter_by().first.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_stock_level(1, date(2025, 3, 1), mock_db)
+
+    assert exc_info.value.status_code == 404
+
+
+def test_get_stock_history_from_rollups(mock_db):
+    today = datetime.utcnow().date()
+    mock_db.query().filter_by().first.return_value = Product(
+        id=1, quantity=10)
+    mock_db.query().filter.return_value = [
+        StockDaily(product_id=1, day=today, net_change=-5, movements=1),
+        StockDaily(
+            product_id=1, day=today - timedelta(days=2),
+            net_change=12, movements=3),
+    ]
+
+    history = get_stock_history(1, 3, mock_db)
+
+    assert [day["day"] for day in history] == [
+        today - timedelta(days=2), today - timedelta(days=1), today]
+    assert [day["quantity"] for day in history] == [15, 15, 10]
+    assert [day["net_change"] for day in history] == [12, 0, -5]
@@ -2,15 +2,19 @@ from unittest.mock import MagicMock
 import pytest
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.models.user import User
-from app.models.warehouse import Category, Product, Warehouse
+from app.models.warehouse import Category, Product, ProductTombstone, Warehouse
 from app.schemas.utils import QueryParams
 from app.schemas.warehouse import ProductCreate, ProductMove, ProductUpdate
+from app.services import change_feed
 from app.services.product_service import (
     create_product,
     delete_product,
     get_product,
+    get_product_changes,
     get_products,
     move_product,
     update_product,
@@ -97,6 +101,8 @@ def test_get_products(mock_db):
     ]
     mock_query = MagicMock()
     mock_query.all.return_value = products
+    mock_query.filter_by.return_value = mock_query
+    mock_query.limit.return_value = mock_query
     mock_db.query.return_value = mock_query
 
     query_params = QueryParams()
@@ -153,6 +159,34 @@ def test_update_product_not_found(mock_db, mock_user):
     assert "Товар не найден" in exc_info.value.detail
 
 
+def test_update_product_version_mismatch(mock_db, mock_user):
+    product = Product(id=1, name="Test Product", quantity=10, version=3)
+    mock_db.query().filter_by().first.return_value = product
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_product(
+            1, ProductUpdate(quantity=20), mock_db, mock_user,
+            expected_version=2)
+
+    assert exc_info.value.status_code == 409
+    assert product.quantity == 10
+    mock_db.commit.assert_not_called()
+
+
+def test_update_product_concurrent_write(mock_db, mock_user):
+    product = Product(id=1, name="Test Product", quantity=10, version=3)
+    mock_db.query().filter_by().first.return_value = product
+    mock_db.commit.side_effect = StaleDataError()
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_product(
+            1, ProductUpdate(quantity=20), mock_db, mock_user,
+            expected_version=3)
+
+    assert exc_info.value.status_code == 409
+    mock_db.rollback.assert_called_once()
+
+
 def test_delete_product_success(mock_db):
     product = Product(id=1, name="Test Product", quantity=10)
     mock_db.query().filter_by().first.return_value = product
@@ -160,7 +194,12 @@ def test_delete_product_success(mock_db):
     result = delete_product(1, mock_db)
 
     assert result["detail"] == "Товар успешно удален"
-    mock_db.delete.assert_called_once_with(product)
+    assert product.deleted_at is not None
+    assert product.is_active is False
+    mock_db.delete.assert_not_called()
+    tombstone = mock_db.add.call_args[0][0]
+    assert isinstance(tombstone, ProductTombstone)
+    assert tombstone.product_id == 1
     mock_db.commit.assert_called_once()
 
 
@@ -186,9 +225,26 @@ def test_move_product_success(mock_db, mock_user):
     assert result.warehouse_id == 2
     assert product.warehouse_id == 2
     assert product.updated_by == mock_user.id
+    statements = [str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert any("INSERT INTO warehouse_stock" in sql for sql in statements)
     mock_db.commit.assert_called_once()
 
 
+def test_update_product_quantity_below_home_stock(mock_db, mock_user):
+    product = Product(
+        id=1, name="Test Product", quantity=10, reserved_quantity=0,
+        warehouse_id=1)
+    mock_db.query().filter_by().first.return_value = product
+    mock_db.execute.return_value.rowcount = 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_product(1, ProductUpdate(quantity=2), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 400
+    assert product.quantity == 10
+    mock_db.commit.assert_not_called()
+
+
 def test_move_product_warehouse_not_found(mock_db, mock_user):
     product = Product(id=1, name="Test Product", quantity=10, warehouse_id=1)
     mock_db.query().filter_by().first.side_effect = [product, None]
@@ -200,3 +256,65 @@ def test_move_product_warehouse_not_found(mock_db, mock_user):
 
     assert exc_info.value.status_code == 404
     assert "Целевой склад не найден" in exc_info.value.detail
+
+
+def test_delete_reserved_product(mock_db):
+    product = Product(id=1, name="Test Product", reserved_quantity=2)
+    mock_db.query().filter_by().first.return_value = product
+
+    with pytest.raises(HTTPException) as exc_info:
+        delete_product(1, mock_db)
+
+    assert exc_info.value.status_code == 409
+    assert product.deleted_at is None
+    mock_db.commit.assert_not_called()
+
+
+def test_get_product_changes_merges_in_key_order(mock_db):
+    changed = [
+        Product(id=2, name="P2", change_txid=710),
+        Product(id=1, name="P1", change_txid=730),
+    ]
+    deleted = [ProductTombstone(product_id=5, txid=720)]
+    live_products = mock_db.query().filter_by().filter().filter()
+    live_products.order_by().limit().all.return_value = changed
+    tombstones = mock_db.query().filter().filter()
+    tombstones.order_by().limit().all.return_value = deleted
+
+    result = get_product_changes(mock_db, "700,0", limit=2)
+
+    assert [p.id for p in result["changed"]] == [2]
+    assert [t.product_id for t in result["deleted"]] == [5]
+    assert result["next_since"] == "720,5"
+
+
+def test_get_product_changes_fenced_by_snapshot():
+    db = Session()
+    changed = change_feed.feed_query(
+        db.query(Product), Product.change_txid, Product.id, "700,3")
+
+    sql = str(changed)
+    assert (
+        "products.change_txid < "
+        "txid_snapshot_xmin(txid_current_snapshot())"
+    ) in sql
+    assert sql.endswith("ORDER BY products.change_txid, products.id")
+
+
+def test_get_product_changes_without_new_rows_keeps_watermark(mock_db):
+    mock_db.query().filter().filter().order_by().limit().all.return_value = []
+    live_products = mock_db.query().filter_by().filter().filter()
+    live_products.order_by().limit().all.return_value = []
+
+    result = get_product_changes(mock_db, "700,7")
+
+    assert result["changed"] == []
+    assert result["deleted"] == []
+    assert result["next_since"] == "700,7"
+
+
+def test_get_product_changes_invalid_watermark(mock_db):
+    with pytest.raises(HTTPException) as exc_info:
+        get_product_changes(mock_db, "yesterday")
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+
+from app.models.reservation import Reservation
+from app.models.user import User
+from app.models.warehouse import Product
+from app.schemas.reservations import ReservationCreate
+from app.services import reservation_service
+from app.services.reservation_service import (
+    commit_reservation,
+    create_reservation,
+    expire_reservations,
+    release_reservation,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_user():
+    return User(id=1, username="test_user")
+
+
+def test_available_quantity():
+    product = Product(quantity=10, reserved_quantity=4)
+
+    assert product.available_quantity == 6
+
+
+def test_create_reservation_success(mock_db, mock_user):
+    mock_db.execute.return_value.rowcount = 1
+
+    result = create_reservation(
+        ReservationCreate(product_id=1, quantity=3, ttl_seconds=60),
+        mock_db, mock_user)
+
+    assert isinstance(result, Reservation)
+    assert result.product_id == 1
+    assert result.quantity == 3
+    assert result.created_by == mock_user.id
+    assert result.expires_at > datetime.utcnow() + timedelta(seconds=50)
+    product_update = str(mock_db.execute.call_args_list[0][0][0])
+    assert "reserved_quantity=(products.reserved_quantity +" in (
+        product_update)
+    assert "version=(products.version +" in product_update
+    mock_db.add.assert_called_once_with(result)
+    mock_db.commit.assert_called_once()
+
+
+def test_create_reservation_insufficient_stock(mock_db, mock_user):
+    mock_db.execute.return_value.rowcount = 0
+    mock_db.query().filter_by().first.return_value = (1,)
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_reservation(
+            ReservationCreate(product_id=1, quantity=100), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 409
+    mock_db.add.assert_not_called()
+    mock_db.rollback.assert_called_once()
+
+
+def test_create_reservation_product_not_found(mock_db, mock_user):
+    mock_db.execute.return_value.rowcount = 0
+    mock_db.query().filter_by().first.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_reservation(
+            ReservationCreate(product_id=99, quantity=1), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 404
+
+
+def test_commit_reservation_success(mock_db):
+    mock_db.execute.return_value.first.return_value = MagicMock(
+        product_id=1, quantity=2)
+    mock_db.execute.return_value.rowcount = 1
+    reservation = Reservation(id=1, status="committed")
+    mock_db.query().filter_by().first.return_value = reservation
+
+    result = commit_reservation(1, mock_db)
+
+    assert result is reservation
+    assert mock_db.execute.call_count == 5
+    product_update = str(mock_db.execute.call_args_list[1][0][0])
+    assert "quantity=(products.quantity -" in product_update
+    assert "version=(products.version +" in product_update
+    stock_update = str(mock_db.execute.call_args_list[2][0][0])
+    assert "UPDATE warehouse_stock" in stock_update
+    movement = mock_db.execute.call_args_list[3][0][1][0]
+    assert movement["delta"] == -2
+    assert movement["reason"] == "reservation"
+    mock_db.commit.assert_called_once()
+
+
+def test_commit_reservation_without_home_stock(mock_db):
+    mock_db.execute.return_value.first.return_value = MagicMock(
+        product_id=1, quantity=2)
+    mock_db.execute.return_value.rowcount = 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        commit_reservation(1, mock_db)
+
+    assert exc_info.value.status_code == 409
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.assert_not_called()
+
+
+def test_release_reservation_keeps_quantity(mock_db):
+    mock_db.execute.return_value.first.return_value = MagicMock(
+        product_id=1, quantity=2)
+    mock_db.query().filter_by().first.return_value = Reservation(
+        id=1, status="released")
+
+    release_reservation(1, mock_db)
+
+    product_update = str(mock_db.execute.call_args_list[1][0][0])
+    assert "reserved_quantity=(products.reserved_quantity -" in product_update
+    assert " quantity=" not in product_update
+
+
+def test_commit_expired_reservation(mock_db):
+    mock_db.execute.return_value.first.return_value = None
+    mock_db.query().filter_by().first.return_value = Reservation(
+        id=1, status="active")
+
+    with pytest.raises(HTTPException) as exc_info:
+        commit_reservation(1, mock_db)
+
+    assert exc_info.value.status_code == 409
+    assert "истек" in exc_info.value.detail
+    mock_db.commit.assert_not_called()
+
+
+def test_release_finished_reservation(mock_db):
+    mock_db.execute.return_value.first.return_value = None
+    mock_db.query().filter_by().first.return_value = Reservation(
+        id=1, status="expired")
+
+    with pytest.raises(HTTPException) as exc_info:
+        release_reservation(1, mock_db)
+
+    assert exc_info.value.status_code == 409
+    assert "expired" in exc_info.value.detail
+
+
+def test_expire_reservations_in_batches(mock_db, monkeypatch):
+    monkeypatch.setattr(reservation_service, "RESERVATION_SWEEP_BATCH", 2)
+    mock_db.execute.return_value.one.side_effect = [
+        (2, [1, 2]), (2, [3]), (1, [])]
+
+    assert expire_reservations(mock_db) == 5
+    assert mock_db.commit.call_count == 3
+    assert mock_db.execute.call_count == 5
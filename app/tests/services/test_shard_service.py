@@ -0,0 +1,85 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.utils import QueryParams
+from app.services import shard_service
+from app.services.filter_service import MAX_LIMIT, merge_sorted
+
+
+def row(id, quantity):
+    return SimpleNamespace(id=id, quantity=quantity)
+
+
+def test_merge_sorted_desc_with_nulls_first():
+    sorting = [{"field": "quantity", "order": "DESC"}, {"field": "id"}]
+    first = [row(1, None), row(2, 9), row(3, 1)]
+    second = [row(4, 10), row(5, 9)]
+
+    merged = merge_sorted([first, second], sorting, offset=1, limit=3)
+
+    assert [item.id for item in merged] == [4, 2, 5]
+
+
+def test_get_products_merges_shards(monkeypatch):
+    requested = []
+
+    def fan_out(fn):
+        fn(None)
+        return [("default", [row(1, 5), row(3, 1)]), ("north", [row(2, 4)])]
+
+    monkeypatch.setattr(
+        shard_service.database.shard_router, "fan_out", fan_out)
+    monkeypatch.setattr(
+        shard_service.product_service, "get_products",
+        lambda db, params, collation: requested.append(
+            (params.parse_range(), collation)))
+    params = QueryParams(
+        sort=json.dumps([{"field": "quantity", "order": "DESC"}]),
+        range=json.dumps({"offset": 1, "limit": 2}),
+    )
+
+    products = shard_service.get_products(params)
+
+    assert [(p.id, p.shard) for p in products] == [
+        (2, "north"), (3, "default")]
+    assert requested == [({"offset": 0, "limit": 3}, "C")]
+
+
+def test_get_products_rejects_pages_beyond_shard_limit(monkeypatch):
+    fan_out = []
+    monkeypatch.setattr(
+        shard_service.database.shard_router, "fan_out", fan_out.append)
+    params = QueryParams(
+        range=json.dumps({"offset": MAX_LIMIT, "limit": 10}))
+
+    with pytest.raises(HTTPException) as error:
+        shard_service.get_products(params)
+
+    assert error.value.status_code == 400
+    assert fan_out == []
+
+
+def test_get_products_reads_last_page_within_shard_limit(monkeypatch):
+    requested = []
+
+    def fan_out(fn):
+        fn(None)
+        return [("default", [row(i, 1) for i in range(MAX_LIMIT)])]
+
+    monkeypatch.setattr(
+        shard_service.database.shard_router, "fan_out", fan_out)
+    monkeypatch.setattr(
+        shard_service.product_service, "get_products",
+        lambda db, params, collation: requested.append(
+            (params.parse_range(), collation)))
+    params = QueryParams(
+        range=json.dumps({"offset": MAX_LIMIT - 10, "limit": 10}))
+
+    products = shard_service.get_products(params)
+
+    assert [p.id for p in products] == list(
+        range(MAX_LIMIT - 10, MAX_LIMIT))
+    assert requested == [({"offset": 0, "limit": MAX_LIMIT}, "C")]
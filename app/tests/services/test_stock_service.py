@@ -0,0 +1,140 @@
+from unittest.mock import MagicMock
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.models.stock import TransferOrder
+from app.models.user import User
+from app.schemas.stock import TransferCreate
+from app.services.stock_service import (
+    adjust_home_stock,
+    create_transfer,
+    move_home_stock,
+    take_stock,
+)
+
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_user():
+    return User(id=1, username="test_user")
+
+
+def make_transfer(*lines):
+    return TransferCreate(
+        source_warehouse_id=1,
+        destination_warehouse_id=2,
+        lines=[
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, quantity in lines
+        ],
+    )
+
+
+def test_take_stock_single_statement(mock_db):
+    mock_db.execute.return_value.rowcount = 2
+
+    assert take_stock(mock_db, 1, {11: 4, 10: 3}) is True
+    mock_db.execute.assert_called_once()
+    statement = mock_db.execute.call_args[0][0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "warehouse_stock.quantity >= requested.quantity" in sql
+    assert (
+        "ORDER BY warehouse_stock.product_id, "
+        "warehouse_stock.warehouse_id FOR UPDATE"
+    ) in sql
+
+
+def test_take_stock_insufficient(mock_db):
+    mock_db.execute.return_value.rowcount = 1
+
+    assert take_stock(mock_db, 1, {10: 3, 11: 4}) is False
+
+
+def test_move_home_stock(mock_db):
+    move_home_stock(mock_db, [1, 2], 3)
+
+    insert_statement, delete_statement = [
+        str(call[0][0]) for call in mock_db.execute.call_args_list]
+    assert "INSERT INTO warehouse_stock" in insert_statement
+    assert "ON CONFLICT" in insert_statement
+    assert "DELETE FROM warehouse_stock" in delete_statement
+
+
+def test_adjust_home_stock_shortage(mock_db):
+    mock_db.execute.return_value.rowcount = 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        adjust_home_stock(mock_db, 1, 1, -5)
+
+    assert exc_info.value.status_code == 400
+    mock_db.rollback.assert_called_once()
+
+
+def test_create_transfer_success(mock_db, mock_user):
+    mock_db.query().filter().count.return_value = 2
+    mock_db.execute.return_value.rowcount = 2
+
+    result = create_transfer(
+        make_transfer((10, 3), (11, 1), (10, 2)), mock_db, mock_user)
+
+    assert isinstance(result, TransferOrder)
+    assert result.source_warehouse_id == 1
+    assert result.destination_warehouse_id == 2
+    assert result.created_by == mock_user.id
+    lines = mock_db.execute.call_args_list[-1][0][1]
+    assert sorted(
+        (line["product_id"], line["quantity"]) for line in lines
+    ) == [(10, 5), (11, 1)]
+    mock_db.commit.assert_called_once()
+
+
+def test_create_transfer_same_warehouse(mock_db, mock_user):
+    transfer = make_transfer((10, 1))
+    transfer.destination_warehouse_id = 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_transfer(transfer, mock_db, mock_user)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_create_transfer_warehouse_not_found(mock_db, mock_user):
+    mock_db.query().filter().count.return_value = 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_transfer(make_transfer((10, 1)), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 404
+    assert "Склад не найден" in exc_info.value.detail
+
+
+def test_create_transfer_archived_product(mock_db, mock_user):
+    mock_db.query().filter().count.side_effect = [2, 1]
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_transfer(
+            make_transfer((10, 3), (11, 1)), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 404
+    assert "Товар не найден" in exc_info.value.detail
+    mock_db.execute.assert_not_called()
+
+
+def test_create_transfer_insufficient_stock(mock_db, mock_user):
+    mock_db.query().filter().count.return_value = 2
+    mock_db.execute.return_value.rowcount = 1
+    mock_db.execute.return_value.all.return_value = [(10, 5), (11, 0)]
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_transfer(
+            make_transfer((10, 3), (11, 1)), mock_db, mock_user)
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail.endswith(": 11")
+    mock_db.rollback.assert_called_once()
+    mock_db.commit.assert_not_called()
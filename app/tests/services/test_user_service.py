@@ -106,7 +106,7 @@ def test_authenticate_user_not_found(mock_db):
 
 
 @pytest.mark.asyncio
-@patch("app.services.user_service.jwt.decode")
+@patch("jose.jwt.decode")
 async def test_get_current_user_success(mock_jwt_decode, mock_db, test_user):
     mock_jwt_decode.return_value = {"sub": "testuser"}
     mock_db.query().filter().first.return_value = test_user
@@ -117,7 +117,7 @@ async def test_get_current_user_success(mock_jwt_decode, mock_db, test_user):
 
 
 @pytest.mark.asyncio
-@patch("app.services.user_service.jwt.decode", side_effect=JWTError)
+@patch("jose.jwt.decode", side_effect=JWTError)
 async def test_get_current_user_invalid_token(mock_jwt_decode, mock_db):
     with pytest.raises(HTTPException) as exc_info:
         await get_current_user("invalid_token", mock_db)
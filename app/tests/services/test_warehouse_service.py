@@ -3,13 +3,17 @@ import pytest
 from fastapi import HTTPException
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.models.warehouse import Warehouse
-from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate
+from app.schemas.warehouse import (
+    WarehouseCreate, WarehouseResponse, WarehouseUpdate
+)
 from app.services.warehouse_service import (
     create_warehouse,
     delete_warehouse,
     get_warehouse,
+    get_warehouse_response,
     get_warehouses,
     update_warehouse,
 )
@@ -96,6 +100,18 @@ def test_get_warehouse_found(mock_db):
     mock_db.query().filter_by().first.assert_called_once()
 
 
+def test_get_warehouse_response_is_detached_schema(mock_db):
+    warehouse = Warehouse(
+        id=1, name="WH1", address="Addr1", is_active=True, version=2)
+    mock_db.query().filter_by().first.return_value = warehouse
+
+    result = get_warehouse_response(1, mock_db)
+
+    assert isinstance(result, WarehouseResponse)
+    assert result.name == "WH1"
+    assert result.version == 2
+
+
 def test_get_warehouse_not_found(mock_db):
     mock_db.query().filter_by().first.return_value = None
 
@@ -128,9 +144,35 @@ def test_update_warehouse_not_found(mock_db):
     assert "Склад не найден" in exc_info.value.detail
 
 
+def test_update_warehouse_version_mismatch(mock_db):
+    warehouse = Warehouse(id=1, name="WH1", address="Addr1", version=5)
+    mock_db.query().filter_by().first.return_value = warehouse
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_warehouse(
+            1, WarehouseUpdate(name="New Name"), mock_db,
+            expected_version=4)
+
+    assert exc_info.value.status_code == 409
+    assert warehouse.name == "WH1"
+
+
+def test_update_warehouse_concurrent_write(mock_db):
+    warehouse = Warehouse(id=1, name="WH1", address="Addr1", version=5)
+    mock_db.query().filter_by().first.return_value = warehouse
+    mock_db.commit.side_effect = StaleDataError()
+
+    with pytest.raises(HTTPException) as exc_info:
+        update_warehouse(1, WarehouseUpdate(name="New Name"), mock_db)
+
+    assert exc_info.value.status_code == 409
+    mock_db.rollback.assert_called_once()
+
+
 def test_delete_warehouse_success(mock_db):
     warehouse = Warehouse(id=1, name="WH1", address="Addr1")
     mock_db.query().filter_by().first.return_value = warehouse
+    mock_db.query().filter().first.return_value = None
 
     result = delete_warehouse(1, mock_db)
 
@@ -139,6 +181,17 @@ def test_delete_warehouse_success(mock_db):
     mock_db.commit.assert_called_once()
 
 
+def test_delete_warehouse_with_stock(mock_db):
+    mock_db.query().filter_by().first.return_value = Warehouse(id=1)
+    mock_db.query().filter().first.return_value = (10,)
+
+    with pytest.raises(HTTPException) as exc_info:
+        delete_warehouse(1, mock_db)
+
+    assert exc_info.value.status_code == 409
+    mock_db.delete.assert_not_called()
+
+
 def test_delete_warehouse_not_found(mock_db):
     mock_db.query().filter_by().first.return_value = None
 
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.user import User
+from app.models.warehouse import Category, Product, Warehouse
+from app.routers.health import get_readiness
+from app.services import warmup_service
+
+
+@pytest.fixture
+def state(monkeypatch):
+    state = warmup_service.WarmupState()
+    monkeypatch.setattr(warmup_service, "state", state)
+    return state
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, Category.__table__, Warehouse.__table__,
+        Product.__table__,
+    ])
+    return sessionmaker(bind=engine)
+
+
+def test_warm_up_primes_statement_cache(state, session_factory):
+    engine = session_factory.kw["bind"]
+
+    warmup_service.warm_up([session_factory])
+
+    assert state.ready
+    assert set(state.steps) == {
+        "mappers", "auth", "pool:0", "statements:0"}
+    assert len(engine._compiled_cache) >= len(warmup_service.WARMUP_READS)
+
+
+def test_readiness_flips_after_warm_up(state, session_factory):
+    assert get_readiness().status_code == 503
+
+    warmup_service.warm_up([session_factory])
+
+    assert get_readiness().status_code == 200
+
+
+def test_run_warm_up_retries_until_database_is_available(
+    state, session_factory, monkeypatch,
+):
+    monkeypatch.setattr(warmup_service, "WARMUP_RETRY_SECONDS", 0)
+    factories = MagicMock(side_effect=[
+        OperationalError("SELECT 1", {}, Exception("нет соединения")),
+        [session_factory],
+    ])
+
+    warmup_service.run_warm_up(factories)
+
+    assert state.ready
+    assert state.attempts == 2
+    assert state.error is None
+
+
+def test_run_warm_up_reports_unexpected_errors(
+    state, session_factory, monkeypatch, caplog,
+):
+    stopped = MagicMock()
+    stopped.is_set.side_effect = [False, True]
+    monkeypatch.setattr(warmup_service, "_stopped", stopped)
+    monkeypatch.setattr(
+        warmup_service, "prime_auth",
+        MagicMock(side_effect=ImportError("jose")))
+
+    warmup_service.run_warm_up(lambda: [session_factory])
+
+    assert not state.ready
+    assert state.error == "ImportError: jose"
+    assert "Ошибка прогрева" in caplog.text
+    assert get_readiness().status_code == 503
+    stopped.wait.assert_called_once_with(warmup_service.WARMUP_RETRY_SECONDS)
+
+
+def test_open_pool_stays_within_pool_size(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'warmup.db'}", pool_size=1, max_overflow=5)
+    connects = []
+    event.listen(engine, "connect", lambda *args: connects.append(1))
+
+    warmup_service.open_pool(sessionmaker(bind=engine), 3)
+
+    assert len(connects) == 1
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+
+from app import worker
+from app.data.shards import Shard, ShardRouter
+from app.worker import Worker
+
+
+def make_shard(name):
+    return Shard(name, None, MagicMock(return_value=MagicMock()))
+
+
+def test_run_once_claims_jobs_from_every_shard(monkeypatch):
+    default, north = make_shard("default"), make_shard("north")
+    monkeypatch.setattr(
+        worker.database, "shard_router", ShardRouter(default, [north]))
+    job = MagicMock()
+    north_db = north.session_factory.return_value
+    claimed = {default.session_factory.return_value: None, north_db: job}
+    claim = MagicMock(side_effect=lambda db: claimed[db])
+    monkeypatch.setattr(worker.job_service, "claim_next_job", claim)
+    run_job = MagicMock()
+    monkeypatch.setattr(worker.job_service, "run_job", run_job)
+
+    assert Worker().run_once() is True
+    run_job.assert_called_once_with(north_db, job)
+
+    claimed[north_db] = None
+    assert Worker().run_once() is False
+
+
+def test_periodic_tasks_run_on_every_shard(monkeypatch):
+    default, north = make_shard("default"), make_shard("north")
+    monkeypatch.setattr(
+        worker.database, "shard_router", ShardRouter(default, [north]))
+    expire = MagicMock(side_effect=[RuntimeError("default down"), 0])
+    monkeypatch.setattr(
+        worker.reservation_service, "expire_reservations", expire)
+    ensure = MagicMock()
+    monkeypatch.setattr(
+        worker.movement_service, "ensure_partitions", ensure)
+
+    Worker().run_periodic()
+
+    assert expire.call_count == 2
+    assert ensure.call_count == 2
+    north.session_factory.return_value.close.assert_called()
@@ -0,0 +1,122 @@
+"""Воркер фоновых задач.
+
+Кроме задач из очереди, воркер периодически снимает истекшие резервы товаров
+и создает секции журнала движения остатков на следующие месяцы. Очереди,
+резервы и журналы есть в БД каждого шарда, поэтому воркер обходит все шарды.
+
+Запуск (несколько экземпляров можно запускать параллельно):
+    python -m app.worker
+"""
+import logging
+import os
+import signal
+import time
+
+from app.data import database
+from app.services import (
+    job_service, movement_service, reservation_service
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+RESERVATION_SWEEP_INTERVAL = float(
+    os.getenv("RESERVATION_SWEEP_INTERVAL", "30"))
+PARTITION_MAINTENANCE_INTERVAL = float(
+    os.getenv("PARTITION_MAINTENANCE_INTERVAL", "3600"))
+
+
+class Worker:
+    """Цикл выборки задач из очереди `jobs`"""
+
+    def __init__(
+        self, poll_interval: float = JOB_POLL_INTERVAL,
+        sweep_interval: float = RESERVATION_SWEEP_INTERVAL,
+    ):
+        self.poll_interval = poll_interval
+        self.periodic_tasks = [
+            (sweep_interval, self.sweep_reservations),
+            (PARTITION_MAINTENANCE_INTERVAL, self.maintain_partitions),
+        ]
+        self.last_runs = {}
+        self.next_shard = 0
+        self.running = True
+
+    def stop(self, *args):
+        logger.info("Воркер завершает работу после текущей задачи")
+        self.running = False
+
+    def shards(self):
+        return list(database.shard_router.shards.values())
+
+    def run_once(self) -> bool:
+        """Выполняет одну задачу; False — очереди всех шардов пусты.
+
+        Обход начинается со шарда после того, где задача нашлась в прошлый
+        раз, чтобы очередь одного шарда не задерживала остальные.
+        """
+        shards = self.shards()
+        for offset in range(len(shards)):
+            index = (self.next_shard + offset) % len(shards)
+            if self.run_shard_job(shards[index]):
+                self.next_shard = (index + 1) % len(shards)
+                return True
+        return False
+
+    def run_shard_job(self, shard) -> bool:
+        db = shard.session_factory()
+        try:
+            job = job_service.claim_next_job(db)
+            if job is None:
+                return False
+            logger.info(
+                "Задача %s (%s) шарда %s взята в работу",
+                job.id, job.kind, shard.name)
+            job_service.run_job(db, job)
+            return True
+        finally:
+            db.close()
+
+    def run_periodic(self):
+        """Запускает периодические задачи, у которых подошел срок"""
+        now = time.monotonic()
+        for interval, task in self.periodic_tasks:
+            last_run = self.last_runs.get(task.__name__)
+            if last_run is not None and now - last_run < interval:
+                continue
+            self.last_runs[task.__name__] = now
+            for shard in self.shards():
+                db = shard.session_factory()
+                try:
+                    task(db)
+                except Exception:
+                    logger.exception(
+                        "Ошибка задачи %s на шарде %s",
+                        task.__name__, shard.name)
+                finally:
+                    db.close()
+
+    def sweep_reservations(self, db):
+        expired = reservation_service.expire_reservations(db)
+        if expired:
+            logger.info("Снято истекших резервов: %s", expired)
+
+    def maintain_partitions(self, db):
+        movement_service.ensure_partitions(db)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        while self.running:
+            try:
+                self.run_periodic()
+                if self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Ошибка воркера")
+            time.sleep(self.poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Worker().run()
@@ -0,0 +1,48 @@
+"""Сравнение двух отчетов `benchmarks.run`.
+
+Пример:
+    python -m benchmarks.compare results/v0.1.json results/v0.2.json
+"""
+import argparse
+import json
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(old: float, new: float) -> str:
+    if not old:
+        return "—"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(baseline: dict, candidate: dict):
+    print(
+        f"{baseline.get('label') or baseline['git_revision']} → "
+        f"{candidate.get('label') or candidate['git_revision']}"
+    )
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        cells = [
+            f"{metric} {old[metric]} → {new[metric]} "
+            f"({change(old[metric], new[metric])})"
+            for metric in METRICS
+        ]
+        print(f"{name:<20} " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    compare(baseline, candidate)
+
+
+if __name__ == "__main__":
+    main()
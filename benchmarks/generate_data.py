@@ -0,0 +1,266 @@
+"""Генератор данных для нагрузочного тестирования.
+
+Строки генерируются потоково и загружаются в PostgreSQL через
+`COPY ... FROM STDIN` порциями по `--chunk-size` строк. Остатки по складам,
+журнал движений и суточные итоги строятся из загруженных товаров, как при
+создании товара через API.
+
+Пример:
+    python -m benchmarks.generate_data --products 1000000
+"""
+import argparse
+import os
+import random
+import runpy
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.data.bulk import copy_rows
+from app.data.database import SessionLocal, engine
+from app.models.user import User
+from app.models.warehouse import Category, Product, Warehouse
+from app.services.movement_service import PARTITION_SQL, month_start
+
+SEED_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "seed.db.py"
+)
+BENCH_USERNAME = "bench.user"
+BENCH_PASSWORD = "bench-password"
+ATTRIBUTE_NAMES = ["Цвет", "Размер", "Материал", "Мощность", "Вес"]
+ATTRIBUTE_VALUES = ["Черный", "Белый", "XL", "Кожа", "1500 Вт", "2 кг"]
+
+USER_COLUMNS = ("id", "username", "email", "hashed_password")
+WAREHOUSE_COLUMNS = ("id", "name", "address", "is_active")
+CATEGORY_COLUMNS = ("id", "name", "is_active")
+PRODUCT_COLUMNS = (
+    "id", "name", "category_id", "warehouse_id", "quantity", "is_active",
+    "created_by", "updated_by", "created_at", "updated_at",
+)
+ATTRIBUTE_COLUMNS = ("name", "value", "product_id")
+HISTORY_MONTHS = 13
+
+STOCK_SQL = """
+INSERT INTO warehouse_stock (product_id, warehouse_id, quantity)
+SELECT id, warehouse_id, quantity FROM products WHERE id >= %(first_id)s
+"""
+MOVEMENTS_SQL = """
+INSERT INTO stock_movements
+    (product_id, warehouse_id, delta, reason, created_by, created_at)
+SELECT id, warehouse_id, quantity, 'create', created_by, created_at
+FROM products WHERE id >= %(first_id)s AND quantity <> 0
+"""
+DAILY_SQL = """
+INSERT INTO stock_daily (product_id, day, net_change, movements)
+SELECT product_id, CAST(created_at AS date), sum(delta), count(*)
+FROM stock_movements WHERE product_id >= %(first_id)s
+GROUP BY product_id, CAST(created_at AS date)
+"""
+
+
+def zipf_weights(count: int, exponent: float = 1.1):
+    """Накопленные веса с «длинным хвостом»: несколько крупных складов и
+    категорий получают большую часть товаров"""
+    return list(accumulate(
+        1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def next_id(db: Session, model) -> int:
+    return (db.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def copy_table(connection, table, columns, rows, chunk_size):
+    """COPY с фиксацией транзакции после каждой порции"""
+    def on_chunk(total):
+        connection.commit()
+        print(f"… {table}: {total}")
+
+    cursor = connection.cursor()
+    try:
+        return copy_rows(cursor, table, columns, rows, chunk_size, on_chunk)
+    finally:
+        cursor.close()
+
+
+def reset_sequence(cursor, table: str):
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+    )
+
+
+def load_stock(connection, first_product_id: int):
+    """Остаток каждого товара на его складе, движение `create` на дату
+    создания товара и суточные итоги — согласованно с `quantity`"""
+    today = datetime.utcnow().date()
+    cursor = connection.cursor()
+    try:
+        for offset in range(-HISTORY_MONTHS, 1):
+            start = month_start(today, offset)
+            cursor.execute(PARTITION_SQL.format(
+                name=f"stock_movements_y{start.year}m{start.month:02d}",
+                start=start.isoformat(),
+                end=month_start(start, 1).isoformat(),
+            ))
+        for table, sql in (
+            ("warehouse_stock", STOCK_SQL),
+            ("stock_movements", MOVEMENTS_SQL),
+            ("stock_daily", DAILY_SQL),
+        ):
+            cursor.execute(sql, {"first_id": first_product_id})
+            connection.commit()
+            print(f"… {table}: {cursor.rowcount}")
+    finally:
+        cursor.close()
+
+
+def user_rows(first_id: int, count: int, hashed_password: str):
+    """Пользователи нагрузочного теста с одним заранее вычисленным хешем"""
+    yield first_id, BENCH_USERNAME, "bench.user@example.com", hashed_password
+    for number in range(1, count):
+        yield (
+            first_id + number, f"{BENCH_USERNAME}.{number}",
+            f"bench.user.{number}@example.com", hashed_password,
+        )
+
+
+def warehouse_rows(first_id: int, count: int):
+    for number in range(count):
+        yield (
+            first_id + number, f"Склад bench-{first_id + number}",
+            f"Город {number % 40}, ул. Складская, {number}",
+            number % 10 != 0,
+        )
+
+
+def category_rows(first_id: int, count: int):
+    for number in range(count):
+        yield first_id + number, f"Категория bench-{first_id + number}", True
+
+
+def product_rows(
+    first_id, count, warehouse_ids, category_ids, user_ids, rng
+):
+    """Товары с перекосом: крупные склады и категории, редкие нули
+    остатков и «тяжелый хвост» количества"""
+    warehouse_weights = zipf_weights(len(warehouse_ids))
+    category_weights = zipf_weights(len(category_ids))
+    now = datetime.utcnow()
+    for product_id in range(first_id, first_id + count):
+        created_at = now - timedelta(minutes=rng.randint(0, 525600))
+        user_id = rng.choice(user_ids)
+        yield (
+            product_id,
+            f"Товар bench-{product_id}",
+            rng.choices(category_ids, cum_weights=category_weights)[0],
+            rng.choices(warehouse_ids, cum_weights=warehouse_weights)[0],
+            0 if rng.random() < 0.05 else int(rng.paretovariate(1.5) * 10),
+            rng.random() > 0.1,
+            user_id,
+            user_id,
+            created_at,
+            created_at + timedelta(minutes=rng.randint(0, 43200)),
+        )
+
+
+def attribute_rows(first_product_id, count, mean_per_product, rng):
+    """От 0 до `2 * mean_per_product` характеристик на товар"""
+    for product_id in range(first_product_id, first_product_id + count):
+        for number in range(rng.randint(0, 2 * mean_per_product)):
+            yield (
+                f"{rng.choice(ATTRIBUTE_NAMES)} {product_id}-{number}",
+                rng.choice(ATTRIBUTE_VALUES),
+                product_id,
+            )
+
+
+def generate(
+    db: Session, products: int, warehouses: int, categories: int,
+    users: int, attributes_per_product: int, chunk_size: int, seed: int,
+):
+    seed_script = runpy.run_path(SEED_SCRIPT)
+    seed_script["seed_database"](db)
+
+    if db.query(User).filter_by(username=BENCH_USERNAME).first():
+        raise SystemExit(
+            "Данные нагрузочного теста уже созданы: пересоздайте базу")
+    hashed_password = seed_script["hash_password"](BENCH_PASSWORD)
+
+    first_user_id = next_id(db, User)
+    first_warehouse_id = next_id(db, Warehouse)
+    first_category_id = next_id(db, Category)
+    first_product_id = next_id(db, Product)
+    db.commit()
+
+    connection = engine.raw_connection()
+    try:
+        copy_table(
+            connection, "users", USER_COLUMNS,
+            user_rows(first_user_id, users, hashed_password), chunk_size)
+        copy_table(
+            connection, "warehouses", WAREHOUSE_COLUMNS,
+            warehouse_rows(first_warehouse_id, warehouses), chunk_size)
+        copy_table(
+            connection, "categories", CATEGORY_COLUMNS,
+            category_rows(first_category_id, categories), chunk_size)
+        copy_table(
+            connection, "products", PRODUCT_COLUMNS,
+            product_rows(
+                first_product_id, products,
+                list(range(
+                    first_warehouse_id, first_warehouse_id + warehouses)),
+                list(range(
+                    first_category_id, first_category_id + categories)),
+                list(range(first_user_id, first_user_id + users)),
+                random.Random(seed),
+            ),
+            chunk_size,
+        )
+        copy_table(
+            connection, "attributes", ATTRIBUTE_COLUMNS,
+            attribute_rows(
+                first_product_id, products, attributes_per_product,
+                random.Random(seed + 1),
+            ),
+            chunk_size,
+        )
+        load_stock(connection, first_product_id)
+
+        cursor = connection.cursor()
+        for table in ("users", "warehouses", "categories", "products"):
+            reset_sequence(cursor, table)
+        cursor.execute("ANALYZE")
+        cursor.close()
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--warehouses", type=int, default=50)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--attributes-per-product", type=int, default=2,
+        help="Среднее число характеристик на товар")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        generate(
+            db, args.products, args.warehouses, args.categories, args.users,
+            args.attributes_per_product, args.chunk_size, args.seed,
+        )
+        print("✅ Данные для нагрузочного тестирования созданы")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
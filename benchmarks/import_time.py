@@ -0,0 +1,152 @@
+"""Отчет о времени импорта приложения (`python -X importtime`).
+
+Импорт `app.main` повторяется в отдельных процессах; в отчет попадают
+медиана времени загрузки, самые медленные модули и модули, которые должны
+загружаться лениво. С `--budget-ms` или при загрузке отложенных модулей
+завершается с кодом 1 — для проверки в CI.
+
+Пример:
+    python -m benchmarks.import_time --label v0.2 --budget-ms 2000 \\
+        --output boot-v0.2.json --baseline boot-v0.1.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.run import git_revision
+
+BOOT_MODULE = "app.main"
+DEFERRED_MODULES = ("jose", "passlib", "psycopg2", "openpyxl", "redis")
+
+BOOT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "boot_ms": round(elapsed * 1000, 2),
+    "deferred": sorted(
+        name for name in {deferred!r} if name in sys.modules),
+}}))
+"""
+
+
+def parse_importtime(output: str) -> Dict[str, Dict]:
+    """Строки `import time: self | cumulative | module` в словарь
+    модуль → время в миллисекундах"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        cells = line[len("import time:"):].split("|")
+        if len(cells) != 3 or not cells[0].strip().isdigit():
+            continue
+        name = cells[2].strip()
+        modules[name] = {
+            "self_ms": round(int(cells[0]) / 1000, 2),
+            "cumulative_ms": round(int(cells[1]) / 1000, 2),
+        }
+    return modules
+
+
+def measure(module: str = BOOT_MODULE,
+            deferred=DEFERRED_MODULES) -> Dict:
+    """Один холодный импорт в отдельном процессе"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         BOOT_SCRIPT.format(module=module, deferred=tuple(deferred))],
+        capture_output=True, text=True, check=True,
+    )
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    run["modules"] = parse_importtime(result.stderr)
+    return run
+
+
+def packages(modules: Dict[str, Dict]) -> Dict[str, float]:
+    """Время импорта по пакетам верхнего уровня (собственное время
+    всех их модулей)"""
+    totals: Dict[str, float] = {}
+    for name, timing in modules.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + timing["self_ms"]
+    return {
+        name: round(total, 2)
+        for name, total in sorted(
+            totals.items(), key=lambda item: -item[1])
+    }
+
+
+def build_report(runs: List[Dict], top: int, label: str = "") -> Dict:
+    median_run = sorted(runs, key=lambda run: run["boot_ms"])[
+        len(runs) // 2]
+    slowest = sorted(
+        median_run["modules"].items(),
+        key=lambda item: -item[1]["cumulative_ms"],
+    )[:top]
+    return {
+        "label": label,
+        "git_revision": git_revision(),
+        "started_at": datetime.utcnow().isoformat(),
+        "module": BOOT_MODULE,
+        "repeat": len(runs),
+        "boot_ms": statistics.median(run["boot_ms"] for run in runs),
+        "deferred_loaded": median_run["deferred"],
+        "packages": dict(list(packages(median_run["modules"]).items())[:top]),
+        "slowest_modules": {
+            name: timing["cumulative_ms"] for name, timing in slowest},
+    }
+
+
+def print_report(report: Dict, baseline: Dict = None):
+    line = f"Загрузка {report['module']}: {report['boot_ms']} мс"
+    if baseline:
+        old = baseline["boot_ms"]
+        line += (
+            f" (было {old} мс, {(report['boot_ms'] - old) / old * 100:+.1f}%"
+            f", {baseline.get('label') or baseline['git_revision']})"
+        )
+    print(line)
+    for name, elapsed in report["packages"].items():
+        print(f"  {name:<40} {elapsed:>10} мс")
+    if report["deferred_loaded"]:
+        print(
+            "Загружены при старте, хотя должны загружаться лениво: "
+            + ", ".join(report["deferred_loaded"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--label", default="")
+    parser.add_argument(
+        "--budget-ms", type=float,
+        help="Допустимое время загрузки; больше — код возврата 1")
+    parser.add_argument("--baseline", help="Отчет прошлого релиза")
+    parser.add_argument("--output", help="Файл JSON с результатами")
+    args = parser.parse_args()
+
+    report = build_report(
+        [measure() for _ in range(args.repeat)], args.top, args.label)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    over_budget = args.budget_ms is not None and (
+        report["boot_ms"] > args.budget_ms)
+    if over_budget:
+        print(f"Превышен бюджет загрузки {args.budget_ms} мс")
+    if over_budget or report["deferred_loaded"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
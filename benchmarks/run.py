@@ -0,0 +1,169 @@
+"""Нагрузочный прогон сценариев против запущенного API.
+
+API запускается с `RATE_LIMIT_MODE=off` и `QUERY_COST_MODE=off`: иначе
+`login_storm` упирается в `@rate_limit` на `/token`, а `deep_pagination`
+и `list_with_filters` на миллионе товаров отклоняются бюджетом стоимости
+запроса с 400, и замеряются ограничители, а не запросы. Ответы 429
+(`throttled`) и остальные 4xx (`client_errors`) считаются отдельно от
+успешных и от ошибок сервера, и о них выводится предупреждение.
+
+Пример:
+    python -m benchmarks.run --base-url http://localhost:8000 \\
+        --duration 30 --concurrency 32 --label v0.2 --tag cache=off \\
+        --output results/v0.2.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS, prepare_context
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(
+        len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(
+    latencies: List[float], errors: int, elapsed: float, throttled: int = 0,
+    client_errors: int = 0,
+) -> Dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throttled": throttled,
+        "client_errors": client_errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0,
+    }
+
+
+async def run_scenario(
+    client, ctx, scenario, duration: float, concurrency: int, seed: int
+) -> Dict:
+    latencies: List[float] = []
+    errors = throttled = client_errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors, throttled, client_errors
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status_code = (await scenario(client, ctx, rng)).status_code
+            except httpx.HTTPError:
+                status_code = None
+            if status_code == 429:
+                throttled += 1
+            elif status_code is not None and 400 <= status_code < 500:
+                client_errors += 1
+            elif status_code is None or status_code >= 500:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(
+        latencies, errors, time.perf_counter() - start, throttled,
+        client_errors)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        ctx = await prepare_context(client)
+        results = {}
+        for name in args.scenario:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                await run_scenario(
+                    client, ctx, scenario, args.warmup, args.concurrency,
+                    args.seed)
+            results[name] = await run_scenario(
+                client, ctx, scenario, args.duration, args.concurrency,
+                args.seed)
+            print_row(name, results[name])
+    return {
+        "label": args.label,
+        "tags": dict(tag.split("=", 1) for tag in args.tag),
+        "git_revision": git_revision(),
+        "started_at": datetime.utcnow().isoformat(),
+        "base_url": args.base_url,
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+
+
+def print_row(name: str, result: Dict):
+    print(
+        f"{name:<20} {result['throughput_rps']:>10} rps  "
+        f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+        f"p99 {result['p99_ms']:>8} ms  ошибок {result['errors']}"
+    )
+    if result.get("throttled"):
+        print(
+            f"  {result['throttled']} ответов 429: запустите API "
+            f"с RATE_LIMIT_MODE=off, иначе замеряется ограничитель частоты")
+    if result.get("client_errors"):
+        print(
+            f"  {result['client_errors']} ответов 4xx: запустите API "
+            f"с QUERY_COST_MODE=off, иначе дорогие запросы отклоняются с 400")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS),
+        help="Сценарий (можно несколько раз); по умолчанию — все")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="")
+    parser.add_argument(
+        "--tag", action="append", default=[],
+        help="Метка прогона key=value, например mode=async или cache=on")
+    parser.add_argument("--output", help="Файл JSON с результатами")
+    args = parser.parse_args()
+    args.scenario = args.scenario or list(SCENARIOS)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Сценарии нагрузки: каждый выполняет один HTTP-запрос к API"""
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.generate_data import BENCH_PASSWORD, BENCH_USERNAME
+
+
+@dataclass
+class BenchContext:
+    """Общие данные сценариев: токен и диапазоны идентификаторов"""
+
+    token: str
+    max_product_id: int
+    warehouse_ids: List[int]
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def random_product_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.max_product_id)
+
+
+Scenario = Callable[
+    [httpx.AsyncClient, BenchContext, random.Random],
+    Awaitable[httpx.Response],
+]
+
+
+async def list_with_filters(client, ctx, rng):
+    params = {
+        "filter": json.dumps({
+            "quantity": {"LE": rng.randint(0, 50)},
+            "is_active": {"EQUAL": True},
+        }),
+        "sort": json.dumps([{"field": "quantity", "order": "DESC"}]),
+        "range": json.dumps({"limit": 100, "offset": 0}),
+    }
+    return await client.get("/products/", params=params, headers=ctx.headers)
+
+
+async def deep_pagination(client, ctx, rng):
+    offset = rng.randint(ctx.max_product_id // 2, ctx.max_product_id)
+    params = {
+        "sort": json.dumps([{"field": "id", "order": "ASC"}]),
+        "range": json.dumps({"limit": 100, "offset": offset}),
+    }
+    return await client.get("/products/", params=params, headers=ctx.headers)
+
+
+async def login_storm(client, ctx, rng):
+    return await client.post(
+        "/token",
+        data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD},
+    )
+
+
+async def bulk_moves(client, ctx, rng):
+    return await client.put(
+        f"/products/{ctx.random_product_id(rng)}",
+        json={"destination_warehouse_id": rng.choice(ctx.warehouse_ids)},
+        headers=ctx.headers,
+    )
+
+
+async def stock_updates(client, ctx, rng):
+    return await client.patch(
+        f"/products/{ctx.random_product_id(rng)}",
+        json={"quantity": rng.randint(0, 500)},
+        headers=ctx.headers,
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list_with_filters": list_with_filters,
+    "deep_pagination": deep_pagination,
+    "login_storm": login_storm,
+    "bulk_moves": bulk_moves,
+    "stock_updates": stock_updates,
+}
+
+
+async def prepare_context(client: httpx.AsyncClient) -> BenchContext:
+    """Получает токен и границы данных, созданных `generate_data`"""
+    response = await client.post(
+        "/token",
+        data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD},
+    )
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/products/", headers=headers, params={
+        "sort": json.dumps([{"field": "id", "order": "DESC"}]),
+        "range": json.dumps({"limit": 1, "offset": 0}),
+    })
+    response.raise_for_status()
+    products = response.json()
+    if not products:
+        raise RuntimeError(
+            "Нет товаров: сначала запустите benchmarks.generate_data")
+
+    response = await client.get(
+        "/warehouses/", headers=headers, params={"limit": 1000})
+    response.raise_for_status()
+
+    return BenchContext(
+        token=token,
+        max_product_id=products[0]["id"],
+        warehouse_ids=[w["id"] for w in response.json()],
+        headers=headers,
+    )
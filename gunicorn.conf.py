@@ -0,0 +1,54 @@
+"""Настройки gunicorn для production-запуска: `gunicorn app.main:app`.
+
+Воркеры uvicorn по одному на CPU, перезапуск воркеров после
+`GUNICORN_MAX_REQUESTS` запросов с разбросом, предзагрузка приложения в
+мастере. Пулы соединений воркеров делят общий бюджет
+`DB_CONNECTION_BUDGET` на каждую БД.
+
+Метрики Prometheus пишутся воркерами в `PROMETHEUS_MULTIPROC_DIR`
+(по умолчанию — новый временный каталог; заданный явно каталог должен
+быть пуст при запуске), `/metrics` отдает сумму по всем воркерам.
+
+Остальное состояние у каждого воркера свое: без `RATE_LIMIT_REDIS_URL`
+ведра токенов в памяти процесса, и клиент получает до `workers` лимитов
+сразу; журнал медленных запросов (`/admin/slow-queries`) показывает
+запросы воркера, ответившего на вызов; `/health/ready` отвечает за
+прогрев этого воркера.
+"""
+import os
+import tempfile
+
+from app.server import cpu_count, pool_limits, worker_count
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.getenv(
+    "GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+workers = worker_count(cpu_count(), os.getenv("WEB_CONCURRENCY"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+
+connection_budget = os.getenv("DB_CONNECTION_BUDGET")
+if connection_budget:
+    pool_size, max_overflow = pool_limits(int(connection_budget), workers)
+    os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
+
+if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+        prefix="prometheus-")
+
+
+def child_exit(server, worker):
+    """Метрики завершившегося воркера больше не суммируются в gauge.
+
+    `prometheus_client` импортируется здесь: режим нескольких процессов
+    выбирается по `PROMETHEUS_MULTIPROC_DIR` при первом импорте.
+    """
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)